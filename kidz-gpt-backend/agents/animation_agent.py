@@ -8,6 +8,11 @@ import re
 
 import httpx
 
+from services.animation_cache_service import get_line, line_role, set_line
+from services.animation_script_service import estimate_duration, plan_actions
+from services.llm_scheduler import llm_slot
+from services.model_residency_service import keep_alive_for
+
 
 VALID_ACTIONS = [
     "claping",
@@ -112,6 +117,12 @@ class AnimationAgent:
             d = str((s or {}).get("dialogue") or "").strip()
             if d:
                 dialogue_lines.append(d)
+
+        if os.getenv("ANIMATION_LLM_MODE", "actions").strip().lower() == "actions":
+            return await self._generate_action_plan(
+                topic=topic, dialogue_lines=dialogue_lines[:12], lang_code=lang_code, lang_name=lang_name, character=character
+            )
+
         dialogue_lines = dialogue_lines[:6]
 
         system = """
@@ -198,6 +209,7 @@ OUTPUT FORMAT (MUST MATCH EXACTLY):
 
         data = {
             "model": self.model,
+            "keep_alive": keep_alive_for(self.model),
             "system": system,
             "prompt": prompt,
             "stream": False,
@@ -205,7 +217,8 @@ OUTPUT FORMAT (MUST MATCH EXACTLY):
         }
 
         async with httpx.AsyncClient(timeout=45.0) as client:
-            resp = await client.post(self.ollama_url, json=data)
+            async with llm_slot():
+                resp = await client.post(self.ollama_url, json=data)
             resp.raise_for_status()
             payload = resp.json()
 
@@ -247,6 +260,116 @@ OUTPUT FORMAT (MUST MATCH EXACTLY):
         return normalized
 
 
+    async def _generate_action_plan(
+        self,
+        *,
+        topic: str,
+        dialogue_lines: List[str],
+        lang_code: str,
+        lang_name: str,
+        character: str,
+    ) -> List[Dict[str, Any]]:
+        """Action-only mode: the model picks [action index, loop, duration] per line.
+
+        The dialogue is never sent back, so output stays a few tokens per line
+        and the child's language is preserved verbatim. Lines planned before
+        (same text, language and position) come from the line cache and are
+        not sent at all.
+        """
+        if not dialogue_lines:
+            return []
+
+        total = len(dialogue_lines)
+        roles = [line_role(idx, total) for idx in range(total)]
+        steps: List[Dict[str, Any] | None] = [
+            get_line(line, language=lang_code, role=role) for line, role in zip(dialogue_lines, roles)
+        ]
+        pending = [idx for idx, step in enumerate(steps) if step is None]
+
+        if pending:
+            actions = "\n".join(f"{i}: {a}" for i, a in enumerate(VALID_ACTIONS))
+            lines = "\n".join(
+                f"{n}. [{roles[idx]}] {json.dumps(dialogue_lines[idx], ensure_ascii=False)}"
+                for n, idx in enumerate(pending, start=1)
+            )
+            prompt = f"""
+You are an animation director for a children's learning application.
+ACTION-ONLY MODE: choose a character action for each numbered dialogue line.
+Do NOT repeat, translate or rewrite the dialogue.
+
+Topic: {topic}
+Dialogue language: {lang_name}
+
+ACTIONS (index: name):
+{actions}
+
+DIALOGUE LINES:
+{lines}
+
+RULES:
+- One entry per line, in the same order: [action_index, loop, duration_seconds].
+- loop is 1 for talking/thinking actions, 0 for greeting, reacting, celebrating or ending.
+- duration_seconds is how long the line takes to say aloud (2 to 12).
+- Greet on the [opening] line, say goodbye on the [closing] line, avoid the same action twice in a row.
+- Output ONLY valid JSON.
+
+OUTPUT FORMAT:
+{{"plan": [[1, 0, 3], [8, 1, 4]]}}
+"""
+            data = {
+                "model": self.model,
+                "keep_alive": keep_alive_for(self.model),
+                "prompt": prompt,
+                "stream": False,
+                "format": "json",
+                # A handful of numbers per line; cap generation well above that.
+                "options": {"num_predict": 16 * len(pending) + 32},
+            }
+
+            async with httpx.AsyncClient(timeout=20.0) as client:
+                async with llm_slot():
+                    resp = await client.post(self.ollama_url, json=data)
+                resp.raise_for_status()
+                payload = resp.json()
+
+            parsed = _safe_json_parse(payload.get("response", "{}"))
+            plan = parsed.get("plan")
+            if not isinstance(plan, list) or not plan:
+                return []
+
+            # Lines the model skipped or garbled get the deterministic choice (and are not cached).
+            fallback = plan_actions(dialogue_lines, language=lang_code)
+            for n, idx in enumerate(pending):
+                entry = plan[n] if n < len(plan) else None
+                step = dict(fallback[idx])
+                if isinstance(entry, dict):
+                    entry = [entry.get("action"), entry.get("loop"), entry.get("duration")]
+                if isinstance(entry, (list, tuple)) and entry:
+                    raw_action = entry[0]
+                    if isinstance(raw_action, (int, float)) and 0 <= int(raw_action) < len(VALID_ACTIONS):
+                        step["action"] = VALID_ACTIONS[int(raw_action)]
+                    elif isinstance(raw_action, str):
+                        step["action"] = _normalize_action(raw_action)
+                    step["loop"] = bool(entry[1]) if len(entry) > 1 and entry[1] is not None else step["action"] in {"idle", "neutral", "thinking", "walking"}
+                    try:
+                        step["duration"] = max(2.0, min(12.0, float(entry[2])))
+                    except (IndexError, TypeError, ValueError):
+                        step["duration"] = estimate_duration(dialogue_lines[idx], lang_code)
+                    set_line(dialogue_lines[idx], step, language=lang_code, role=roles[idx])
+                steps[idx] = step
+
+        return [
+            {
+                "scene_id": idx + 1,
+                "character": character,
+                "animation": {"action": step["action"], "loop": step["loop"]},
+                "dialogue": {"text": line},
+                "duration": step["duration"],
+            }
+            for idx, (line, step) in enumerate(zip(dialogue_lines, steps))
+        ]
+
+
 _default_agent = AnimationAgent()
 
 
@@ -6,6 +6,9 @@ import re
 
 import httpx
 
+from services.llm_scheduler import llm_slot
+from services.model_residency_service import keep_alive_for
+
 VALID_ACTIONS = {
     "claping",
     "hello",
@@ -269,6 +272,7 @@ RESPONSE FORMAT (JSON ONLY):
 
         data = {
             "model": self.model,
+            "keep_alive": keep_alive_for(self.model),
             "system": system,
             "prompt": prompt,
             "stream": False,
@@ -276,7 +280,8 @@ RESPONSE FORMAT (JSON ONLY):
         }
 
         async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(self.ollama_url, json=data)
+            async with llm_slot():
+                response = await client.post(self.ollama_url, json=data)
             response.raise_for_status()
             payload = response.json()
 
@@ -1,10 +1,38 @@
-from typing import Any, Dict
+from typing import Any, Dict, List
+import asyncio
 import httpx
 import json
 import re
 import os
+import time
 
 from models.schemas import IntentSchema
+from services import metrics_service as metrics
+from services.llm_scheduler import llm_slot
+from services.local_intent_service import classify_intent
+from services.model_residency_service import keep_alive_for
+from services.model_router import record, record_decision, route
+
+
+QUESTION_TYPES = {"general", "what", "why", "how", "when", "where", "who"}
+
+
+def _intent_confidence(intent: Dict[str, Any], text: str) -> float:
+    """Cheap plausibility score for an LLM intent, used to decide escalation."""
+    topic = str((intent or {}).get("topic") or "").strip()
+    if not topic:
+        return 0.0
+
+    score = 1.0
+    if str((intent or {}).get("question_type") or "").strip().lower() not in QUESTION_TYPES:
+        score -= 0.4
+    words = len(topic.split())
+    if words > 8:
+        score -= 0.3
+    # A topic that just echoes a long utterance means nothing was extracted.
+    if topic.lower() == (text or "").strip().lower() and words > 3:
+        score -= 0.4
+    return max(0.0, score)
 
 
 class IntentAgent:
@@ -65,35 +93,184 @@ Return exactly this JSON structure:
 {{"topic":"...","question_type":"...","difficulty":"{difficulty_value}"}}
 """
         
-        data = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,
-            "format": "json"
-        }
-        
+        models = route("intent", self.model)
         async with httpx.AsyncClient(timeout=30.0) as client:
-            try:
-                response = await client.post(self.ollama_url, json=data)
-                response.raise_for_status()
-                response_json = response.json()
-                # The response from ollama when not streaming is a single json object
-                # with a "response" key that contains the json string.
-                response_content = response_json.get("response", "{}")
-                intent_data = self._parse_ollama_json(response_content)
-                
-                # Ensure the schema is valid before returning
-                schema_obj = IntentSchema(**intent_data)
-                if hasattr(schema_obj, "model_dump"):
-                    return schema_obj.model_dump()
-                return schema_obj.dict()
-
-            except (httpx.RequestError, json.JSONDecodeError) as e:
-                print(f"An error occurred while communicating with Ollama: {e}")
-                return {"topic": text, "question_type": "general", "difficulty": "child"}
-            except Exception as e:
-                print(f"An unexpected error occurred: {e}")
-                return {"topic": text, "question_type": "general", "difficulty": "child"}
+            for attempt, model in enumerate(models, start=1):
+                data = {
+                    "model": model,
+                    "keep_alive": keep_alive_for(model),
+                    "prompt": prompt,
+                    "stream": False,
+                    "format": "json"
+                }
+
+                started = time.perf_counter()
+                try:
+                    async with llm_slot():
+                        # Queue wait is not the model's fault: time the call only.
+                        started = time.perf_counter()
+                        response = await client.post(self.ollama_url, json=data)
+                    response.raise_for_status()
+                    response_json = response.json()
+                    # The response from ollama when not streaming is a single json object
+                    # with a "response" key that contains the json string.
+                    response_content = response_json.get("response", "{}")
+                    intent_data = self._parse_ollama_json(response_content)
+
+                    # Ensure the schema is valid before returning
+                    schema_obj = IntentSchema(**intent_data)
+                    if hasattr(schema_obj, "model_dump"):
+                        intent = schema_obj.model_dump()
+                    else:
+                        intent = schema_obj.dict()
+                except (httpx.HTTPError, json.JSONDecodeError) as e:
+                    print(f"An error occurred while communicating with Ollama ({model}): {e}")
+                    record("intent", model, latency_s=time.perf_counter() - started, ok=False, reason="error")
+                    continue
+                except Exception as e:
+                    print(f"An unexpected error occurred ({model}): {e}")
+                    record("intent", model, latency_s=time.perf_counter() - started, ok=False, reason="invalid")
+                    continue
+
+                confidence = _intent_confidence(intent, text)
+                min_confidence = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.5"))
+                is_last = attempt == len(models)
+                if confidence < min_confidence and not is_last:
+                    print(f"⚠️ Low-confidence intent from {model} ({confidence:.2f}), escalating")
+                    record("intent", model, latency_s=time.perf_counter() - started, ok=False, reason="low_confidence")
+                    continue
+
+                record("intent", model, latency_s=time.perf_counter() - started, ok=True)
+                record_decision("intent", model, attempts=attempt)
+                return intent
+
+        record_decision("intent", None, attempts=len(models))
+        return {"topic": text, "question_type": "general", "difficulty": "child"}
+
+    async def _extract_batch_from_ollama(
+        self, texts: List[str], language: str = "en", selected_class: str | None = None
+    ) -> List[Dict[str, Any] | None] | None:
+        """One prompt for all texts. Returns one validated intent (or None) per text,
+        or None when the call itself failed or the reply could not be parsed."""
+        lang_code = (language or "en").strip().lower().split("-")[0]
+        lang_name = {
+            "en": "English",
+            "hi": "Hindi (हिंदी)",
+            "bn": "Bengali (বাংলা)",
+            "ta": "Tamil (தமிழ்)",
+            "te": "Telugu (తెలుగు)",
+        }.get(lang_code, language or "English")
+
+        grade_hint = (selected_class or "").strip()
+        difficulty_value = f"child-{grade_hint}" if grade_hint else "child"
+        numbered = "\n".join(f'{i}. {json.dumps(t, ensure_ascii=False)}' for i, t in enumerate(texts, start=1))
+
+        prompt = f"""
+You are a batch intent extractor for a children's learning platform.
+
+For EACH numbered utterance below, extract:
+- topic: a short, clear noun phrase (2-6 words) that describes the main subject.
+- question_type: one of [general, what, why, how, when, where, who].
+- difficulty: "{difficulty_value}".
+
+Guidelines:
+- The utterances are in {lang_name}. Each topic MUST be written in {lang_name}.
+- Treat every utterance independently; never merge or skip utterances.
+- If an utterance is not a question, use question_type "general".
+
+Output rules:
+- Output ONLY valid JSON, with exactly one entry per utterance and the same id.
+
+Utterances:
+{numbered}
+
+Return exactly this JSON structure:
+{{"intents":[{{"id":1,"topic":"...","question_type":"...","difficulty":"{difficulty_value}"}}]}}
+"""
+        min_confidence = float(os.getenv("INTENT_MIN_CONFIDENCE", "0.5"))
+        models = route("intent", self.model)
+        async with httpx.AsyncClient(timeout=30.0 + 5.0 * len(texts)) as client:
+            for attempt, model in enumerate(models, start=1):
+                data = {
+                    "model": model,
+                    "keep_alive": keep_alive_for(model),
+                    "prompt": prompt,
+                    "stream": False,
+                    "format": "json"
+                }
+
+                started = time.perf_counter()
+                try:
+                    async with llm_slot():
+                        started = time.perf_counter()
+                        response = await client.post(self.ollama_url, json=data)
+                    response.raise_for_status()
+                    parsed = self._parse_ollama_json(response.json().get("response", "{}"))
+                    items = parsed.get("intents") if isinstance(parsed, dict) else None
+                    if not isinstance(items, list):
+                        raise ValueError("missing intents list")
+                except (httpx.HTTPError, json.JSONDecodeError, ValueError) as e:
+                    print(f"⚠️ Batch intent call failed for {len(texts)} utterance(s) ({model}): {e}")
+                    record("intent", model, latency_s=time.perf_counter() - started, ok=False, reason="error")
+                    continue
+
+                by_id = {}
+                for item in items:
+                    if isinstance(item, dict):
+                        try:
+                            by_id[int(item.get("id"))] = item
+                        except (TypeError, ValueError):
+                            continue
+
+                results: List[Dict[str, Any] | None] = []
+                for i, text in enumerate(texts, start=1):
+                    item = by_id.get(i)
+                    try:
+                        schema_obj = IntentSchema(**{k: item.get(k) for k in ("topic", "question_type", "difficulty")})
+                    except Exception:
+                        results.append(None)
+                        continue
+                    intent = schema_obj.model_dump() if hasattr(schema_obj, "model_dump") else schema_obj.dict()
+                    results.append(intent if _intent_confidence(intent, text) >= min_confidence else None)
+
+                # Nothing usable from this tier: escalate like single extraction does.
+                # Partial results are kept; the caller retries the missing items.
+                if all(r is None for r in results):
+                    print(f"⚠️ No confident intents from {model} for the batch, escalating")
+                    record("intent", model, latency_s=time.perf_counter() - started, ok=False, reason="low_confidence")
+                    continue
+
+                record("intent", model, latency_s=time.perf_counter() - started, ok=True)
+                record_decision("intent", model, attempts=attempt)
+                return results
+
+        record_decision("intent", None, attempts=len(models))
+        return None
+
+    async def _resolve_batch(
+        self, texts: List[str], language: str = "en", selected_class: str | None = None
+    ) -> List[Dict[str, Any]]:
+        """Split-and-retry: failed calls are bisected, failed items are retried on their own."""
+        if len(texts) == 1:
+            return [await self._extract_intent_from_ollama(texts[0], language, selected_class=selected_class)]
+
+        results = await self._extract_batch_from_ollama(texts, language, selected_class=selected_class)
+        if results is None or all(r is None for r in results):
+            metrics.incr("intent.batch_split")
+            mid = len(texts) // 2
+            left, right = await asyncio.gather(
+                self._resolve_batch(texts[:mid], language, selected_class=selected_class),
+                self._resolve_batch(texts[mid:], language, selected_class=selected_class),
+            )
+            return left + right
+
+        failed = [i for i, r in enumerate(results) if r is None]
+        if failed:
+            metrics.incr("intent.batch_item_retry", len(failed))
+            retried = await self._resolve_batch([texts[i] for i in failed], language, selected_class=selected_class)
+            for i, intent in zip(failed, retried):
+                results[i] = intent
+        return results
 
     def _parse_ollama_json(self, response_content: Any) -> Dict[str, Any]:
         if isinstance(response_content, dict):
@@ -129,8 +306,48 @@ Return exactly this JSON structure:
         if not text:
             return {"topic": "", "question_type": "general", "difficulty": "child"}
 
+        if os.getenv("LOCAL_INTENT_ENABLED", "1") == "1":
+            intent, confidence = classify_intent(text, language, selected_class=selected_class)
+            if confidence >= float(os.getenv("LOCAL_INTENT_MIN_CONFIDENCE", "0.75")):
+                metrics.incr("intent.local")
+                return intent
+            metrics.incr("intent.local_low_confidence")
+
         return await self._extract_intent_from_ollama(text, language, selected_class=selected_class)
 
+    async def extract_intents_batch(
+        self, texts: List[str], language: str = "en", selected_class: str | None = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Batch variant of extract_intent for bulk workloads (warm-up, prefetch, classroom bursts).
+        Returns one intent dict per input, in the same order.
+        """
+        results: List[Dict[str, Any] | None] = [None] * len(texts)
+        pending = []
+        use_local = os.getenv("LOCAL_INTENT_ENABLED", "1") == "1"
+        min_local = float(os.getenv("LOCAL_INTENT_MIN_CONFIDENCE", "0.75"))
+        for i, text in enumerate(texts):
+            if not text:
+                results[i] = {"topic": "", "question_type": "general", "difficulty": "child"}
+                continue
+            if use_local:
+                intent, confidence = classify_intent(text, language, selected_class=selected_class)
+                if confidence >= min_local:
+                    metrics.incr("intent.local")
+                    results[i] = intent
+                    continue
+            pending.append(i)
+
+        batch_size = max(1, int(os.getenv("INTENT_BATCH_SIZE", "16")))
+        chunks = [pending[i : i + batch_size] for i in range(0, len(pending), batch_size)]
+        resolved = await asyncio.gather(
+            *(self._resolve_batch([texts[i] for i in chunk], language, selected_class=selected_class) for chunk in chunks)
+        )
+        for chunk, intents in zip(chunks, resolved):
+            for i, intent in zip(chunk, intents):
+                results[i] = intent
+        return results
+
 
 _default_agent = IntentAgent()
 
@@ -138,6 +355,10 @@ _default_agent = IntentAgent()
 async def extract_intent(text: str, language: str = "en", selected_class: str | None = None) -> Dict[str, Any]:
     return await _default_agent.extract_intent(text, language, selected_class=selected_class)
 
+
+async def extract_intents_batch(texts: List[str], language: str = "en", selected_class: str | None = None) -> List[Dict[str, Any]]:
+    return await _default_agent.extract_intents_batch(texts, language, selected_class=selected_class)
+
 # A non-async version for parts of the app that are not async
 def extract_intent_sync(text: str, language: str = "en") -> Dict[str, Any]:
     agent = IntentAgent()
@@ -161,6 +382,7 @@ Return exactly:
 """
     data = {
         "model": agent.model,
+        "keep_alive": keep_alive_for(agent.model),
         "prompt": prompt,
         "stream": False,
         "format": "json"
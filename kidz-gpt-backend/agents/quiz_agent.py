@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+from collections import OrderedDict
 from typing import Any, Dict, List
+import asyncio
+import hashlib
 import json
 import os
 import re
@@ -8,6 +11,11 @@ import re
 import httpx
 
 from models.schemas import QuizQuestion
+from services import metrics_service as metrics
+from services.llm_scheduler import PRIORITY_BACKGROUND, llm_priority, llm_slot
+from services.model_residency_service import keep_alive_for
+from services.local_quiz_service import build_quiz
+from services.quiz_bank_service import add_questions, needs_top_up, related_answers, sample_questions
 
 class QuizAgent:
     def __init__(self):
@@ -129,6 +137,7 @@ REQUIRED JSON FORMAT:
 
         data = {
             "model": self.model,
+            "keep_alive": keep_alive_for(self.model),
             "system": system,
             "prompt": prompt,
             "stream": False,
@@ -136,7 +145,8 @@ REQUIRED JSON FORMAT:
         }
 
         async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(self.ollama_url, json=data)
+            async with llm_slot():
+                response = await client.post(self.ollama_url, json=data)
             response.raise_for_status()
             payload = response.json()
 
@@ -160,4 +170,199 @@ async def generate_quiz(
     language: str = "en",
     selected_class: str | None = None,
 ) -> Dict[str, List[Dict[str, Any]]]:
-    return await _default_agent.generate_quiz(topic, explainer, language, selected_class=selected_class)
\ No newline at end of file
+    return await _default_agent.generate_quiz(topic, explainer, language, selected_class=selected_class)
+
+# ---------- Background pre-generation ----------
+# The quiz inputs are known as soon as the explainer exists, minutes before
+# the child asks for the quiz. The pipeline queues the quiz at background
+# priority; /generate-quiz then returns the stored result or awaits the job.
+
+_prefetched: "OrderedDict[str, Dict[str, List[Dict[str, Any]]]]" = OrderedDict()
+_inflight: Dict[str, "asyncio.Task"] = {}
+_top_ups: Dict[tuple, "asyncio.Task"] = {}
+
+
+# Defaults the frontend (pickTopicExplainer in home.tsx) fills in before
+# echoing the explainer back to /generate-quiz.
+DEFAULT_QUIZ_TITLE = "Your Topic"
+DEFAULT_QUIZ_SUMMARY = "Here are the main ideas in a simple way."
+
+
+def quiz_explainer(explainer: Dict[str, Any], topic: str | None = None) -> Dict[str, Any]:
+    """The explainer the way the frontend sends it to /generate-quiz.
+
+    The title is the intent topic (pass it as `topic` on the backend side),
+    the summary is trimmed or defaulted, and only the first three non-empty
+    trimmed points are kept.
+    """
+    explainer = explainer or {}
+    title = str((explainer.get("title") if topic is None else topic) or "").strip()
+    points = [str(p or "").strip() for p in explainer.get("points") or []]
+    return {
+        "title": title or DEFAULT_QUIZ_TITLE,
+        "summary": str(explainer.get("summary") or "").strip() or DEFAULT_QUIZ_SUMMARY,
+        "points": [p for p in points if p][:3],
+    }
+
+
+def quiz_key(explainer: Dict[str, Any], selected_class: str | None = None) -> str:
+    """Hash of the explainer content the quiz is generated from.
+
+    Expects the quiz_explainer() form on both sides. The language is left
+    out: the frontend sends "auto" when detection failed, and the content
+    already identifies the language.
+    """
+    explainer = explainer or {}
+    parts = [
+        str(explainer.get("title") or "").strip().lower(),
+        str(explainer.get("summary") or ""),
+        [str(p) for p in explainer.get("points") or []],
+        (selected_class or "").strip().lower(),
+    ]
+    return hashlib.sha1(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _store_prefetched(key: str, result: Dict[str, List[Dict[str, Any]]]):
+    _prefetched[key] = result
+    _prefetched.move_to_end(key)
+    limit = int(os.getenv("QUIZ_PREFETCH_CACHE_SIZE", "256"))
+    while len(_prefetched) > limit:
+        _prefetched.popitem(last=False)
+
+
+async def _generate_and_bank(topic: str, explainer: Dict[str, Any], language: str, selected_class: str | None):
+    result = await _default_agent.generate_quiz(topic, explainer, language, selected_class=selected_class)
+    try:
+        await asyncio.to_thread(add_questions, topic, language, selected_class, result.get("questions") or [])
+    except Exception as e:
+        print(f"⚠️ Could not bank quiz questions: {e}")
+    return result
+
+
+def _schedule_top_up(topic: str, explainer: Dict[str, Any], language: str, selected_class: str | None):
+    key = (topic.strip().lower(), (language or "en").strip().lower().split("-")[0], (selected_class or "").strip().lower())
+    if key in _top_ups:
+        return
+
+    async def top_up():
+        try:
+            with llm_priority(PRIORITY_BACKGROUND):
+                await _generate_and_bank(topic, explainer, language, selected_class)
+        finally:
+            _top_ups.pop(key, None)
+
+    task = asyncio.create_task(top_up())
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    _top_ups[key] = task
+    metrics.incr("quiz_bank.top_up")
+
+
+async def _prefetch(key: str, topic: str, explainer: Dict[str, Any], language: str, selected_class: str | None):
+    try:
+        with llm_priority(PRIORITY_BACKGROUND):
+            result = await _generate_and_bank(topic, explainer, language, selected_class)
+        if result.get("questions"):
+            _store_prefetched(key, result)
+        return result
+    finally:
+        _inflight.pop(key, None)
+
+
+def _local_quiz(topic: str, explainer: Dict[str, Any], language: str) -> Dict[str, List[Dict[str, Any]]]:
+    result = build_quiz(
+        topic,
+        explainer,
+        language,
+        count=int(os.getenv("QUIZ_BANK_SAMPLE_SIZE", "3")),
+        related_terms=related_answers(topic, language),
+    )
+    metrics.incr("quiz.local")
+    return result
+
+
+def _local_mode() -> bool:
+    return os.getenv("QUIZ_MODE", "llm").strip().lower() == "local"
+
+
+def prefetch_quiz(
+    explainer: Dict[str, Any],
+    language: str = "en",
+    selected_class: str | None = None,
+    topic: str | None = None,
+) -> None:
+    """Queue quiz generation for this explainer unless it is ready or already running.
+
+    `topic` is the lesson's intent topic, which the frontend sends back as the quiz title.
+    """
+    if os.getenv("QUIZ_PREFETCH_ENABLED", "1") != "1" or _local_mode() or not (explainer or {}).get("title"):
+        return
+    explainer = quiz_explainer(explainer, topic)
+    key = quiz_key(explainer, selected_class)
+    if key in _prefetched or key in _inflight:
+        return
+    # A full bank already answers this topic without the LLM.
+    if not needs_top_up(explainer["title"], language, selected_class):
+        return
+    task = asyncio.create_task(_prefetch(key, explainer["title"], explainer, language, selected_class))
+    # Retrieve the exception so a failed job is not reported as "never retrieved".
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    _inflight[key] = task
+    metrics.incr("quiz.prefetch_queued")
+
+
+async def get_or_generate_quiz(
+    topic: str,
+    explainer: Dict[str, Any],
+    language: str = "en",
+    selected_class: str | None = None,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Quiz for this explainer, cheapest source first.
+
+    1. the quiz prefetched for this lesson (served once, so a retake differs)
+    2. a sample from the topic's question bank (topped up in the background)
+    3. the in-flight prefetch
+    4. a fresh LLM quiz
+    With QUIZ_MODE=local, or when the LLM fails, a fill-in-the-blank quiz
+    is built from the explainer instead of steps 3-4.
+    """
+    key = quiz_key(quiz_explainer(explainer), selected_class)
+    ready = _prefetched.pop(key, None)
+    if ready:
+        metrics.incr("quiz.prefetch_hit")
+        return ready
+
+    banked = sample_questions(topic, language, selected_class, count=int(os.getenv("QUIZ_BANK_SAMPLE_SIZE", "3")))
+    if banked:
+        if needs_top_up(topic, language, selected_class):
+            _schedule_top_up(topic, explainer, language, selected_class)
+        return {"questions": banked}
+
+    if _local_mode():
+        local = _local_quiz(topic, explainer, language)
+        if local["questions"]:
+            return local
+
+    task = _inflight.get(key)
+    if task:
+        metrics.incr("quiz.prefetch_wait")
+        try:
+            # Shielded: a client giving up must not cancel the shared job.
+            result = await asyncio.shield(task)
+            _prefetched.pop(key, None)
+            if result.get("questions"):
+                return result
+        except Exception as e:
+            print(f"⚠️ Prefetched quiz failed, generating again: {e}")
+
+    metrics.incr("quiz.prefetch_miss")
+    try:
+        result = await _generate_and_bank(topic, explainer, language, selected_class)
+        if result.get("questions"):
+            return result
+    except (httpx.HTTPError, json.JSONDecodeError, ValueError) as e:
+        print(f"⚠️ Quiz LLM failed, using fill-in-the-blank quiz: {e}")
+    return _local_quiz(topic, explainer, language)
+
+
+def prefetch_stats() -> Dict[str, int]:
+    return {"ready": len(_prefetched), "inflight": len(_inflight), "bank_top_ups": len(_top_ups)}
@@ -1,10 +1,70 @@
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, List
+import asyncio
 import httpx
 import json
 import re
 import os
+import time
 
 from models.schemas import StoryboardSchema
+from services import metrics_service as metrics
+from services.llm_scheduler import llm_slot
+from services.model_residency_service import keep_alive_for
+from services.model_router import record, record_decision, route
+from services.safety_service import StreamingSafetyChecker, UnsafeContentError
+from services.storyboard_library_service import find_storyboard, save_storyboard
+
+
+class _SceneStreamParser:
+    """Incrementally pull complete scene objects out of a streamed storyboard.
+
+    Fed raw text fragments as the model produces them; returns each object
+    of the top-level array (the "scenes" list) as soon as its closing brace
+    arrives. String contents and escapes are tracked so braces inside
+    dialogue do not confuse the scanner.
+    """
+
+    def __init__(self):
+        self._buffer: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._array_depth = None
+        self._depth = 0
+        self._collecting = False
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        scenes = []
+        for ch in text:
+            if self._collecting:
+                self._buffer.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+                if ch == "[" and self._array_depth is None:
+                    self._array_depth = self._depth
+                elif ch == "{" and self._array_depth is not None and self._depth == self._array_depth + 1:
+                    self._collecting = True
+                    self._buffer = ["{"]
+            elif ch in "}]":
+                if ch == "}" and self._collecting and self._depth == self._array_depth + 1:
+                    self._collecting = False
+                    try:
+                        scene = json.loads("".join(self._buffer))
+                    except json.JSONDecodeError:
+                        scene = None
+                    if isinstance(scene, dict):
+                        scenes.append(scene)
+                self._depth -= 1
+        return scenes
 
 
 class ScriptAgent:
@@ -13,13 +73,14 @@ class ScriptAgent:
         # Allow a dedicated storyboard model; fallback to the general model.
         self.model = os.getenv("OLLAMA_MODEL_SCRIPT", os.getenv("OLLAMA_MODEL", "deepseek-v3.1:671b-cloud"))
 
-    async def _generate_storyboard_from_ollama(
+    def _storyboard_prompts(
         self,
         intent: Dict[str, Any],
         language: str,
         question: str = "",
         selected_class: str | None = None,
-    ) -> Dict[str, Any]:
+    ) -> tuple[str, str, str]:
+        """Return (topic, system_prompt, user_prompt) for a storyboard request."""
         topic = (intent or {}).get("topic") or "a random topic"
         question = (question or "").strip()
 
@@ -112,42 +173,206 @@ JSON FORMAT:
 }}
 """
 
+        return topic, system_prompt, user_prompt
 
-        data = { 
-            "model": self.model,
-            "system": system_prompt,
-            "prompt": user_prompt,
-            "stream": False,
-            "format": "json"
-        }
+    async def _generate_storyboard_from_ollama(
+        self,
+        intent: Dict[str, Any],
+        language: str,
+        question: str = "",
+        selected_class: str | None = None,
+    ) -> Dict[str, Any]:
+        topic, system_prompt, user_prompt = self._storyboard_prompts(intent, language, question, selected_class)
 
+        models = route("script", self.model)
         async with httpx.AsyncClient(timeout=60.0) as client:
-            try:
-                response = await client.post(self.ollama_url, json=data)
-                response.raise_for_status()
-                response_json = response.json()
-                response_content = response_json.get("response", "{}")
-
-                storyboard_data = self._parse_ollama_json(response_content)
-                storyboard_data = self._normalize_storyboard(storyboard_data, language, topic)
+            for attempt, model in enumerate(models, start=1):
+                data = {
+                    "model": model,
+                    "keep_alive": keep_alive_for(model),
+                    "system": system_prompt,
+                    "prompt": user_prompt,
+                    "stream": False,
+                    "format": "json"
+                }
 
-                # Validate against schema; if invalid, fallback.
+                started = time.perf_counter()
                 try:
-                    _ = StoryboardSchema(**storyboard_data)
-                except Exception as e:
-                    raise ValueError("Invalid storyboard schema from LLM") from e
-                
+                    async with llm_slot():
+                        # Queue wait is not the model's fault: time the call only.
+                        started = time.perf_counter()
+                        response = await client.post(self.ollama_url, json=data)
+                    response.raise_for_status()
+                    response_json = response.json()
+                    response_content = response_json.get("response", "{}")
+
+                    storyboard_data = self._parse_ollama_json(response_content)
+                    scenes = storyboard_data.get("scenes") if isinstance(storyboard_data, dict) else None
+                    if not isinstance(scenes, list) or len(scenes) < 2:
+                        raise ValueError("Storyboard from LLM has fewer than 2 scenes")
+                    storyboard_data = self._normalize_storyboard(storyboard_data, language, topic)
+
+                    # Validate against schema; if invalid, escalate / fallback.
+                    try:
+                        _ = StoryboardSchema(**storyboard_data)
+                    except Exception as e:
+                        raise ValueError("Invalid storyboard schema from LLM") from e
+                except (httpx.HTTPError, json.JSONDecodeError, ValueError) as e:
+                    # HTTPError includes HTTPStatusError: a model that was never pulled (404)
+                    # or a 5xx moves on to the next model like a connection error.
+                    print(f"An error occurred while generating storyboard ({model}): {e}")
+                    reason = "error" if isinstance(e, httpx.HTTPError) else "invalid"
+                    record("script", model, latency_s=time.perf_counter() - started, ok=False, reason=reason)
+                    continue
+
+                record("script", model, latency_s=time.perf_counter() - started, ok=True)
+                record_decision("script", model, attempts=attempt)
+
                 # Log generated dialogue for language verification
                 if storyboard_data.get("scenes"):
                     first_dialogue = storyboard_data["scenes"][0].get("dialogue", "")[:60]
-                    print(f"✅ Generated storyboard in {language}: {first_dialogue}...")
-                
+                    print(f"✅ Generated storyboard in {language} ({model}): {first_dialogue}...")
+
+                await self._save_to_library(intent, language, selected_class, storyboard_data)
                 return storyboard_data
 
-            except (httpx.RequestError, json.JSONDecodeError, ValueError) as e:
-                print(f"An error occurred while generating storyboard: {e}")
-                # Fallback to heuristic
-                return self._heuristic_storyboard(intent, language)
+        record_decision("script", None, attempts=len(models))
+        # Fallback to heuristic
+        return self._heuristic_storyboard(intent, language)
+
+    async def _save_to_library(self, intent, language, selected_class, storyboard_data) -> None:
+        try:
+            await asyncio.to_thread(save_storyboard, intent, language, selected_class, storyboard_data)
+        except Exception as e:
+            print(f"⚠️ Could not save storyboard to library: {e}")
+
+    async def stream_storyboard(
+        self,
+        intent: Dict[str, Any],
+        language: str = "en",
+        question: str = "",
+        selected_class: str | None = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Yield normalized scenes one by one while the model is still writing.
+
+        Uses the first model of the script route with Ollama streaming. If the
+        stream fails before any scene arrives, the regular (escalating)
+        storyboard path is used instead. Closing the generator early closes
+        the HTTP stream, which stops generation on the Ollama side.
+
+        Model output passes through a StreamingSafetyChecker before scenes are
+        parsed; on an unsafe term the stream is closed and UnsafeContentError
+        is raised, so the rest of the lesson is never generated.
+        """
+        lang_code = (language or "en").lower().split("-")[0]
+        if not intent:
+            for scene in self._heuristic_storyboard({"topic": ""}, language)["scenes"]:
+                yield scene
+            return
+
+        stored = find_storyboard(intent, language, selected_class)
+        if stored:
+            for scene in stored["scenes"]:
+                yield scene
+            return
+
+        topic, system_prompt, user_prompt = self._storyboard_prompts(intent, language, question, selected_class)
+        model = route("script", self.model)[0]
+        data = {
+            "model": model,
+            "keep_alive": keep_alive_for(model),
+            "system": system_prompt,
+            "prompt": user_prompt,
+            "stream": True,
+            "format": "json"
+        }
+
+        emitted = 0
+        streamed = []
+        complete = False
+        truncated = False
+        last_dialogue = ""
+        started = time.perf_counter()
+        max_scenes = int(os.getenv("STORYBOARD_STREAM_MAX_SCENES", "4"))
+        try:
+            async with httpx.AsyncClient(timeout=60.0) as client:
+                async with llm_slot():
+                    started = time.perf_counter()
+                    async with client.stream("POST", self.ollama_url, json=data) as response:
+                        response.raise_for_status()
+                        parser = _SceneStreamParser()
+                        checker = StreamingSafetyChecker()
+                        async for line in response.aiter_lines():
+                            if not line.strip():
+                                continue
+                            chunk = json.loads(line)
+                            text = checker.feed(str(chunk.get("response") or ""))
+                            if chunk.get("done"):
+                                text += checker.flush()
+                            if checker.unsafe:
+                                start, _, term = checker.match
+                                print(f"🚫 Unsafe term {term!r} in storyboard stream at char {start}, stopping generation")
+                                metrics.incr("safety.stream_stopped")
+                                record("script", model, latency_s=time.perf_counter() - started, ok=False, reason="unsafe")
+                                raise UnsafeContentError(term, start)
+                            for raw_scene in parser.feed(text):
+                                dialogue = self._normalize_dialogue(raw_scene.get("dialogue", ""), lang_code=lang_code)
+                                background = raw_scene.get("background")
+                                if not isinstance(background, str) or not background.strip():
+                                    background = "scene"
+                                emitted += 1
+                                last_dialogue = dialogue
+                                if emitted == 1:
+                                    metrics.observe("stage.storyboard_first_scene", time.perf_counter() - started)
+                                scene = {"scene": emitted, "background": background.strip(), "dialogue": dialogue}
+                                # The consumer fills in audio, duration, ... on the scene it gets.
+                                streamed.append(dict(scene))
+                                yield scene
+                                if emitted >= max_scenes:
+                                    break
+                            if emitted >= max_scenes and not chunk.get("done"):
+                                truncated = True
+                                break
+                            if chunk.get("done"):
+                                break
+        except (httpx.RequestError, httpx.HTTPStatusError, json.JSONDecodeError) as e:
+            print(f"⚠️ Storyboard stream failed after {emitted} scene(s) ({model}): {e}")
+            record("script", model, latency_s=time.perf_counter() - started, ok=False, reason="error")
+            if emitted == 0:
+                storyboard = await self.generate_storyboard(intent, language, question, selected_class=selected_class)
+                for scene in storyboard["scenes"]:
+                    yield scene
+                return
+        else:
+            complete = True
+            record("script", model, latency_s=time.perf_counter() - started, ok=emitted >= 2)
+            if emitted == 0:
+                for scene in self._heuristic_storyboard(intent, language)["scenes"]:
+                    yield scene
+                return
+
+        # Same guarantees as the non-streaming path: at least two scenes, and
+        # the lesson ends on a statement. Scenes already sent are final, so add one.
+        if emitted < 2 or last_dialogue.endswith("?"):
+            scene = {"scene": emitted + 1, "background": "wrap_up", "dialogue": self._wrap_up_dialogue(topic, lang_code)}
+            streamed.append(dict(scene))
+            yield scene
+
+        # Only reached when the consumer read the whole lesson (no early close).
+        # A stream cut short by an error or by max_scenes, or one the model
+        # wrote fewer than two real scenes for, is not worth keeping.
+        if complete and not truncated and emitted >= 2 and all(s["dialogue"] for s in streamed):
+            await self._save_to_library(intent, language, selected_class, {"scenes": streamed})
+
+    def _wrap_up_dialogue(self, topic: str, lang_code: str) -> str:
+        wrap_up_by_lang = {
+            "hi": f"आज हमने {topic} के बारे में सीखा — बस इतना ही!",
+            "bn": f"আজ আমরা {topic} সম্পর্কে শিখলাম — এইটাই!",
+            "ta": f"இன்று நாம் {topic} பற்றி கற்றுக்கொண்டோம் — அவ்வளவுதான்!",
+            "te": f"ఈరోజు మనం {topic} గురించి నేర్చుకున్నాం — అంతే!",
+            "en": f"Today we learned about {topic}.",
+        }
+        return wrap_up_by_lang.get(lang_code, wrap_up_by_lang["en"])
 
     def _parse_ollama_json(self, response_content: Any) -> Dict[str, Any]:
         if isinstance(response_content, dict):
@@ -265,24 +490,18 @@ JSON FORMAT:
             return self._heuristic_storyboard({"topic": topic}, language)
 
         # Ensure the last scene ends with a wrap-up statement (not a question).
-        wrap_up_by_lang = {
-            "hi": f"आज हमने {topic} के बारे में सीखा — बस इतना ही!",
-            "bn": f"আজ আমরা {topic} সম্পর্কে শিখলাম — এইটাই!",
-            "ta": f"இன்று நாம் {topic} பற்றி கற்றுக்கொண்டோம் — அவ்வளவுதான்!",
-            "te": f"ఈరోజు మనం {topic} గురించి నేర్చుకున్నాం — అంతే!",
-            "en": f"Today we learned about {topic}.",
-        }
+        wrap_up = self._wrap_up_dialogue(topic, lang_code)
 
         last = normalized_scenes[-1]
         last_dialogue = str(last.get("dialogue", "")).strip()
 
         # If it ends with a question mark, replace with wrap-up.
         if last_dialogue.endswith("?"):
-            last_dialogue = wrap_up_by_lang.get(lang_code, wrap_up_by_lang["en"])
+            last_dialogue = wrap_up
 
         # Ensure it has ending punctuation.
         if not re.search(r"[.!?।！？]$", last_dialogue):
-            last_dialogue = f"{last_dialogue}." if last_dialogue else wrap_up_by_lang.get(lang_code, wrap_up_by_lang["en"])
+            last_dialogue = f"{last_dialogue}." if last_dialogue else wrap_up
 
         last["dialogue"] = last_dialogue
         normalized_scenes[-1] = last
@@ -314,6 +533,11 @@ JSON FORMAT:
         if not intent:
             return self._heuristic_storyboard({"topic": ""}, language)
 
+        # Everyday topics are served from the on-disk library without an LLM call.
+        stored = find_storyboard(intent, language, selected_class)
+        if stored:
+            return stored
+
         result = await self._generate_storyboard_from_ollama(
             intent,
             language,
@@ -337,6 +561,15 @@ async def generate_storyboard(intent: Dict[str, Any], language: str = "en", sele
     return await _default_agent.generate_storyboard(intent, language, selected_class=selected_class)
 
 
+def stream_storyboard(
+    intent: Dict[str, Any],
+    question: str,
+    language: str = "en",
+    selected_class: str | None = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    return _default_agent.stream_storyboard(intent, language, question, selected_class=selected_class)
+
+
 # Backward-compatible helper that allows passing the raw question text.
 async def generate_storyboard_with_question(
     intent: Dict[str, Any],
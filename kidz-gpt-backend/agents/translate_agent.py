@@ -6,6 +6,9 @@ import re
 
 import httpx
 
+from services.llm_scheduler import llm_slot
+from services.model_residency_service import keep_alive_for
+
 
 class TranslateAgent:
     def __init__(self):
@@ -63,13 +66,15 @@ Text:
 
         data = {
             "model": self.model,
+            "keep_alive": keep_alive_for(self.model),
             "system": system,
             "prompt": prompt,
             "stream": False,
         }
 
         async with httpx.AsyncClient(timeout=45.0) as client:
-            response = await client.post(self.ollama_url, json=data)
+            async with llm_slot():
+                response = await client.post(self.ollama_url, json=data)
             response.raise_for_status()
             payload = response.json()
 
@@ -1,15 +1,33 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form
+from dotenv import load_dotenv
+
+# Before the app imports: services and agents read their settings (scheduler
+# slots, worker pools, models) from the environment at import time.
+load_dotenv()
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.orchestrator import process_audio, process_text_query
+from fastapi.responses import StreamingResponse
+from app.orchestrator import process_audio, process_text_query, stream_text_query
+import asyncio
+import json
+import os
 import traceback
-from dotenv import load_dotenv
 from pydantic import BaseModel
-from services.translation_service import translate_text
+from services.translation_service import translate_batch, translate_text, translation_stats
 from services.cache_service import get_by_key
 from services.gesture_service import detect_gesture
-from agents.quiz_agent import generate_quiz
-
-load_dotenv()
+from services.model_residency_service import start_model_residency, stop_model_residency, residency_status
+from services.model_router import routing_stats
+from services.llm_scheduler import PRIORITY_DEFERRED, llm_priority, scheduler_stats
+from services import metrics_service
+from services.topic_index_service import index_stats, load_curriculum
+from services.animation_cache_service import cache_stats as animation_cache_stats
+from services.storyboard_library_service import library_stats, load_library
+from services.quiz_bank_service import bank_stats, load_bank
+from services.lesson_reuse_service import reuse_stats
+from services.language_service import preload_profiles
+from agents.quiz_agent import get_or_generate_quiz, prefetch_stats as quiz_prefetch_stats
+from agents.intent_agent import extract_intents_batch
 
 app = FastAPI(title="KIDZ GPT Backend")
 
@@ -23,11 +41,95 @@ app.add_middleware(
 )
 
 
+@app.on_event("startup")
+async def startup_event():
+    """Load the curriculum index, storyboard library, quiz bank and language profiles; warm Ollama models in the background so startup is not blocked."""
+    try:
+        load_curriculum()
+    except Exception as e:
+        print(f"⚠️ Curriculum index not loaded: {e}")
+    try:
+        load_library()
+    except Exception as e:
+        print(f"⚠️ Storyboard library not loaded: {e}")
+    try:
+        load_bank()
+    except Exception as e:
+        print(f"⚠️ Quiz bank not loaded: {e}")
+    try:
+        preload_profiles()
+    except Exception as e:
+        print(f"⚠️ Language profiles not preloaded: {e}")
+    # Keep a strong reference: the loop only holds tasks weakly.
+    app.state.residency_task = asyncio.create_task(start_model_residency())
+    app.state.residency_task.add_done_callback(_report_residency_failure)
+
+
+def _report_residency_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        print(f"⚠️ Model warm-up failed: {task.exception()!r}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    task = getattr(app.state, "residency_task", None)
+    if task is not None and not task.done():
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+    await stop_model_residency()
+
+
+@app.get("/models")
+async def get_models():
+    """Report configured Ollama models, their keep_alive and which are loaded."""
+    try:
+        return await residency_status()
+    except Exception as e:
+        print("❌ ERROR OCCURRED while reading model residency")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """In-process counters/latencies plus model routing, LLM slot, topic index and cache stats."""
+    return {
+        **metrics_service.snapshot(),
+        "routing": routing_stats(),
+        "scheduler": scheduler_stats(),
+        "topic_index": index_stats(),
+        "animation_cache": animation_cache_stats(),
+        "storyboard_library": library_stats(),
+        "quiz_prefetch": quiz_prefetch_stats(),
+        "quiz_bank": bank_stats(),
+        "translation": translation_stats(),
+        "lesson_reuse": reuse_stats(),
+    }
+
+
+@app.post("/metrics/reset")
+async def reset_metrics():
+    """Clear counters/latencies, e.g. between benchmark phases."""
+    metrics_service.reset()
+    return {"status": "ok"}
+
+
 class TranslationRequest(BaseModel):
     text: str
     to_language: str = "en"
 
 
+class TranslationBatchRequest(BaseModel):
+    texts: list[str]
+    to_languages: list[str] = ["en"]
+
+
+class IntentBatchRequest(BaseModel):
+    texts: list[str]
+    language: str = "en"
+    selected_class: str | None = ""
+
+
 class GestureDetectionRequest(BaseModel):
     frame: str  # Base64-encoded image frame from camera
 
@@ -64,7 +166,7 @@ async def detect_gesture_endpoint(request: GestureDetectionRequest):
 @app.post("/translate")
 async def translate(request: TranslationRequest):
     try:
-        translated_text = translate_text(request.text, request.to_language)
+        translated_text = await translate_text(request.text, request.to_language)
         return {"translated_text": translated_text}
     except Exception as e:
         print("❌ ERROR OCCURRED during translation")
@@ -72,6 +174,82 @@ async def translate(request: TranslationRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/translate-batch")
+async def translate_many(request: TranslationBatchRequest):
+    """Translate many strings into one or more languages (e.g. a whole lesson).
+
+    Returns:
+      - translations: {language: [translated text per input, same order]}
+    """
+    try:
+        max_items = int(os.getenv("TRANSLATION_BATCH_MAX_ITEMS", "500"))
+        if len(request.texts) * max(1, len(request.to_languages)) > max_items:
+            raise HTTPException(status_code=400, detail=f"At most {max_items} texts × languages per request")
+
+        languages = list(dict.fromkeys((lang or "en").strip().lower().split("-")[0] or "en" for lang in request.to_languages))
+        translated = await asyncio.gather(*(translate_batch(request.texts, lang) for lang in languages))
+        return {"translations": dict(zip(languages, translated))}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print("❌ ERROR OCCURRED during batch translation")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/extract-intents")
+async def extract_intents(request: IntentBatchRequest):
+    """Extract intents for many utterances at once (prefetch, warm-up, classroom bursts).
+
+    Returns:
+      - intents: one {topic, question_type, difficulty} per input text, same order
+    """
+    try:
+        max_items = int(os.getenv("INTENT_BATCH_MAX_ITEMS", "200"))
+        if len(request.texts) > max_items:
+            raise HTTPException(status_code=400, detail=f"At most {max_items} texts per request")
+
+        language = (request.language or "en").strip().lower().split("-")[0] or "en"
+        # Bulk work must not delay children waiting on /process.
+        with llm_priority(PRIORITY_DEFERRED):
+            intents = await extract_intents_batch(request.texts, language, selected_class=request.selected_class or "")
+        return {"intents": intents}
+    except HTTPException:
+        raise
+    except Exception as e:
+        print("❌ ERROR OCCURRED during batch intent extraction")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def _run_until_disconnect(http_request: Request, coro):
+    """Await `coro`, cancelling it as soon as the client goes away.
+
+    Cancellation propagates into the in-flight agent call, which aborts the
+    downstream Ollama/Wikipedia HTTP request and frees its LLM slot.
+    """
+    task = asyncio.create_task(coro)
+    poll_s = float(os.getenv("DISCONNECT_POLL_SECONDS", "0.5"))
+    try:
+        while True:
+            done, _ = await asyncio.wait({task}, timeout=poll_s)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                print("🛑 Client disconnected, cancelling pipeline")
+                metrics_service.incr("pipeline.cancelled_on_disconnect")
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                # Nobody is listening; 499 is the conventional "client closed request".
+                raise HTTPException(status_code=499, detail="Client disconnected")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
 class TextProcessRequest(BaseModel):
     text: str
     language: str = "en"
@@ -79,6 +257,7 @@ class TextProcessRequest(BaseModel):
     selected_class: str | None = ""
 @app.post("/process")
 async def process(
+    http_request: Request,
     audio: UploadFile = File(...),
     language: str = Form("en"),
     character: str = Form("girl"),
@@ -102,7 +281,12 @@ async def process(
         if char_normalized not in ["boy", "girl"]:
             char_normalized = "girl"
         
-        return await process_audio(audio, base_language, char_normalized, transcript, selected_class)
+        return await _run_until_disconnect(
+            http_request,
+            process_audio(audio, base_language, char_normalized, transcript, selected_class),
+        )
+    except HTTPException:
+        raise
     except TimeoutError as e:
         raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
@@ -112,7 +296,7 @@ async def process(
 
 
 @app.post("/process-text")
-async def process_text(request: TextProcessRequest):
+async def process_text(request: TextProcessRequest, http_request: Request):
     try:
         normalized = (request.language or "").strip().lower()
 
@@ -128,12 +312,17 @@ async def process_text(request: TextProcessRequest):
         if char_normalized not in ["boy", "girl"]:
             char_normalized = "girl"
 
-        return await process_text_query(
-            request.text,
-            base_language,
-            char_normalized,
-            selected_class=request.selected_class or "",
+        return await _run_until_disconnect(
+            http_request,
+            process_text_query(
+                request.text,
+                base_language,
+                char_normalized,
+                selected_class=request.selected_class or "",
+            ),
         )
+    except HTTPException:
+        raise
     except TimeoutError as e:
         raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
@@ -142,6 +331,44 @@ async def process_text(request: TextProcessRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/process-text-stream")
+async def process_text_stream(request: TextProcessRequest):
+    """Same pipeline as /process-text, streamed as NDJSON events.
+
+    Lines are `meta` (job_id, language, intent), one `scene` per storyboard
+    scene as soon as the model finishes it, then `result` with the full
+    /process-text payload, or `error`. The client can start speaking the first
+    scene while the rest is still being generated.
+    """
+    normalized = (request.language or "").strip().lower()
+    if normalized in ["", "auto", "detect", "unknown"]:
+        base_language = "auto"
+    else:
+        base_language = normalized.split("-")[0]
+
+    char_normalized = (request.character or "").strip().lower()
+    if char_normalized not in ["boy", "girl"]:
+        char_normalized = "girl"
+
+    async def events():
+        # Starlette closes this generator when the client disconnects, which
+        # closes the storyboard stream and aborts the Ollama request with it.
+        try:
+            async for event in stream_text_query(
+                request.text,
+                base_language,
+                char_normalized,
+                selected_class=request.selected_class or "",
+            ):
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            print("❌ ERROR OCCURRED (text stream)")
+            traceback.print_exc()
+            yield json.dumps({"type": "error", "error": str(e)}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
 @app.get("/explainer")
 async def get_explainer(job_id: str):
     """Poll for the deferred explainer generated after /process.
@@ -195,7 +422,8 @@ async def create_quiz(request: dict):
         if not topic and not explainer:
             raise HTTPException(status_code=400, detail="Missing topic or explainer")
         
-        result = await generate_quiz(
+        # Usually already generated in the background after the lesson.
+        result = await get_or_generate_quiz(
             topic=topic,
             explainer=explainer,
             language=language,
@@ -1,17 +1,26 @@
 import asyncio
 import os
+import time
 
 from services.stt_service import transcribe_audio
 from services.language_service import detect_language
-from services.safety_service import is_safe
-from services.cache_service import get, set, key as cache_key
+from services.safety_service import UnsafeContentError, is_safe, scan_lesson
+from services.cache_service import get, get_by_key, set, key as cache_key
 from services.animation_script_service import build_animation_scenes
+from services.animation_cache_service import get_plan, plan_key, set_plan
 from services.wikipedia_service import fetch_wikipedia_image
+from services.llm_scheduler import PRIORITY_DEFERRED, llm_priority, scheduler_saturated
+from services.local_explainer_service import build_explainer
+from services.topic_index_service import match_lesson
+from services.lesson_reuse_service import canonical_question, find_source, register, translate_lesson
+from services.lesson_reuse_service import enabled as reuse_enabled
+from services import metrics_service as metrics
 from agents.intent_agent import extract_intent
 from agents.animation_agent import generate_animation_scenes
-from agents.script_agent import generate_storyboard_with_question
+from agents.script_agent import generate_storyboard_with_question, stream_storyboard
 # Non-dialogue explanation + key points for the topic section
 from agents.explain_agent import generate_explainer
+from agents.quiz_agent import prefetch_quiz
 # TTS is handled by frontend browser TTS - no need to import generate_tts
 
 
@@ -77,18 +86,23 @@ def _fallback_explainer_for_language(*, topic_title: str, language: str) -> dict
 
 async def _compute_explainer_and_update_cache(*, cache_id: str, topic: str, question: str, language: str):
     try:
-        explainer = await generate_explainer(topic=topic, question=question, language=language)
+        # Deferred work: only uses LLM capacity that live requests leave free.
+        with llm_priority(PRIORITY_DEFERRED):
+            explainer = await generate_explainer(topic=topic, question=question, language=language)
         payload = get(question) or {}
         if isinstance(payload, dict):
             payload["explainer"] = explainer
             payload["explainer_status"] = "ready"
             payload["explainer_error"] = None
             set(question, payload)
+            prefetch_quiz(explainer, language, payload.get("selected_class"), topic=topic)
     except Exception as e:
         print(f"⚠️ Explainer generation failed (deferred): {e}")
         topic_title = topic or "Explanation"
-        fallback = _fallback_explainer_for_language(topic_title=topic_title, language=language)
         payload = get(question) or {}
+        scenes = payload.get("scenes") if isinstance(payload, dict) else None
+        fallback = build_explainer(intent={"topic": topic}, scenes=scenes or [], question=question, language=language)
+        fallback = fallback or _fallback_explainer_for_language(topic_title=topic_title, language=language)
         if isinstance(payload, dict):
             payload["explainer"] = fallback
             payload["explainer_status"] = "fallback"
@@ -100,32 +114,66 @@ async def _run_pipeline(*, text: str, language: str, whisper_detected_lang: str
     """Shared pipeline used by both audio and text entry.
 
     Expects clean text + a best-effort language hint.
+    If the caller cancels (client disconnected), the stages that already
+    finished are cached so the next identical question resumes from them.
     """
+    completed: dict = {}
+    started = time.perf_counter()
+    try:
+        return await _run_pipeline_stages(
+            text=text,
+            language=language,
+            whisper_detected_lang=whisper_detected_lang,
+            character=character,
+            selected_class=selected_class,
+            completed=completed,
+        )
+    except asyncio.CancelledError:
+        metrics.incr("pipeline.cancelled")
+        if completed.get("intent"):
+            set(text, {"partial": True, "original_text": text, **completed})
+            print(f"🛑 Pipeline cancelled; cached finished stages: {sorted(k for k in completed if k not in ('language', 'selected_class'))}")
+        raise
+    finally:
+        metrics.observe("stage.total", time.perf_counter() - started)
 
-    # 2️⃣ Safety check on raw text
-    if not is_safe(text):
-        return {
-            "error": "Unsafe content detected",
-            "message": "Please ask a different question",
-        }
 
-    # 3️⃣ Cache check (after text exists)
-    cached = get(text)
-    # Return cached payload even if explainer is still pending.
-    # This ensures fast responses and prevents spawning multiple explainer tasks.
-    if cached and isinstance(cached, dict) and cached.get("animation_scenes") and cached.get("scenes"):
-        # Backfill fields for older cache entries
-        if not cached.get("job_id"):
-            cached["job_id"] = cache_key(text)
-        if "explainer_status" not in cached:
-            cached["explainer_status"] = "ready" if cached.get("explainer") else "pending"
-        if "explainer_error" not in cached:
-            cached["explainer_error"] = None
-        set(text, cached)
-        return cached
+def _resumable_stages(cached, *, language: str, selected_class: str) -> dict:
+    """Stages saved by a cancelled run of the same question, if still applicable."""
+    if not isinstance(cached, dict) or not cached.get("partial"):
+        return {}
+    if cached.get("language") != language or (cached.get("selected_class") or "") != (selected_class or ""):
+        return {}
+    return cached
 
-    # 4️⃣ Language detection and validation
-    # Priority: Whisper detected language > Text analysis > User specified language
+
+def _cached_lesson(text: str) -> dict | None:
+    """Full cached payload for this question, if any.
+
+    Returned even if the explainer is still pending: this keeps responses fast
+    and prevents spawning multiple explainer tasks.
+    """
+    cached = get(text)
+    if not (cached and isinstance(cached, dict) and cached.get("animation_scenes") and cached.get("scenes")):
+        return None
+    # Backfill fields for older cache entries
+    if not cached.get("job_id"):
+        cached["job_id"] = cache_key(text)
+    if "explainer_status" not in cached:
+        cached["explainer_status"] = "ready" if cached.get("explainer") else "pending"
+    if "explainer_error" not in cached:
+        cached["explainer_error"] = None
+    set(text, cached)
+    metrics.incr("pipeline.cache_hit")
+    return cached
+
+
+def _resolve_language(text: str, language: str, whisper_detected_lang: str | None) -> str:
+    """Language detection and validation.
+
+    Priority: Whisper detected language > Text analysis > User specified language
+    """
+    language_started = time.perf_counter()
     original_language = language
     
     # Define supported languages for the platform
@@ -182,87 +230,139 @@ async def _run_pipeline(*, text: str, language: str, whisper_detected_lang: str
         language = "en"
     
     print(f"🌐 Final language for pipeline: {language}")
+    metrics.observe("stage.language", time.perf_counter() - language_started)
+    return language
 
-    # 5️⃣ Intent extraction (grade-aware)
-    intent = await extract_intent(text, language, selected_class=selected_class)
 
-    # 6️⃣ Storyboard generation (grade-aware)
-    storyboard = await generate_storyboard_with_question(
-        intent,
-        question=text,
-        language=language,
-        selected_class=selected_class,
-    )
+def _prefer_local_explainer() -> bool:
+    """Skip the explainer LLM when configured to, or when its slots are all taken."""
+    if os.getenv("EXPLAINER_MODE", "llm").strip().lower() == "local":
+        return True
+    return os.getenv("EXPLAINER_LOCAL_WHEN_BUSY", "1") == "1" and scheduler_saturated()
 
-    # NOTE: We no longer do a separate translation step.
-    # The storyboard + explainer should be generated directly in the user's spoken language
-    # (as detected by Whisper) to avoid translation-model drift.
 
-    # 6.8️⃣ Generate explainer synchronously so it's included in the initial response.
-    # This ensures the explanation (title, summary, points) is always available immediately.
-    explainer = None
-    explainer_status = "pending"
-    explainer_error = None
-    try:
-        topic = (intent or {}).get("topic") or ""
-        explainer = await generate_explainer(
-            topic=topic,
-            question=text,
-            language=language,
-            selected_class=selected_class,
-        )
-        explainer_status = "ready"
-        
-        # Fetch Wikipedia image using the keyword from the explainer
-        wikipedia_keyword = explainer.get("wikipedia_keyword") or topic or ""
-        if wikipedia_keyword:
-            print(f"🖼️ Fetching Wikipedia image for: {wikipedia_keyword}")
-            try:
+async def _attach_wikipedia_image(explainer: dict, topic: str) -> None:
+    # Fetch Wikipedia image using the keyword from the explainer
+    wikipedia_keyword = explainer.get("wikipedia_keyword") or topic or ""
+    if wikipedia_keyword:
+        print(f"🖼️ Fetching Wikipedia image for: {wikipedia_keyword}")
+        try:
+            with metrics.timer("stage.wikipedia"):
                 image_url = await fetch_wikipedia_image(wikipedia_keyword)
-                if image_url:
-                    explainer["image_url"] = image_url
-                    print(f"✅ Added Wikipedia image to explainer: {image_url}")
-                else:
-                    explainer["image_url"] = None
-                    print(f"⚠️ No Wikipedia image found for: {wikipedia_keyword}")
-            except Exception as img_err:
-                print(f"⚠️ Wikipedia image fetch failed: {img_err}")
+            if image_url:
+                explainer["image_url"] = image_url
+                print(f"✅ Added Wikipedia image to explainer: {image_url}")
+            else:
                 explainer["image_url"] = None
-        
-        print(f"✅ Explainer generated immediately for topic: {topic}")
+                print(f"⚠️ No Wikipedia image found for: {wikipedia_keyword}")
+        except Exception as img_err:
+            print(f"⚠️ Wikipedia image fetch failed: {img_err}")
+            explainer["image_url"] = None
+
+
+async def _local_explainer_with_image(*, intent: dict, text: str, language: str, scenes: list | None) -> dict | None:
+    """Explainer extracted from this request's storyboard, or None if it has no usable lines."""
+    explainer = build_explainer(intent=intent, scenes=scenes or [], question=text, language=language)
+    if explainer:
+        metrics.incr("explainer.local")
+        await _attach_wikipedia_image(explainer, (intent or {}).get("topic") or "")
+    return explainer
+
+
+async def _explainer_with_image(
+    *,
+    intent: dict,
+    text: str,
+    language: str,
+    selected_class: str,
+    scenes: list | None = None,
+) -> tuple[dict, str, str | None]:
+    """Generate the explainer plus its Wikipedia image. Returns (explainer, status, error).
+
+    When the storyboard scenes are passed, an LLM call that is skipped (see
+    _prefer_local_explainer), slower than EXPLAINER_TIMEOUT_SECONDS or failing
+    is replaced by an explainer extracted from those scenes.
+    """
+    topic = (intent or {}).get("topic") or ""
+    if scenes and _prefer_local_explainer():
+        explainer = await _local_explainer_with_image(intent=intent, text=text, language=language, scenes=scenes)
+        if explainer:
+            print(f"✅ Local explainer built from storyboard for topic: {topic}")
+            return explainer, "ready", None
+
+    try:
+        with metrics.timer("stage.explainer"):
+            explainer = await asyncio.wait_for(
+                generate_explainer(
+                    topic=topic,
+                    question=text,
+                    language=language,
+                    selected_class=selected_class,
+                ),
+                timeout=float(os.getenv("EXPLAINER_TIMEOUT_SECONDS", "20")),
+            )
     except Exception as e:
-        print(f"⚠️ Explainer generation failed: {e}")
-        topic_title = (intent or {}).get("topic") or "Explanation"
-        explainer = _fallback_explainer_for_language(topic_title=topic_title, language=language)
-        explainer_status = "fallback"
-        explainer_error = str(e)
-        explainer["image_url"] = None
-
-    # 7️⃣ Safety check on generated dialogue and validate dialogue exists
-    for scene in storyboard["scenes"]:
-        # Validate dialogue exists and is not empty
-        dialogue = scene.get("dialogue", "").strip()
-        if not dialogue:
-            print(f"⚠️ Warning: Empty dialogue in scene {scene.get('scene', 'unknown')}, skipping")
-            scene["dialogue"] = "I'm sorry, I couldn't generate a response for this scene."
-        elif not is_safe(dialogue):
-            return {
-                "error": "Generated content unsafe"
-            }
-        else:
-            # Ensure dialogue is set
-            scene["dialogue"] = dialogue
+        error = str(e) or type(e).__name__
+        print(f"⚠️ Explainer generation failed: {error}")
+        explainer = await _local_explainer_with_image(intent=intent, text=text, language=language, scenes=scenes)
+        if explainer is None:
+            topic_title = topic or "Explanation"
+            explainer = _fallback_explainer_for_language(topic_title=topic_title, language=language)
+            explainer["image_url"] = None
+        return explainer, "fallback", error
+
+    await _attach_wikipedia_image(explainer, topic)
+    print(f"✅ Explainer generated immediately for topic: {topic}")
+    return explainer, "ready", None
+
+
+def _prepare_scene(scene: dict, check_safety: bool = True) -> bool:
+    """Safety-check one storyboard scene and add frontend fields. False if unsafe.
+
+    Pass check_safety=False when the scene was already covered by _check_lesson.
+    """
+    # Validate dialogue exists and is not empty
+    dialogue = scene.get("dialogue", "").strip()
+    if not dialogue:
+        print(f"⚠️ Warning: Empty dialogue in scene {scene.get('scene', 'unknown')}, skipping")
+        scene["dialogue"] = "I'm sorry, I couldn't generate a response for this scene."
+    elif check_safety and not is_safe(dialogue):
+        return False
+    else:
+        # Ensure dialogue is set
+        scene["dialogue"] = dialogue
 
-    # 8️⃣ TTS is handled by frontend browser TTS - skip backend TTS generation
+    # TTS is handled by frontend browser TTS - skip backend TTS generation
     # Frontend uses Web Speech API for better voice quality and language matching
-    for scene in storyboard["scenes"]:
-        # Don't generate audio - frontend handles TTS
-        scene["audio"] = ""  # Empty string indicates frontend should handle TTS
-        scene["duration"] = 4
-        scene["character"] = "kid_avatar"
+    scene["audio"] = ""  # Empty string indicates frontend should handle TTS
+    scene["duration"] = 4
+    scene["character"] = "kid_avatar"
+    return True
 
-    # 8.5️⃣ Build 3D animation script based on the response + explainer
+
+def _check_lesson(*, scenes: list, explainer: dict, topic: str, language: str) -> tuple[bool, dict]:
+    """One safety pass over every dialogue line and the explainer.
+
+    Returns (scenes_safe, explainer). An unsafe explainer alone does not fail
+    the lesson: it is replaced by the generic one for the language.
+    """
+    matches = scan_lesson(scenes=scenes, explainer=explainer)
+    if not matches:
+        return True, explainer
+    for match in matches:
+        print(f"🚫 Unsafe term {match['term']!r} in {match['field']} at {match['start']}-{match['end']}")
+    metrics.incr("safety.unsafe_lesson")
+    if any(match["field"].startswith("scenes") for match in matches):
+        return False, explainer
+    fallback = _fallback_explainer_for_language(topic_title=topic or "Explanation", language=language)
+    fallback["image_url"] = (explainer or {}).get("image_url")
+    return True, fallback
+
+
+async def _animate(*, text: str, intent: dict, storyboard: dict, explainer: dict, language: str, character: str, lesson: dict | None) -> list:
+    """Build the 3D animation script based on the response + explainer."""
     animation_scenes = []
+    animation_started = time.perf_counter()
     try:
         topic = (intent or {}).get("topic") or ""
         # Set character preference via environment variable for this request (supports ben10)
@@ -270,41 +370,68 @@ async def _run_pipeline(*, text: str, language: str, whisper_detected_lang: str
 
         # IMPORTANT:
         # The frontend prefers `animation_scenes` over `scenes`.
-        # Our LLM-based animation agent is allowed to "rewrite" dialogue for tone,
-        # which can accidentally switch non-English responses back into English.
-        # To keep the displayed dialogue in the child's language (e.g., Hindi),
-        # we use deterministic mapping for non-English.
+        # The deterministic planner picks actions in every language and keeps
+        # the dialogue untouched, so it is the default. The LLM director is an
+        # opt-in (ANIMATION_USE_LLM=1). Its action-only mode never sees its own
+        # dialogue output, so it is safe in every language; the legacy rewrite
+        # mode may switch other languages back into English and stays English-only.
         lang_code = (language or "en").strip().lower().split("-")[0]
-        if lang_code != "en":
+        action_only = os.getenv("ANIMATION_LLM_MODE", "actions").strip().lower() == "actions"
+        use_llm = os.getenv("ANIMATION_USE_LLM", "0") == "1" and (lang_code == "en" or action_only) and not lesson
+
+        # Plans are cached by the dialogue itself, so a storyboard animated before
+        # is reused even when the full-lesson cache entry for this question is gone.
+        lines = [str((s or {}).get("dialogue") or "").strip() for s in storyboard.get("scenes", [])]
+        title = (explainer or {}).get("title") or ""
+        llm_key = plan_key(lines, language=lang_code, character=character, planner=f"llm:{'actions' if action_only else 'rewrite'}", title=title)
+        local_key = plan_key(lines, language=lang_code, character=character, planner="local", title=title)
+
+        if use_llm:
+            animation_scenes = get_plan(llm_key) or []
+            if not animation_scenes:
+                try:
+                    animation_scenes = await generate_animation_scenes(
+                        topic=topic,
+                        question=text,
+                        storyboard_scenes=storyboard.get("scenes", []),
+                        language=language,
+                    )
+                    set_plan(llm_key, animation_scenes)
+                except Exception as e:
+                    print(f"⚠️ LLM animation failed, using deterministic plan: {e}")
+
+        if not animation_scenes:
+            animation_scenes = get_plan(local_key) or []
+        if not animation_scenes:
             animation_scenes = build_animation_scenes(
                 storyboard_scenes=storyboard.get("scenes", []),
                 explainer=explainer,
                 language=language,
             )
-        else:
-            # Prefer LLM-directed animation plan using the predefined actions.
-            animation_scenes = await generate_animation_scenes(
-                topic=topic,
-                question=text,
-                storyboard_scenes=storyboard.get("scenes", []),
-                language=language,
-            )
-
-            # Fallback to deterministic heuristic mapping.
-            if not animation_scenes:
-                animation_scenes = build_animation_scenes(
-                    storyboard_scenes=storyboard.get("scenes", []),
-                    explainer=explainer,
-                    language=language,
-                )
+            set_plan(local_key, animation_scenes)
     except Exception as e:
         print(f"⚠️ Animation script generation failed: {e}")
         animation_scenes = []
+    metrics.observe("stage.animation", time.perf_counter() - animation_started)
+    return animation_scenes
 
-    cache_id = cache_key(text)
 
+def _store_result(
+    *,
+    text: str,
+    language: str,
+    selected_class: str,
+    intent: dict,
+    explainer: dict,
+    explainer_status: str,
+    explainer_error: str | None,
+    scenes: list,
+    animation_scenes: list,
+    canonical: str = "",
+    translated_from: str | None = None,
+) -> dict:
     result = {
-        "job_id": cache_id,
+        "job_id": cache_key(text),
         "language": language,
         "original_text": text,
         "selected_class": selected_class,
@@ -312,16 +439,344 @@ async def _run_pipeline(*, text: str, language: str, whisper_detected_lang: str
         "explainer": explainer,
         "explainer_status": explainer_status,
         "explainer_error": explainer_error,
-        "scenes": storyboard["scenes"],
+        "scenes": scenes,
         "animation_scenes": animation_scenes,
     }
+    if translated_from:
+        result["translated_from"] = translated_from
 
     # 9️⃣ Cache result
     set(text, result)
+    if canonical:
+        register(canonical, selected_class, language, result["job_id"])
 
+    # 🔟 The quiz only depends on the explainer: start it now, at background priority.
+    prefetch_quiz(explainer, language, selected_class, topic=(intent or {}).get("topic"))
     return result
 
 
+async def _canonical_for_reuse(text: str, language: str) -> str:
+    """Canonical question for cross-language reuse, or "" to generate normally.
+
+    Reuse is only a shortcut: a slow or failing translator must not fail the lesson.
+    """
+    try:
+        return await canonical_question(text, language)
+    except Exception as e:
+        print(f"⚠️ Could not canonicalize question for reuse, generating instead: {e!r}")
+        metrics.incr("lesson_reuse.canonical_failed")
+        return ""
+
+
+async def _reuse_translated_lesson(*, text: str, canonical: str, language: str, selected_class: str) -> dict | None:
+    """Same question already answered in another language: translate that lesson."""
+    job_id = find_source(canonical, selected_class, language)
+    source = get_by_key(job_id) if job_id else None
+    if not (isinstance(source, dict) and source.get("scenes")):
+        return None
+    try:
+        with metrics.timer("stage.lesson_translation"):
+            translated = await translate_lesson(source, language)
+    except Exception as e:
+        print(f"⚠️ Lesson translation failed, generating instead: {e}")
+        return None
+    if not translated:
+        return None
+    safe, translated["explainer"] = _check_lesson(
+        scenes=translated["scenes"],
+        explainer=translated["explainer"],
+        topic=translated["intent"].get("topic") or "",
+        language=language,
+    )
+    if not safe:
+        return None
+    for scene in translated["scenes"]:
+        _prepare_scene(scene, check_safety=False)
+
+    animation_scenes = translated["animation_scenes"] or build_animation_scenes(
+        storyboard_scenes=translated["scenes"],
+        explainer=translated["explainer"],
+        language=language,
+    )
+    print(f"🌍 Reused {source.get('language')} lesson for {language}: {canonical}")
+    metrics.incr("pipeline.lesson_reused")
+    return _store_result(
+        text=text,
+        language=language,
+        selected_class=selected_class,
+        intent=translated["intent"],
+        explainer=translated["explainer"],
+        explainer_status=source.get("explainer_status") or "ready",
+        explainer_error=None,
+        scenes=translated["scenes"],
+        animation_scenes=animation_scenes,
+        canonical=canonical,
+        translated_from=source.get("language"),
+    )
+
+
+async def _run_pipeline_stages(
+    *,
+    text: str,
+    language: str,
+    whisper_detected_lang: str | None,
+    character: str,
+    selected_class: str,
+    completed: dict,
+):
+
+    # 2️⃣ Safety check on raw text
+    if not is_safe(text):
+        return {
+            "error": "Unsafe content detected",
+            "message": "Please ask a different question",
+        }
+
+    # 3️⃣ Cache check (after text exists)
+    cached = get(text)
+    hit = _cached_lesson(text)
+    if hit:
+        return hit
+
+    metrics.incr("pipeline.cache_miss")
+
+    # 4️⃣ Language detection and validation
+    language = _resolve_language(text, language, whisper_detected_lang)
+    completed["language"] = language
+    completed["selected_class"] = selected_class
+    resumed = _resumable_stages(cached, language=language, selected_class=selected_class)
+
+    # 4.5️⃣ Curriculum lookup: preset topics get a prebuilt lesson without any LLM call.
+    lesson = None if resumed else match_lesson(text, language, selected_class=selected_class)
+
+    # 4.6️⃣ Cross-language reuse: translate a lesson already generated for this question.
+    canonical = await _canonical_for_reuse(text, language) if reuse_enabled() and not resumed and not lesson else ""
+    if canonical:
+        reused = await _reuse_translated_lesson(
+            text=text, canonical=canonical, language=language, selected_class=selected_class
+        )
+        if reused:
+            return reused
+
+    # 5️⃣ Intent extraction (grade-aware)
+    if resumed.get("intent"):
+        intent = resumed["intent"]
+    elif lesson:
+        intent = lesson["intent"]
+    else:
+        with metrics.timer("stage.intent"):
+            intent = await extract_intent(text, language, selected_class=selected_class)
+    completed["intent"] = intent
+
+    # 6️⃣ Storyboard generation (grade-aware)
+    if resumed.get("scenes"):
+        storyboard = {"scenes": resumed["scenes"]}
+    elif lesson:
+        storyboard = {"scenes": lesson["scenes"]}
+    else:
+        with metrics.timer("stage.storyboard"):
+            storyboard = await generate_storyboard_with_question(
+                intent,
+                question=text,
+                language=language,
+                selected_class=selected_class,
+            )
+    completed["scenes"] = storyboard["scenes"]
+
+    # NOTE: We no longer do a separate translation step.
+    # The storyboard + explainer should be generated directly in the user's spoken language
+    # (as detected by Whisper) to avoid translation-model drift.
+
+    # 6.8️⃣ Generate explainer synchronously so it's included in the initial response.
+    # This ensures the explanation (title, summary, points) is always available immediately.
+    if resumed.get("explainer"):
+        explainer, explainer_status, explainer_error = resumed["explainer"], "ready", None
+        completed["explainer"] = explainer
+    elif lesson:
+        explainer, explainer_status, explainer_error = lesson["explainer"], "ready", None
+        completed["explainer"] = explainer
+    else:
+        explainer, explainer_status, explainer_error = await _explainer_with_image(
+            intent=intent,
+            text=text,
+            language=language,
+            selected_class=selected_class,
+            scenes=storyboard["scenes"],
+        )
+        if explainer_status == "ready":
+            completed["explainer"] = explainer
+
+    # 7️⃣ Safety check on all generated dialogue and the explainer, in one pass
+    safe, explainer = _check_lesson(
+        scenes=storyboard["scenes"],
+        explainer=explainer,
+        topic=(intent or {}).get("topic") or "",
+        language=language,
+    )
+    if not safe:
+        return {
+            "error": "Generated content unsafe"
+        }
+
+    # 8️⃣ Validate dialogue exists, frontend TTS fields
+    for scene in storyboard["scenes"]:
+        _prepare_scene(scene, check_safety=False)
+
+    # 8.5️⃣ Build 3D animation script based on the response + explainer
+    animation_scenes = await _animate(
+        text=text,
+        intent=intent,
+        storyboard=storyboard,
+        explainer=explainer,
+        language=language,
+        character=character,
+        lesson=lesson,
+    )
+
+    return _store_result(
+        text=text,
+        language=language,
+        selected_class=selected_class,
+        intent=intent,
+        explainer=explainer,
+        explainer_status=explainer_status,
+        explainer_error=explainer_error,
+        scenes=storyboard["scenes"],
+        animation_scenes=animation_scenes,
+        canonical=canonical,
+    )
+
+
+async def _iter_scenes(scenes: list):
+    for scene in scenes:
+        yield scene
+
+
+async def stream_text_query(
+    text: str,
+    language: str = "en",
+    character: str = "girl",
+    selected_class: str = "",
+):
+    """Text pipeline that yields events as soon as each part is ready.
+
+    Events (one JSON object per line on /process-text-stream):
+      {"type": "meta", "job_id", "language", "intent"}
+      {"type": "scene", "scene": {...}}      one per storyboard scene, safety-checked
+      {"type": "result", "result": {...}}    same payload as /process-text
+      {"type": "error", "error": "..."}
+    The explainer is generated while the storyboard streams.
+    """
+    started = time.perf_counter()
+    explainer_task = None
+    try:
+        if not is_safe(text):
+            yield {"type": "error", "error": "Unsafe content detected", "message": "Please ask a different question"}
+            return
+
+        hit = _cached_lesson(text)
+        if hit:
+            yield {"type": "meta", "job_id": hit["job_id"], "language": hit.get("language"), "intent": hit.get("intent")}
+            for scene in hit["scenes"]:
+                yield {"type": "scene", "scene": scene}
+            yield {"type": "result", "result": hit}
+            return
+
+        metrics.incr("pipeline.cache_miss")
+        language = _resolve_language(text, language, None)
+        lesson = match_lesson(text, language, selected_class=selected_class)
+        canonical = await _canonical_for_reuse(text, language) if reuse_enabled() and not lesson else ""
+        reused = canonical and await _reuse_translated_lesson(
+            text=text, canonical=canonical, language=language, selected_class=selected_class
+        )
+        if reused:
+            yield {"type": "meta", "job_id": reused["job_id"], "language": language, "intent": reused["intent"]}
+            for scene in reused["scenes"]:
+                yield {"type": "scene", "scene": scene}
+            yield {"type": "result", "result": reused}
+            return
+
+        if lesson:
+            intent = lesson["intent"]
+        else:
+            with metrics.timer("stage.intent"):
+                intent = await extract_intent(text, language, selected_class=selected_class)
+        yield {"type": "meta", "job_id": cache_key(text), "language": language, "intent": intent}
+
+        if not lesson and not _prefer_local_explainer():
+            explainer_task = asyncio.create_task(
+                _explainer_with_image(intent=intent, text=text, language=language, selected_class=selected_class)
+            )
+
+        scenes = []
+        storyboard_started = time.perf_counter()
+        source = (
+            _iter_scenes(lesson["scenes"])
+            if lesson
+            else stream_storyboard(intent, question=text, language=language, selected_class=selected_class)
+        )
+        try:
+            async for scene in source:
+                if not _prepare_scene(scene):
+                    # Closing the source stops the model from generating the rest.
+                    yield {"type": "error", "error": "Generated content unsafe"}
+                    return
+                scenes.append(scene)
+                yield {"type": "scene", "scene": scene}
+        except UnsafeContentError:
+            # The storyboard stream caught it mid-scene and already stopped the model.
+            yield {"type": "error", "error": "Generated content unsafe"}
+            return
+        finally:
+            await source.aclose()
+        metrics.observe("stage.storyboard", time.perf_counter() - storyboard_started)
+
+        if lesson:
+            explainer, explainer_status, explainer_error = lesson["explainer"], "ready", None
+        elif explainer_task:
+            explainer, explainer_status, explainer_error = await explainer_task
+            if explainer_status == "fallback":
+                # The task started before the scenes existed; use them now.
+                explainer = await _local_explainer_with_image(
+                    intent=intent, text=text, language=language, scenes=scenes
+                ) or explainer
+        else:
+            explainer, explainer_status, explainer_error = await _explainer_with_image(
+                intent=intent, text=text, language=language, selected_class=selected_class, scenes=scenes
+            )
+        # Scenes were checked as they streamed; the explainer has not been yet.
+        _, explainer = _check_lesson(
+            scenes=[], explainer=explainer, topic=(intent or {}).get("topic") or "", language=language
+        )
+
+        animation_scenes = await _animate(
+            text=text,
+            intent=intent,
+            storyboard={"scenes": scenes},
+            explainer=explainer,
+            language=language,
+            character=character,
+            lesson=lesson,
+        )
+        result = _store_result(
+            text=text,
+            language=language,
+            selected_class=selected_class,
+            intent=intent,
+            explainer=explainer,
+            explainer_status=explainer_status,
+            explainer_error=explainer_error,
+            scenes=scenes,
+            animation_scenes=animation_scenes,
+            canonical=canonical,
+        )
+        yield {"type": "result", "result": result}
+    finally:
+        if explainer_task and not explainer_task.done():
+            explainer_task.cancel()
+        metrics.observe("stage.total", time.perf_counter() - started)
+
+
 async def process_audio(
     audio_file,
     language: str = "en",
@@ -333,7 +788,8 @@ async def process_audio(
 
     # 1️⃣ Speech to text (MUST come first)
     try:
-        transcription_result = await asyncio.wait_for(transcribe_audio(audio_file, language), timeout=stt_timeout_s)
+        with metrics.timer("stage.stt"):
+            transcription_result = await asyncio.wait_for(transcribe_audio(audio_file, language), timeout=stt_timeout_s)
 
         # Handle tuple return (text, detected_language) or just text for backward compatibility
         if isinstance(transcription_result, tuple):
@@ -0,0 +1,324 @@
+"""
+End-to-end load test for /process-text, /process and /generate-quiz.
+
+Drives the FastAPI app either in-process (httpx.ASGITransport) or over HTTP,
+normally against the mock Ollama / Whisper servers, and writes a JSON report
+with throughput, p50/p95/p99 latency per endpoint, time per pipeline stage
+(from GET /metrics) and memory growth.
+
+Run from kidz-gpt-backend/:
+
+    python -m benchmarks.load_test --spawn-mocks --concurrency 8 --requests 200 \
+        --mix process-text=0.7,process=0.2,generate-quiz=0.1 \
+        --languages en=0.6,hi=0.1,bn=0.1,ta=0.1,te=0.1 --cache-hit-ratio 0.3
+
+    python -m benchmarks.load_test --mode http --base-url http://localhost:8000 --server-pid 1234
+
+Compare two runs with --compare previous.json.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import httpx
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+QUIZ_EXPLAINER = {
+    "title": "Photosynthesis",
+    "summary": "Plants make their own food using sunlight, water and air.",
+    "points": ["Leaves catch sunlight.", "Roots drink water.", "Plants give us oxygen."],
+}
+
+
+def _parse_weights(raw: str) -> dict[str, float]:
+    weights = {}
+    for part in (raw or "").split(","):
+        if "=" in part:
+            name, value = part.split("=", 1)
+            weights[name.strip()] = float(value)
+    return weights
+
+
+def _weighted_choice(rng: random.Random, weights: dict[str, float]) -> str:
+    names = list(weights)
+    return rng.choices(names, weights=[weights[n] for n in names], k=1)[0]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def _latency_summary(latencies: list[float]) -> dict:
+    values = sorted(latencies)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 2),
+        "p50_ms": round(_percentile(values, 50) * 1000, 2),
+        "p95_ms": round(_percentile(values, 95) * 1000, 2),
+        "p99_ms": round(_percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2),
+    }
+
+
+def _rss_kb(pid: int | None = None) -> int | None:
+    """Resident set size from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+# ---------- Mock servers ----------
+
+def _wait_for_port(port: int, timeout_s: float = 20.0):
+    deadline = time.time() + timeout_s
+    while time.time() < deadline:
+        with socket.socket() as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.1)
+    raise RuntimeError(f"Mock server on port {port} did not start")
+
+
+def spawn_mocks(ollama_port: int, whisper_port: int, env_overrides: dict[str, str]) -> list[subprocess.Popen]:
+    env = {**os.environ, **env_overrides, "MOCK_OLLAMA_PORT": str(ollama_port), "MOCK_WHISPER_PORT": str(whisper_port)}
+    procs = [
+        subprocess.Popen([sys.executable, "mock_ollama_server.py"], cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL),
+        subprocess.Popen([sys.executable, "mock_whisper_server.py"], cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL),
+    ]
+    _wait_for_port(ollama_port)
+    _wait_for_port(whisper_port)
+    return procs
+
+
+# ---------- Workload ----------
+
+class Workload:
+    def __init__(self, args):
+        self.rng = random.Random(args.seed)
+        self.mix = _parse_weights(args.mix)
+        self.languages = _parse_weights(args.languages)
+        self.cache_hit_ratio = args.cache_hit_ratio
+        self.questions = json.loads((FIXTURES / "questions.json").read_text(encoding="utf-8"))
+        self.hot: dict[str, list[str]] = {lang: qs[: args.hot_set] for lang, qs in self.questions.items()}
+        self._unique = 0
+
+    def next_request(self) -> tuple[str, str, str]:
+        endpoint = _weighted_choice(self.rng, self.mix)
+        language = _weighted_choice(self.rng, self.languages)
+        if self.rng.random() < self.cache_hit_ratio:
+            question = self.rng.choice(self.hot[language])
+        else:
+            # A numbered variant of a real question is never in the cache.
+            self._unique += 1
+            question = f"{self.rng.choice(self.questions[language])} {self._unique}"
+        return endpoint, language, question
+
+
+async def _send(client: httpx.AsyncClient, endpoint: str, language: str, question: str) -> httpx.Response:
+    if endpoint == "process-text":
+        return await client.post("/process-text", json={"text": question, "language": language, "character": "girl"})
+    if endpoint == "process":
+        # The mock Whisper server echoes UTF-8 uploads back as the transcript.
+        files = {"audio": ("question.webm", question.encode("utf-8"), "audio/webm")}
+        return await client.post("/process", files=files, data={"language": language, "character": "girl"})
+    if endpoint == "generate-quiz":
+        return await client.post(
+            "/generate-quiz",
+            json={"topic": question, "explainer": QUIZ_EXPLAINER, "language": language, "selected_class": ""},
+        )
+    raise ValueError(f"Unknown endpoint {endpoint}")
+
+
+async def run_load(client: httpx.AsyncClient, workload: Workload, args) -> dict:
+    # Warm the hot set so cache-hit requests really hit the cache.
+    for language, questions in workload.hot.items():
+        if workload.languages.get(language):
+            for question in questions:
+                await _send(client, "process-text", language, question)
+    await client.post("/metrics/reset")
+
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(args.requests):
+        queue.put_nowait(workload.next_request())
+
+    async def worker():
+        while True:
+            try:
+                endpoint, language, question = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                response = await _send(client, endpoint, language, question)
+                ok = response.status_code == 200 and "error" not in (response.json() or {})
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - started
+            latencies.setdefault(endpoint, []).append(elapsed)
+            if not ok:
+                errors[endpoint] = errors.get(endpoint, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    wall_s = time.perf_counter() - started
+
+    all_latencies = [v for values in latencies.values() for v in values]
+    server_metrics = (await client.get("/metrics")).json()
+    return {
+        "wall_seconds": round(wall_s, 3),
+        "throughput_rps": round(len(all_latencies) / wall_s, 2) if wall_s else 0.0,
+        "overall": _latency_summary(all_latencies),
+        "endpoints": {name: {**_latency_summary(values), "errors": errors.get(name, 0)} for name, values in latencies.items()},
+        "stages": {name: summary for name, summary in server_metrics.get("timings", {}).items() if name.startswith("stage.")},
+        "counters": server_metrics.get("counters", {}),
+    }
+
+
+async def run_in_process(args) -> dict:
+    # Must be configured before the app (and its agents) are imported.
+    os.environ.setdefault("OLLAMA_URL", f"http://127.0.0.1:{args.ollama_port}/api/generate")
+    os.environ.setdefault("WHISPER_URL", f"http://127.0.0.1:{args.whisper_port}/transcribe")
+    os.environ.setdefault("WIKIPEDIA_API_URL", f"http://127.0.0.1:{args.ollama_port}/w/api.php")
+    os.environ.setdefault("OLLAMA_WARMUP_ON_STARTUP", "0")
+    os.environ.setdefault("KEEP_WARM_ENABLED", "0")
+    sys.path.insert(0, str(BACKEND_DIR))
+    from app.main import app
+
+    # ASGITransport does not send lifespan events: run the startup handlers
+    # (curriculum index, storyboard library, quiz bank, langdetect profiles)
+    # ourselves so the numbers match a server started by uvicorn.
+    async with app.router.lifespan_context(app):
+        tracemalloc.start()
+        rss_before = _rss_kb()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            report = await run_load(client, Workload(args), args)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        rss_after = _rss_kb()
+    report["memory"] = {
+        "rss_before_kb": rss_before,
+        "rss_after_kb": rss_after,
+        "rss_growth_kb": (rss_after - rss_before) if rss_before and rss_after else None,
+        "python_heap_growth_kb": current // 1024,
+        "python_heap_peak_kb": peak // 1024,
+    }
+    return report
+
+
+async def run_over_http(args) -> dict:
+    rss_before = _rss_kb(args.server_pid) if args.server_pid else None
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout) as client:
+        report = await run_load(client, Workload(args), args)
+    rss_after = _rss_kb(args.server_pid) if args.server_pid else None
+    report["memory"] = {
+        "rss_before_kb": rss_before,
+        "rss_after_kb": rss_after,
+        "rss_growth_kb": (rss_after - rss_before) if rss_before and rss_after else None,
+    }
+    return report
+
+
+def compare(current: dict, previous: dict):
+    print("\nendpoint         metric      previous     current     change")
+    for name, now in current.get("endpoints", {}).items():
+        before = previous.get("endpoints", {}).get(name, {})
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if metric in now and metric in before and before[metric]:
+                change = (now[metric] - before[metric]) / before[metric] * 100
+                print(f"{name:16} {metric:8} {before[metric]:11.1f} {now[metric]:11.1f} {change:+9.1f}%")
+    prev_rps, now_rps = previous.get("throughput_rps"), current.get("throughput_rps")
+    if prev_rps:
+        print(f"{'throughput':16} {'rps':8} {prev_rps:11.2f} {now_rps:11.2f} {(now_rps - prev_rps) / prev_rps * 100:+9.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["in-process", "http"], default="in-process")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--server-pid", type=int, help="Backend PID for RSS tracking in http mode")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--mix", default="process-text=0.7,process=0.2,generate-quiz=0.1")
+    parser.add_argument("--languages", default="en=0.6,hi=0.1,bn=0.1,ta=0.1,te=0.1")
+    parser.add_argument("--cache-hit-ratio", type=float, default=0.3)
+    parser.add_argument("--hot-set", type=int, default=3, help="Questions per language pre-warmed into the cache")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--spawn-mocks", action="store_true", help="Start mock Ollama/Whisper servers for the run")
+    parser.add_argument("--ollama-port", type=int, default=11434)
+    parser.add_argument("--whisper-port", type=int, default=8001)
+    parser.add_argument("--mock-latency-ms", type=float, default=200)
+    parser.add_argument("--mock-error-rate", type=float, default=0.0)
+    parser.add_argument("--mock-malformed-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Report path (default: benchmarks/results/load_<timestamp>.json)")
+    parser.add_argument("--compare", help="Previous report to compare against")
+    args = parser.parse_args()
+
+    procs = []
+    if args.spawn_mocks:
+        procs = spawn_mocks(
+            args.ollama_port,
+            args.whisper_port,
+            {
+                "MOCK_LATENCY_MS": str(args.mock_latency_ms),
+                "MOCK_ERROR_RATE": str(args.mock_error_rate),
+                "MOCK_MALFORMED_RATE": str(args.mock_malformed_rate),
+                "MOCK_SEED": str(args.seed),
+            },
+        )
+
+    try:
+        runner = run_in_process if args.mode == "in-process" else run_over_http
+        report = asyncio.run(runner(args))
+    finally:
+        for proc in procs:
+            proc.terminate()
+
+    report = {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "config": {k: v for k, v in vars(args).items() if k not in {"output", "compare"}},
+        **report,
+    }
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"load_{datetime.now():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    overall = report["overall"]
+    print(f"✅ {overall.get('count', 0)} requests in {report['wall_seconds']}s ({report['throughput_rps']} req/s)")
+    print(f"   p50={overall.get('p50_ms')}ms p95={overall.get('p95_ms')}ms p99={overall.get('p99_ms')}ms")
+    print(f"   report: {output}")
+
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text(encoding="utf-8")))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Microbenchmarks for the pure-Python helpers that run on the event loop
+for every request, using multilingual fixtures from benchmarks/fixtures/.
+
+Run from kidz-gpt-backend/:
+
+    python -m benchmarks.microbench                      # print + append to history
+    python -m benchmarks.microbench --save-baseline      # record benchmarks/results/micro_baseline.json
+    python -m benchmarks.microbench --max-regression 1.25  # exit 1 if any case is >25% slower than baseline
+
+Every run is appended to benchmarks/results/micro_history.jsonl so the
+numbers can be tracked over time.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import timeit
+from datetime import datetime
+from pathlib import Path
+
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+BASELINE = RESULTS_DIR / "micro_baseline.json"
+HISTORY = RESULTS_DIR / "micro_history.jsonl"
+
+
+def build_cases() -> dict:
+    """name -> zero-argument callable covering every fixture once."""
+    sys.path.insert(0, str(BACKEND_DIR))
+    from agents.script_agent import ScriptAgent
+    from agents.animation_agent import _safe_json_parse
+    from agents import explain_agent
+    from services import animation_script_service
+    from services.safety_service import is_safe, scan_lesson
+    from services.language_service import _detect, detect_language
+
+    outputs = json.loads((FIXTURES / "llm_outputs.json").read_text(encoding="utf-8"))
+    questions = json.loads((FIXTURES / "questions.json").read_text(encoding="utf-8"))
+
+    agent = ScriptAgent()
+    raw_storyboards = list(outputs["storyboards"].items())
+    parsed_storyboards = [(lang, _safe_json_parse(raw)) for lang, raw in raw_storyboards]
+    normalized = [
+        (lang, agent._normalize_storyboard(parsed, lang, "photosynthesis")["scenes"]) for lang, parsed in parsed_storyboards
+    ]
+    dialogue_lines = [scene["dialogue"] for _, scenes in normalized for scene in scenes]
+    all_questions = [q for qs in questions.values() for q in qs]
+    safety_texts = outputs["safety_texts"] + dialogue_lines
+
+    def pick_actions(pick):
+        def run():
+            total = len(dialogue_lines)
+            for idx, line in enumerate(dialogue_lines):
+                pick(line, idx=idx, total=total)
+        return run
+
+    def detect_all():
+        # detect_language logs every uncached call; keep the benchmark output readable.
+        # Clear the memo so the classifier is measured, not the cache.
+        _detect.cache_clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for q in all_questions:
+                detect_language(q)
+
+    return {
+        "script_agent._normalize_dialogue": lambda: [
+            agent._normalize_dialogue(value, lang_code="en") for value in outputs["dialogue_values"]
+        ],
+        "script_agent._normalize_storyboard": lambda: [
+            agent._normalize_storyboard(parsed, lang, "photosynthesis") for lang, parsed in parsed_storyboards
+        ],
+        "animation_script_service._pick_action_from_text": pick_actions(animation_script_service._pick_action_from_text),
+        "explain_agent._pick_action_from_text": pick_actions(explain_agent._pick_action_from_text),
+        "animation_script_service.build_animation_scenes": lambda: [
+            animation_script_service.build_animation_scenes(
+                storyboard_scenes=scenes, explainer={"title": "Photosynthesis"}, language=lang
+            )
+            for lang, scenes in normalized
+        ],
+        "animation_agent._safe_json_parse": lambda: [_safe_json_parse(raw) for _, raw in raw_storyboards],
+        "safety_service.is_safe": lambda: [is_safe(text) for text in safety_texts],
+        "safety_service.scan_lesson": lambda: [scan_lesson(scenes=scenes) for _, scenes in normalized],
+        "language_service.detect_language": detect_all,
+    }
+
+
+def measure(func, repeat: int) -> float:
+    """Best-of-`repeat` microseconds per call."""
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="", help="Only run cases whose name contains this string")
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--max-regression", type=float, help="Fail if current/baseline exceeds this ratio")
+    args = parser.parse_args()
+
+    results = {}
+    for name, func in build_cases().items():
+        if args.filter and args.filter not in name:
+            continue
+        results[name] = round(measure(func, args.repeat), 2)
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))["results"] if baseline_path.exists() else {}
+
+    regressions = []
+    print(f"{'case':52} {'µs/call':>10} {'baseline':>10} {'ratio':>7}")
+    for name, us in results.items():
+        base = baseline.get(name)
+        ratio = us / base if base else None
+        flag = ""
+        if ratio and args.max_regression and ratio > args.max_regression:
+            regressions.append(name)
+            flag = "  ❌"
+        print(f"{name:52} {us:10.2f} {base if base else '-':>10} {f'{ratio:.2f}' if ratio else '-':>7}{flag}")
+
+    record = {"timestamp": datetime.now().isoformat(timespec="seconds"), "python": sys.version.split()[0], "results": results}
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    with HISTORY.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        print(f"✅ Baseline saved to {baseline_path}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} case(s) regressed beyond {args.max_regression}x: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
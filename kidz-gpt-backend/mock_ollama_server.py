@@ -0,0 +1,347 @@
+"""
+Stand-in for Ollama's /api/generate used for hermetic performance testing.
+
+Returns canned, schema-valid JSON for every agent prompt (intent, storyboard,
+explainer, animation, quiz, translation) with configurable latency, error
+rate and malformed-JSON injection. Point the backend at it with:
+
+    OLLAMA_URL=http://localhost:11434/api/generate
+
+Configuration (env at startup, or POST /mock/config at runtime):
+    MOCK_LATENCY_DIST       fixed | uniform | normal | lognormal (default fixed)
+    MOCK_LATENCY_MS         mean latency per call (default 200)
+    MOCK_LATENCY_JITTER_MS  spread for uniform/normal/lognormal (default 50)
+    MOCK_LATENCY_MS_<KIND>  per-prompt-kind mean override (INTENT, STORYBOARD, ...)
+    MOCK_TOKEN_LATENCY_MS   delay between streamed chunks (default 5)
+    MOCK_ERROR_RATE         fraction of calls answered with HTTP 500 (default 0)
+    MOCK_MALFORMED_RATE     fraction of calls answered with broken JSON (default 0)
+    MOCK_SEED               RNG seed for reproducible runs (unset: unseeded)
+
+It also answers the two MediaWiki queries used by wikipedia_service
+(WIKIPEDIA_API_URL=http://localhost:11434/w/api.php).
+"""
+
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+app = FastAPI(title="Mock Ollama")
+
+CONFIG = {
+    "latency_dist": os.getenv("MOCK_LATENCY_DIST", "fixed"),
+    "latency_ms": float(os.getenv("MOCK_LATENCY_MS", "200")),
+    "latency_jitter_ms": float(os.getenv("MOCK_LATENCY_JITTER_MS", "50")),
+    "token_latency_ms": float(os.getenv("MOCK_TOKEN_LATENCY_MS", "5")),
+    "error_rate": float(os.getenv("MOCK_ERROR_RATE", "0")),
+    "malformed_rate": float(os.getenv("MOCK_MALFORMED_RATE", "0")),
+    "latency_ms_by_kind": {},
+}
+
+# Unset means unseeded; 0 is a valid seed.
+_seed = os.getenv("MOCK_SEED", "").strip()
+_rng = random.Random(int(_seed) if _seed else None)
+_stats: dict[str, int] = {}
+_loaded: dict[str, float] = {}
+
+# ---------- Canned content ----------
+
+QUESTION_TYPES = {
+    "what": "what", "why": "why", "how": "how", "when": "when", "where": "where", "who": "who",
+    "क्या": "what", "क्यों": "why", "कैसे": "how", "कब": "when", "कहाँ": "where", "कौन": "who",
+    "কী": "what", "কি": "what", "কেন": "why", "কীভাবে": "how", "কখন": "when", "কোথায়": "where", "কে": "who",
+    "என்ன": "what", "ஏன்": "why", "எப்படி": "how", "எப்போது": "when", "எங்கே": "where", "யார்": "who",
+    "ఏమిటి": "what", "ఎందుకు": "why", "ఎలా": "how", "ఎప్పుడు": "when", "ఎక్కడ": "where", "ఎవరు": "who",
+}
+
+STORY_LINES = {
+    "en": ["{topic} is all around us.", "Let's see how {topic} works step by step.", "Today we learned about {topic}."],
+    "hi": ["{topic} हमारे चारों ओर है।", "चलो देखें कि {topic} कैसे काम करता है।", "आज हमने {topic} के बारे में सीखा।"],
+    "bn": ["{topic} আমাদের চারপাশে আছে।", "চলো দেখি {topic} কীভাবে কাজ করে।", "আজ আমরা {topic} সম্পর্কে শিখলাম।"],
+    "ta": ["{topic} நம்மைச் சுற்றி உள்ளது.", "{topic} எப்படி வேலை செய்கிறது என்று பார்ப்போம்.", "இன்று நாம் {topic} பற்றி கற்றுக்கொண்டோம்."],
+    "te": ["{topic} మన చుట్టూ ఉంది.", "{topic} ఎలా పనిచేస్తుందో చూద్దాం.", "ఈరోజు మనం {topic} గురించి నేర్చుకున్నాం."],
+}
+
+LANG_BY_NAME = {"English": "en", "Hindi": "hi", "Bengali": "bn", "Tamil": "ta", "Telugu": "te"}
+
+VALID_ACTIONS = ["claping", "hello", "bye", "idle", "jump", "neutral", "question", "suprised", "thinking", "walking"]
+
+
+def _detect_kind(system: str, prompt: str) -> str:
+    text = f"{system}\n{prompt}"
+    if "batch intent extractor" in text:
+        return "batch_intent"
+    if "intent" in text and "extractor" in text:
+        return "intent"
+    if "ACTION-ONLY MODE" in text:
+        return "animation_actions"
+    if "animation director" in text:
+        return "animation"
+    if "storyboard" in text:
+        return "storyboard"
+    if "quiz" in text:
+        return "quiz"
+    if "translation engine" in text:
+        return "translate"
+    if "kid-friendly explanation" in text or "kind teacher" in text:
+        return "explainer"
+    return "general"
+
+
+def _language_of(text: str) -> str:
+    for name, code in LANG_BY_NAME.items():
+        if re.search(rf"(?:Language:|utterance is in|in very simple|quiz must be in|into)\s*\n?\s*{name}", text):
+            return code
+    return "en"
+
+
+def _quoted_after(label: str, text: str) -> str:
+    match = re.search(rf"{label}:?\s*\n?\s*\"?([^\"\n]+)\"?", text)
+    return match.group(1).strip() if match else ""
+
+
+def _topic_from_utterance(utterance: str) -> tuple[str, str]:
+    words = re.findall(r"[\wऀ-෿]+", utterance)
+    question_type = "general"
+    kept = []
+    for w in words:
+        qt = QUESTION_TYPES.get(w.lower())
+        if qt and question_type == "general":
+            question_type = qt
+            continue
+        if w.lower() in {"is", "are", "a", "an", "the", "do", "does", "है", "হয়"}:
+            continue
+        kept.append(w)
+    return (" ".join(kept[:6]) or utterance or "learning"), question_type
+
+
+def _payload_for(kind: str, system: str, prompt: str) -> str:
+    text = f"{system}\n{prompt}"
+    lang = _language_of(text)
+
+    if kind == "intent":
+        utterance = _quoted_after("Utterance", prompt)
+        topic, question_type = _topic_from_utterance(utterance)
+        difficulty = re.search(r'"difficulty":"([^"]+)"', prompt)
+        return json.dumps(
+            {"topic": topic, "question_type": question_type, "difficulty": difficulty.group(1) if difficulty else "child"},
+            ensure_ascii=False,
+        )
+
+    if kind == "batch_intent":
+        block = re.search(r"Utterances:\s*\n(.*?)\n\s*\n", prompt, flags=re.S)
+        difficulty = re.search(r'"difficulty":"([^"]+)"', prompt)
+        intents = []
+        for line in (block.group(1).splitlines() if block else []):
+            match = re.match(r"\s*(\d+)\.\s*(.*)$", line)
+            if not match:
+                continue
+            try:
+                utterance = json.loads(match.group(2))
+            except Exception:
+                utterance = match.group(2).strip('"')
+            topic, question_type = _topic_from_utterance(utterance)
+            intents.append(
+                {
+                    "id": int(match.group(1)),
+                    "topic": topic,
+                    "question_type": question_type,
+                    "difficulty": difficulty.group(1) if difficulty else "child",
+                }
+            )
+        return json.dumps({"intents": intents}, ensure_ascii=False)
+
+    if kind == "storyboard":
+        topic = _quoted_after("Topic", prompt) or "this topic"
+        lines = STORY_LINES.get(lang, STORY_LINES["en"])
+        scenes = [
+            {"scene": i + 1, "background": bg, "dialogue": line.format(topic=topic)}
+            for i, (bg, line) in enumerate(zip(["sunny park", "classroom board", "wrap up"], lines))
+        ]
+        return json.dumps({"scenes": scenes}, ensure_ascii=False)
+
+    if kind == "explainer":
+        topic = _quoted_after("Topic", prompt) or "this topic"
+        lines = [line.format(topic=topic) for line in STORY_LINES.get(lang, STORY_LINES["en"])]
+        return json.dumps(
+            {"title": topic, "summary": " ".join(lines[:2]), "points": lines, "wikipedia_keyword": topic},
+            ensure_ascii=False,
+        )
+
+    if kind == "animation":
+        beats = re.search(r"STORYBOARD DIALOGUE BEATS.*?(\[.*?\])\s*\n", prompt, flags=re.S)
+        try:
+            lines = json.loads(beats.group(1)) if beats else []
+        except Exception:
+            lines = []
+        lines = lines or ["Let's learn together!"]
+        scenes = []
+        for i, line in enumerate(lines):
+            action = "hello" if i == 0 else ("bye" if i == len(lines) - 1 else _rng.choice(["thinking", "neutral", "idle", "claping"]))
+            scenes.append(
+                {
+                    "scene_id": i + 1,
+                    "animation": {"action": action, "loop": action in {"thinking", "neutral", "idle"}},
+                    "dialogue": {"text": line},
+                    "duration": 3,
+                }
+            )
+        return json.dumps({"scenes": scenes}, ensure_ascii=False)
+
+    if kind == "animation_actions":
+        block = re.search(r"DIALOGUE LINES:\s*\n(.*?)\n\s*\n", prompt, flags=re.S)
+        count = len(re.findall(r"^\s*\d+\.", block.group(1), flags=re.M)) if block else 0
+        plan = []
+        for i in range(count):
+            action = "hello" if i == 0 else ("bye" if i == count - 1 else _rng.choice(["thinking", "neutral", "idle", "claping"]))
+            plan.append([VALID_ACTIONS.index(action), int(action in {"thinking", "neutral", "idle"}), 3])
+        return json.dumps({"plan": plan})
+
+    if kind == "quiz":
+        topic = _quoted_after("Topic", prompt) or "this topic"
+        questions = [
+            {"question": f"{topic} #{i + 1}?", "options": [f"{topic}", "Something else"], "correctAnswer": 0}
+            for i in range(3)
+        ]
+        return json.dumps({"questions": questions}, ensure_ascii=False)
+
+    if kind == "translate":
+        match = re.search(r"Text:\s*\n(.*)\s*$", prompt, flags=re.S)
+        return (match.group(1).strip() if match else "").strip()
+
+    return json.dumps({"response": "ok"})
+
+
+def _malform(payload: str) -> str:
+    choice = _rng.choice(["truncate", "fence", "prose"])
+    if choice == "truncate":
+        return payload[: max(1, len(payload) // 2)]
+    if choice == "fence":
+        return f"```json\n{payload}\n```"
+    return f"Sure! Here is the answer: {payload[:-1]}"
+
+
+def _sample_latency_s(kind: str) -> float:
+    mean = float(CONFIG["latency_ms_by_kind"].get(kind) or os.getenv(f"MOCK_LATENCY_MS_{kind.upper()}") or CONFIG["latency_ms"])
+    jitter = float(CONFIG["latency_jitter_ms"])
+    dist = CONFIG["latency_dist"]
+    if dist == "uniform":
+        ms = _rng.uniform(mean - jitter, mean + jitter)
+    elif dist == "normal":
+        ms = _rng.gauss(mean, jitter)
+    elif dist == "lognormal" and mean > 0:
+        sigma = math.sqrt(math.log(1 + (jitter / mean) ** 2))
+        ms = _rng.lognormvariate(math.log(mean) - sigma**2 / 2, sigma)
+    else:
+        ms = mean
+    return max(0.0, ms) / 1000
+
+
+def _count(name: str):
+    _stats[name] = _stats.get(name, 0) + 1
+
+
+# ---------- Endpoints ----------
+
+@app.post("/api/generate")
+async def generate(request: Request):
+    body = await request.json()
+    model = body.get("model") or "mock"
+    prompt = str(body.get("prompt") or "")
+    system = str(body.get("system") or "")
+    stream = bool(body.get("stream", True))
+
+    _loaded[model] = time.time()
+
+    # Empty prompt = Ollama's "load the model" call used for warm-up.
+    if not prompt.strip():
+        _count("warmup")
+        return {"model": model, "response": "", "done": True, "done_reason": "load"}
+
+    kind = _detect_kind(system, prompt)
+    _count(f"calls.{kind}")
+
+    await asyncio.sleep(_sample_latency_s(kind))
+
+    if _rng.random() < float(CONFIG["error_rate"]):
+        _count(f"errors.{kind}")
+        return JSONResponse(status_code=500, content={"error": "mock injected failure"})
+
+    payload = _payload_for(kind, system, prompt)
+    if _rng.random() < float(CONFIG["malformed_rate"]):
+        _count(f"malformed.{kind}")
+        payload = _malform(payload)
+
+    if not stream:
+        return {"model": model, "response": payload, "done": True}
+
+    async def chunks():
+        token_delay_s = float(CONFIG["token_latency_ms"]) / 1000
+        for i in range(0, len(payload), 8):
+            yield json.dumps({"model": model, "response": payload[i : i + 8], "done": False}, ensure_ascii=False) + "\n"
+            if token_delay_s:
+                await asyncio.sleep(token_delay_s)
+        yield json.dumps({"model": model, "response": "", "done": True}) + "\n"
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+@app.get("/api/ps")
+async def ps():
+    return {
+        "models": [
+            {"name": m, "model": m, "expires_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(t + 1800)), "size_vram": 0}
+            for m, t in _loaded.items()
+        ]
+    }
+
+
+@app.get("/api/tags")
+async def tags():
+    return {"models": [{"name": m, "model": m} for m in _loaded]}
+
+
+@app.get("/w/api.php")
+async def wikipedia(request: Request):
+    """Minimal MediaWiki search/pageimages stand-in (point WIKIPEDIA_API_URL here)."""
+    params = request.query_params
+    _count("calls.wikipedia")
+    await asyncio.sleep(_sample_latency_s("wikipedia"))
+    if params.get("list") == "search":
+        return {"query": {"search": [{"title": params.get("srsearch") or "Learning"}]}}
+    title = params.get("titles") or "Learning"
+    return {"query": {"pages": {"1": {"title": title, "thumbnail": {"source": f"https://upload.example/{title}.png"}}}}}
+
+
+@app.get("/mock/config")
+async def get_config():
+    return CONFIG
+
+
+@app.post("/mock/config")
+async def update_config(request: Request):
+    """Change latency/error settings between benchmark phases."""
+    global _rng
+    body = await request.json()
+    for k, v in body.items():
+        if k == "seed":
+            _rng = random.Random(int(v))
+        elif k in CONFIG:
+            CONFIG[k] = v
+    return CONFIG
+
+
+@app.get("/mock/stats")
+async def get_stats():
+    return dict(sorted(_stats.items()))
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("MOCK_OLLAMA_PORT", "11434")))
@@ -0,0 +1,64 @@
+"""
+Stand-in for whisper_server.py's /transcribe used for hermetic performance testing.
+
+If the uploaded "audio" is UTF-8 text it is returned as the transcript, so
+load tests can choose the question per request; otherwise a canned question
+in the requested language is returned. Point the backend at it with:
+
+    WHISPER_URL=http://localhost:8001/transcribe
+
+Configuration (env):
+    MOCK_STT_LATENCY_MS      mean latency per call (default 300)
+    MOCK_STT_JITTER_MS       uniform jitter (default 100)
+    MOCK_STT_ERROR_RATE      fraction of calls answered with HTTP 500 (default 0)
+    MOCK_SEED                RNG seed for reproducible runs (unset: unseeded)
+"""
+
+import asyncio
+import os
+import random
+
+from fastapi import FastAPI, UploadFile, File, Form
+from fastapi.responses import JSONResponse
+import uvicorn
+
+app = FastAPI(title="Mock Whisper")
+
+# Unset means unseeded; 0 is a valid seed.
+_seed = os.getenv("MOCK_SEED", "").strip()
+_rng = random.Random(int(_seed) if _seed else None)
+
+CANNED = {
+    "en": "What is photosynthesis?",
+    "hi": "प्रकाश संश्लेषण क्या है?",
+    "bn": "সালোকসংশ্লেষণ কী?",
+    "ta": "ஒளிச்சேர்க்கை என்றால் என்ன?",
+    "te": "కిరణజన్య సంయోగక్రియ అంటే ఏమిటి?",
+}
+
+
+@app.post("/transcribe")
+async def transcribe_audio(file: UploadFile = File(...), language: str = Form("auto")):
+    audio_bytes = await file.read()
+
+    mean_ms = float(os.getenv("MOCK_STT_LATENCY_MS", "300"))
+    jitter_ms = float(os.getenv("MOCK_STT_JITTER_MS", "100"))
+    await asyncio.sleep(max(0.0, _rng.uniform(mean_ms - jitter_ms, mean_ms + jitter_ms)) / 1000)
+
+    if _rng.random() < float(os.getenv("MOCK_STT_ERROR_RATE", "0")):
+        return JSONResponse(status_code=500, content={"error": "mock injected failure"})
+
+    lang = (language or "").strip().lower().split("-")[0]
+    if lang not in CANNED:
+        lang = "en"
+
+    try:
+        text = audio_bytes.decode("utf-8").strip()
+    except UnicodeDecodeError:
+        text = ""
+
+    return {"text": text or CANNED[lang], "language": lang}
+
+
+if __name__ == "__main__":
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("MOCK_WHISPER_PORT", "8001")))
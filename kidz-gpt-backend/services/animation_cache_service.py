@@ -0,0 +1,88 @@
+"""
+Animation plan caches.
+
+- Plan cache: full animation_scenes keyed by a hash of (dialogue lines,
+  language, character, planner), so a storyboard animated before is never
+  planned again even when its lesson cache entry is gone.
+- Line cache: {action, loop, duration} per (line, language, role), where role
+  is the line's position (opening / middle / closing). Common openers and
+  closers are planned once and never sent to the LLM again.
+
+Both are in-process LRUs bounded by ANIMATION_PLAN_CACHE_SIZE and
+ANIMATION_LINE_CACHE_SIZE.
+"""
+
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import os
+
+from services import metrics_service as metrics
+
+
+_plans: OrderedDict[str, list] = OrderedDict()
+_lines: OrderedDict[str, dict] = OrderedDict()
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha1(json.dumps(parts, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def _put(store: OrderedDict, cache_key: str, value, limit_env: str, default_limit: int):
+    store[cache_key] = value
+    store.move_to_end(cache_key)
+    limit = int(os.getenv(limit_env, str(default_limit)))
+    while len(store) > limit:
+        store.popitem(last=False)
+
+
+def plan_key(lines: list[str], *, language: str, character: str, planner: str, title: str = "") -> str:
+    lang = (language or "en").lower().split("-")[0]
+    return _digest([line.strip() for line in lines], lang, character, planner, title)
+
+
+def get_plan(cache_key: str) -> list | None:
+    plan = _plans.get(cache_key)
+    if plan is None:
+        metrics.incr("animation.plan_cache_miss")
+        return None
+    _plans.move_to_end(cache_key)
+    metrics.incr("animation.plan_cache_hit")
+    return copy.deepcopy(plan)
+
+
+def set_plan(cache_key: str, scenes: list):
+    if scenes:
+        _put(_plans, cache_key, copy.deepcopy(scenes), "ANIMATION_PLAN_CACHE_SIZE", 512)
+
+
+def line_role(idx: int, total: int) -> str:
+    if idx == 0:
+        return "opening"
+    if idx == total - 1:
+        return "closing"
+    return "middle"
+
+
+def _line_key(line: str, language: str, role: str) -> str:
+    return _digest(line.strip(), (language or "en").lower().split("-")[0], role)
+
+
+def get_line(line: str, *, language: str, role: str) -> dict | None:
+    cache_key = _line_key(line, language, role)
+    step = _lines.get(cache_key)
+    if step is None:
+        metrics.incr("animation.line_cache_miss")
+        return None
+    _lines.move_to_end(cache_key)
+    metrics.incr("animation.line_cache_hit")
+    return dict(step)
+
+
+def set_line(line: str, step: dict, *, language: str, role: str):
+    _put(_lines, _line_key(line, language, role), dict(step), "ANIMATION_LINE_CACHE_SIZE", 4096)
+
+
+def cache_stats() -> dict:
+    return {"plans": len(_plans), "lines": len(_lines)}
@@ -21,38 +21,157 @@ VALID_ACTIONS = {
 }
 
 
+# Keyword cues per action in every supported language. English cues are
+# matched on word boundaries; Indic cues at a word start with any suffix,
+# since `\b` is not reliable next to vowel signs and viramas and words take
+# suffixes.
+_CUES = {
+    "bye": {
+        "en": ["bye", "goodbye", "see you", "that's all", "thats all", "we learned", "today we learned"],
+        "hi": ["अलविदा", "फिर मिलेंगे", "सीखा", "टाटा"],
+        "bn": ["বিদায়", "আবার দেখা হবে", "শিখলাম", "টাটা"],
+        "ta": ["பை பை", "மீண்டும் சந்திப்போம்", "கற்றுக்கொண்டோம்", "போய் வருகிறேன்"],
+        "te": ["బై", "మళ్ళీ కలుద్దాం", "నేర్చుకున్నాం", "వీడ్కోలు"],
+    },
+    "claping": {
+        "en": ["great job", "awesome", "yay", "well done", "good job", "you did it", "high five", "bravo"],
+        "hi": ["शाबाश", "बहुत बढ़िया", "बहुत अच्छे", "तालियाँ", "तुमने कर दिखाया"],
+        "bn": ["শাবাশ", "দারুণ", "খুব ভালো", "হাততালি"],
+        "ta": ["சபாஷ்", "அருமை", "மிகவும் நல்லது", "கைதட்டு"],
+        "te": ["శభాష్", "భలే", "చాలా బాగుంది", "చప్పట్లు"],
+    },
+    "thinking": {
+        "en": ["hmm", "think", "imagine", "imagining", "let's think", "lets think", "picture this", "wonder"],
+        "hi": ["सोचो", "सोचिए", "कल्पना", "हम्म"],
+        "bn": ["ভাবো", "ভেবে দেখো", "কল্পনা"],
+        "ta": ["யோசி", "சிந்தி", "கற்பனை"],
+        "te": ["ఆలోచించు", "ఆలోచిద్దాం", "ఊహించు"],
+    },
+    "suprised": {
+        "en": ["wow", "surprise", "surprising", "amazing", "whoa", "oh no", "oops", "incredible"],
+        "hi": ["वाह", "अरे", "अद्भुत", "कमाल", "हैरान"],
+        "bn": ["বাহ", "আরে", "অবাক", "আশ্চর্য"],
+        "ta": ["ஆஹா", "அடடா", "ஆச்சரியம்", "அற்புதம்"],
+        "te": ["వావ్", "అబ్బా", "ఆశ్చర్యం", "అద్భుతం"],
+    },
+    "walking": {
+        "en": ["walk", "let's go", "lets go", "come along", "follow me"],
+        "hi": ["चलो चलें", "आओ चलें", "चलते हैं", "मेरे साथ आओ"],
+        "bn": ["চলো যাই", "হাঁটি", "আমার সাথে এসো"],
+        "ta": ["போவோம்", "நடப்போம்", "என்னுடன் வா"],
+        "te": ["వెళ్దాం", "నడుద్దాం", "నాతో రా"],
+    },
+    "jump": {
+        "en": ["jump", "hop", "bounce"],
+        "hi": ["कूद", "उछल"],
+        "bn": ["লাফ"],
+        "ta": ["குதி"],
+        "te": ["దూకు", "గెంతు"],
+    },
+}
+
+# Checked in this order; the first action with a cue in the line wins.
+_CUE_PRIORITY = ["claping", "thinking", "suprised", "walking", "jump"]
+
+
+# English cues also match inflected forms ("thinking", "wondered", "walks").
+_EN_SUFFIX = r"(?:s|es|ed|d|ing|er|ers|y)?"
+# Letters, digits and the Indic blocks, as in safety_service.
+_WORD = r"\w\u0900-\u0DFF"
+
+
+def _compile_cues(cues: Dict[str, List[str]]) -> "re.Pattern[str]":
+    english = "|".join(re.escape(k) for k in sorted(cues.get("en", []), key=len, reverse=True))
+    indic = "|".join(
+        re.escape(k) for lang, words in cues.items() if lang != "en" for k in sorted(words, key=len, reverse=True)
+    )
+    parts = [rf"\b(?:{english}){_EN_SUFFIX}\b"] if english else []
+    if indic:
+        # Word start only: Tamil "குதி" (jump) must not fire inside "பகுதி" (part).
+        parts.append(rf"(?<![{_WORD}])(?:{indic})")
+    return re.compile("|".join(parts), flags=re.IGNORECASE)
+
+
+_CUE_PATTERNS = {action: _compile_cues(cues) for action, cues in _CUES.items()}
+
+_QUESTION_START = re.compile(r"^(?:do|did|can|could|would|have|has|why|what|how|when|where|who|is|are)\b", re.IGNORECASE)
+
+# Words per second of child-paced TTS; agglutinative scripts pack more into a word.
+SPEECH_RATE_WPS = {"en": 2.5, "hi": 2.4, "bn": 2.2, "ta": 1.7, "te": 1.8}
+
+# Actions that read as "talking" and can fill any line.
+_TALKING_ACTIONS = ["neutral", "idle", "thinking"]
+_LOOPING_ACTIONS = {"idle", "neutral", "thinking", "walking"}
+
+# Expressive actions look forced when repeated; allow each this many times per lesson.
+MAX_EXPRESSIVE_REPEATS = 2
+
+
 def _pick_action_from_text(text: str, *, idx: int, total: int) -> str:
-    t = (text or "").strip().lower()
+    raw = (text or "").strip()
 
     # Strong positional defaults
     if idx == 0:
         return "hello"
-    if idx == total - 1:
+    if idx == total - 1 and _CUE_PATTERNS["bye"].search(raw):
         # If the final line sounds like a wrap-up, end with bye.
-        if any(k in t for k in ["bye", "goodbye", "see you", "that's all", "thats all", "we learned", "today we learned"]):
-            return "bye"
+        return "bye"
 
-    # Keyword-driven picks
-    if any(k in t for k in ["great job", "awesome", "yay", "well done", "good job", "you did it", "high five"]):
+    if _CUE_PATTERNS["claping"].search(raw):
         return "claping"
 
-    if "?" in (text or "") or re.match(r"^(do|did|can|could|would|have|has|why|what|how|when|where)\b", t):
+    if raw.endswith(("?", "？")) or "?" in raw or _QUESTION_START.match(raw):
         return "question"
 
-    if any(k in t for k in ["hmm", "think", "imagine", "let's think", "lets think", "picture this"]):
-        return "thinking"
+    for action in _CUE_PRIORITY[1:]:
+        if _CUE_PATTERNS[action].search(raw):
+            return action
+
+    # Gentle alternation to avoid looking frozen
+    return "neutral" if idx % 2 == 0 else "idle"
+
 
-    if any(k in t for k in ["wow", "surprise", "amazing", "whoa", "oh no", "oops"]):
-        return "suprised"
+def estimate_duration(text: str, language: str = "en") -> float:
+    """Seconds needed to speak `text`, rounded to half a second and clamped to 2-12."""
+    lang = (language or "en").lower().split("-")[0]
+    words = len((text or "").split())
+    seconds = words / SPEECH_RATE_WPS.get(lang, SPEECH_RATE_WPS["en"]) + 0.5
+    return max(2.0, min(12.0, round(seconds * 2) / 2))
 
-    if any(k in t for k in ["walk", "let's go", "lets go", "come along"]):
-        return "walking"
 
-    if any(k in t for k in ["jump", "hop"]):
-        return "jump"
+def plan_actions(lines: List[str], *, language: str = "en", framed: bool = False) -> List[Dict[str, Any]]:
+    """Pick {action, loop, duration} per dialogue line with variety rules applied.
 
-    # Gentle alternation to avoid looking frozen
-    return "neutral" if idx % 2 == 0 else "idle"
+    - hello only opens and bye only closes the lesson; with `framed`, separate
+      opener/closer scenes do that and the lines themselves get neither
+    - the same action never plays on two consecutive lines
+    - expressive actions appear at most MAX_EXPRESSIVE_REPEATS times
+    """
+    # Framed lines sit between the opener and the closer, never at either end.
+    offset, total = (1, len(lines) + 2) if framed else (0, len(lines))
+    plan: List[Dict[str, Any]] = []
+    used: Dict[str, int] = {}
+    previous = "hello" if framed else None
+    for idx, line in enumerate(lines):
+        action = _pick_action_from_text(line, idx=idx + offset, total=max(1, total))
+        if action not in VALID_ACTIONS:
+            action = "neutral"
+
+        expressive = action not in _TALKING_ACTIONS and action not in {"hello", "bye"}
+        if (expressive and used.get(action, 0) >= MAX_EXPRESSIVE_REPEATS) or action == previous:
+            action = next(a for a in _TALKING_ACTIONS[idx % 3 :] + _TALKING_ACTIONS if a != previous)
+
+        used[action] = used.get(action, 0) + 1
+        previous = action
+        plan.append(
+            {
+                "action": action,
+                # Loop if it's an explanatory line; don't loop for greetings/celebrations.
+                "loop": action in _LOOPING_ACTIONS,
+                "duration": estimate_duration(line, language),
+            }
+        )
+    return plan
 
 
 def build_animation_scenes(
@@ -84,7 +203,8 @@ def build_animation_scenes(
     out: List[Dict[str, Any]] = []
 
     # Optional, English-only interaction scenes (safe for now; avoids mixing languages).
-    if lang == "en":
+    framed = lang == "en"
+    if framed:
         title = (explainer or {}).get("title") or ""
         opener = "Hi! I'm your learning buddy. Let's learn together!"
         if title:
@@ -95,30 +215,25 @@ def build_animation_scenes(
                 "character": character,
                 "animation": {"action": "hello", "loop": False},
                 "dialogue": {"text": opener},
-                "duration": 3,
+                "duration": estimate_duration(opener, lang),
             }
         )
 
-    total = len(storyboard_scenes or [])
+    beats = []
     for idx, s in enumerate(storyboard_scenes or []):
         dialogue = str((s or {}).get("dialogue") or "").strip()
-        if not dialogue:
-            continue
-
-        action = _pick_action_from_text(dialogue, idx=idx, total=max(1, total))
-        if action not in VALID_ACTIONS:
-            action = "neutral"
-
-        # Loop if it's an explanatory line; don't loop for greetings/celebrations.
-        loop = action in {"idle", "neutral", "thinking", "walking"}
+        if dialogue:
+            beats.append((int((s or {}).get("scene") or (idx + 1)), dialogue))
 
+    plan = plan_actions([dialogue for _, dialogue in beats], language=lang, framed=framed)
+    for (scene_id, dialogue), step in zip(beats, plan):
         out.append(
             {
-                "scene_id": int((s or {}).get("scene") or (idx + 1)),
+                "scene_id": scene_id,
                 "character": character,
-                "animation": {"action": action, "loop": loop},
+                "animation": {"action": step["action"], "loop": step["loop"]},
                 "dialogue": {"text": dialogue},
-                "duration": 4,
+                "duration": step["duration"],
             }
         )
 
@@ -135,14 +250,14 @@ def build_animation_scenes(
         ]
 
     # English-only closer to make it feel interactive.
-    if lang == "en":
+    if framed:
         out.append(
             {
                 "scene_id": 999,
                 "character": character,
                 "animation": {"action": "bye", "loop": False},
                 "dialogue": {"text": "Want to ask me another question?"},
-                "duration": 3,
+                "duration": estimate_duration("Want to ask me another question?", lang),
             }
         )
 
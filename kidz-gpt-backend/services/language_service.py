@@ -1,5 +1,47 @@
-from langdetect import detect, detect_langs
-import re
+from functools import lru_cache
+
+from langdetect import DetectorFactory, detect_langs
+from langdetect.detector_factory import init_factory
+
+# langdetect samples randomly; a fixed seed makes the same text give the same answer.
+DetectorFactory.seed = 0
+
+# Full Unicode blocks of the supported Indic scripts.
+SCRIPT_RANGES = {
+    "hi": (0x0900, 0x097F),  # Devanagari
+    "bn": (0x0980, 0x09FF),  # Bengali
+    "ta": (0x0B80, 0x0BFF),  # Tamil
+    "te": (0x0C00, 0x0C7F),  # Telugu
+}
+
+# Share of the letters that must be Indic for the script to decide on its own.
+# Low on purpose: kids mix English science words into Hindi/Bengali/... questions.
+INDIC_SHARE = 0.2
+
+
+def preload_profiles():
+    """Load langdetect's language profiles now instead of on the first request."""
+    init_factory()
+
+
+def script_histogram(text):
+    """Letter counts per Indic script plus "latin" and "other", in one pass over the text."""
+    counts = {"latin": 0, "other": 0}
+    for ch in text:
+        code = ord(ch)
+        if code < 0x0900:
+            if ch.isalpha():
+                counts["latin" if code < 0x0250 else "other"] += 1
+            continue
+        for lang, (low, high) in SCRIPT_RANGES.items():
+            if low <= code <= high:
+                counts[lang] = counts.get(lang, 0) + 1
+                break
+        else:
+            if ch.isalpha():
+                counts["other"] += 1
+    return counts
+
 
 def detect_language(text):
     """
@@ -8,55 +50,27 @@ def detect_language(text):
     """
     if not text or text.strip() == "":
         return "unknown"
-    
+    return _detect(text.strip())
+
+
+@lru_cache(maxsize=1024)
+def _detect(text):
+    # The same transcript is checked more than once per request; log only the first time.
+    counts = script_histogram(text)
+    indic = {lang: n for lang, n in counts.items() if lang in SCRIPT_RANGES}
+    letters = sum(counts.values())
+    if indic and sum(indic.values()) >= INDIC_SHARE * letters:
+        lang = max(indic, key=indic.get)
+        print(f"🔍 Language detected from script: {lang}")
+        return lang
+    if not letters:
+        return "unknown"
+
+    # Latin (or another script we do not teach in): let langdetect tell the languages apart.
     try:
-        # Try to get probabilities for better confidence
-        try:
-            detected_langs = detect_langs(text)
-            if detected_langs and len(detected_langs) > 0:
-                # Get the language with highest probability
-                top_lang = detected_langs[0]
-                lang_code = top_lang.lang
-                confidence = top_lang.prob
-                print(f"🔍 Language detection: {lang_code} (confidence: {confidence:.2f})")
-                return lang_code
-        except:
-            pass
-        
-        # Fallback to basic detect if probabilities fail
-        result = detect(text)
-        print(f"🔍 Language detected: {result}")
-        return result
-        
+        top_lang = detect_langs(text)[0]
     except Exception as e:
         print(f"⚠️ Language detection failed: {e}")
-        # Check for script-based detection as last resort
-        if _contains_devanagari(text):
-            return "hi"
-        elif _contains_bengali(text):
-            return "bn"
-        elif _contains_tamil(text):
-            return "ta"
-        elif _contains_telugu(text):
-            return "te"
         return "unknown"
-
-def _contains_devanagari(text):
-    """Check if text contains Devanagari script (Hindi, Sanskrit, Marathi)."""
-    devanagari_range = re.compile(r'[\u0900-\u097F]')
-    return bool(devanagari_range.search(text))
-
-def _contains_bengali(text):
-    """Check if text contains Bengali script."""
-    bengali_range = re.compile(r'[\u0980-\u09FF]')
-    return bool(bengali_range.search(text))
-
-def _contains_tamil(text):
-    """Check if text contains Tamil script."""
-    tamil_range = re.compile(r'[\u0B80-\u0BFF]')
-    return bool(tamil_range.search(text))
-
-def _contains_telugu(text):
-    """Check if text contains Telugu script."""
-    telugu_range = re.compile(r'[\u0C60-\u0C7F]')
-    return bool(telugu_range.search(text))
+    print(f"🔍 Language detection: {top_lang.lang} (confidence: {top_lang.prob:.2f})")
+    return top_lang.lang
@@ -0,0 +1,133 @@
+"""
+Cross-language lesson reuse ("generate once, translate many").
+
+Lessons are indexed by the canonical English form of their question and
+the grade. When the same question arrives in another language and a lesson
+already exists in some language, its storyboard, explainer and intent are
+translated in one batch per request instead of running the full LLM chain
+again, and its animation plan is kept line by line. Opt-in with
+LESSON_TRANSLATE_REUSE=1.
+"""
+
+from collections import OrderedDict
+import copy
+import os
+import re
+
+from services import metrics_service as metrics
+from services.animation_script_service import estimate_duration
+from services.translation_service import translate_batch, translate_text
+
+
+# (canonical question, grade) -> {language: job_id}
+_index: OrderedDict[tuple[str, str], dict[str, str]] = OrderedDict()
+
+_NON_WORD = re.compile(r"[?!.,;:()\[\]{}\"'“”‘’।॥¿¡-]+")
+_SPACES = re.compile(r"\s+")
+
+# Opener (0) and closer (999) scenes the animation builder adds for English only.
+_FRAME_SCENE_IDS = {0, 999}
+
+
+def enabled() -> bool:
+    return os.getenv("LESSON_TRANSLATE_REUSE", "0") == "1"
+
+
+def _grade(selected_class: str | None) -> str:
+    return (selected_class or "").strip().lower()
+
+
+async def canonical_question(text: str, language: str) -> str:
+    """Lowercased, punctuation-free English form of the question."""
+    lang = (language or "en").strip().lower().split("-")[0]
+    english = text if lang == "en" else await translate_text(text, "en")
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", (english or "").lower())).strip()
+
+
+def register(canonical: str, selected_class: str | None, language: str, job_id: str):
+    if not canonical:
+        return
+    key = (canonical, _grade(selected_class))
+    _index.setdefault(key, {})[language] = job_id
+    _index.move_to_end(key)
+    limit = int(os.getenv("LESSON_REUSE_INDEX_SIZE", "4096"))
+    while len(_index) > limit:
+        _index.popitem(last=False)
+
+
+def find_source(canonical: str, selected_class: str | None, language: str) -> str | None:
+    """job_id of the same lesson in another language, English first."""
+    by_lang = _index.get((canonical, _grade(selected_class))) or {}
+    others = [lang for lang in by_lang if lang != language]
+    if not others:
+        return None
+    return by_lang["en"] if "en" in others else by_lang[others[0]]
+
+
+def _reuse_animation(source: dict, dialogues: list[str], language: str) -> list | None:
+    """Source animation steps with translated text, or None if the plan cannot be mapped.
+
+    English plans carry English-only opener/closer scenes, so a plan is only
+    reused when source and target are both framed or both unframed.
+    """
+    source_lang = source.get("language") or "en"
+    if (source_lang == "en") != (language == "en"):
+        return None
+    by_scene = {int(s.get("scene") or i + 1): d for i, (s, d) in enumerate(zip(source.get("scenes", []), dialogues))}
+    animation = []
+    for step in copy.deepcopy(source.get("animation_scenes") or []):
+        scene_id = step.get("scene_id")
+        if scene_id in _FRAME_SCENE_IDS:
+            animation.append(step)
+            continue
+        if scene_id not in by_scene:
+            return None
+        step["dialogue"] = {"text": by_scene[scene_id]}
+        step["duration"] = estimate_duration(by_scene[scene_id], language)
+        animation.append(step)
+    return animation or None
+
+
+async def translate_lesson(source: dict, language: str) -> dict | None:
+    """Lesson payload translated into `language`, or None when translation failed.
+
+    All strings (dialogue, intent topic, explainer title/summary/points) go
+    through one translate_batch call. `animation_scenes` is None when the
+    plan has to be rebuilt for the target language.
+    """
+    scenes = source.get("scenes") or []
+    explainer = source.get("explainer") or {}
+    points = [str(p) for p in explainer.get("points") or []]
+    dialogues = [str(s.get("dialogue") or "") for s in scenes]
+    strings = dialogues + [
+        str((source.get("intent") or {}).get("topic") or ""),
+        str(explainer.get("title") or ""),
+        str(explainer.get("summary") or ""),
+    ] + points
+
+    translated = await translate_batch(strings, language)
+    new_dialogues = translated[: len(dialogues)]
+    topic, title, summary = translated[len(dialogues) : len(dialogues) + 3]
+    new_points = translated[len(dialogues) + 3 :]
+
+    # translate_batch returns the input on failure; a mostly untranslated
+    # lesson is worse than generating a fresh one.
+    unchanged = sum(1 for old, new in zip(dialogues, new_dialogues) if old.strip() == new.strip())
+    if not dialogues or unchanged * 2 > len(dialogues):
+        metrics.incr("lesson_reuse.translation_failed")
+        return None
+
+    metrics.incr("lesson_reuse.translated")
+    return {
+        "intent": {**(source.get("intent") or {}), "topic": topic},
+        "scenes": [
+            {**{k: v for k, v in s.items() if k not in ("audio", "duration", "character")}, "dialogue": d}
+            for s, d in zip(scenes, new_dialogues)
+        ],
+        "explainer": {**explainer, "title": title, "summary": summary, "points": new_points},
+        "animation_scenes": _reuse_animation(source, new_dialogues, language),
+    }
+
+
+def reuse_stats() -> dict:
+    return {"questions": len(_index), "lessons": sum(len(v) for v in _index.values())}
@@ -0,0 +1,165 @@
+"""
+Priority-aware scheduler for Ollama request slots.
+
+Every agent call acquires a slot before talking to Ollama. Interactive
+pipeline stages always go first; background work (quiz pre-generation,
+prefetch, warm-up, deferred explainers) only uses spare capacity and never
+takes the slots reserved for interactive requests. Waiting background jobs
+age up in priority so the oldest ones are served first, but they never
+overtake an interactive request.
+
+The priority is carried in a context variable, so code that spawns
+background tasks wraps them in `llm_priority(...)` instead of threading a
+parameter through every agent.
+"""
+
+from contextlib import asynccontextmanager, contextmanager
+import asyncio
+import contextvars
+import itertools
+import os
+import time
+
+from services import metrics_service as metrics
+
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFERRED = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_WARMUP = 3
+
+PRIORITY_NAMES = {
+    PRIORITY_INTERACTIVE: "interactive",
+    PRIORITY_DEFERRED: "deferred",
+    PRIORITY_BACKGROUND: "background",
+    PRIORITY_WARMUP: "warmup",
+}
+
+_current_priority: contextvars.ContextVar[int] = contextvars.ContextVar("llm_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """Run the enclosed code (and tasks created inside it) at `priority`."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> int:
+    return _current_priority.get()
+
+
+class LLMScheduler:
+    def __init__(self, max_slots: int, reserved_interactive: int = 1, aging_seconds: float = 10.0):
+        self.max_slots = max(1, max_slots)
+        self.reserved_interactive = max(0, min(reserved_interactive, self.max_slots - 1))
+        self.aging_seconds = max(0.001, aging_seconds)
+        self._in_use = 0
+        self._waiters: list[dict] = []
+        self._seq = itertools.count()
+
+    def _effective_priority(self, waiter: dict, now: float) -> float:
+        base = waiter["priority"]
+        if base == PRIORITY_INTERACTIVE:
+            return base
+        aged = base - (now - waiter["enqueued_at"]) / self.aging_seconds
+        # Background work can age up to the best background level, never past interactive.
+        return max(PRIORITY_DEFERRED, aged)
+
+    def _can_admit(self, priority: int) -> bool:
+        if priority == PRIORITY_INTERACTIVE:
+            return self._in_use < self.max_slots
+        return self._in_use < self.max_slots - self.reserved_interactive
+
+    def _dispatch(self):
+        now = time.monotonic()
+        while self._waiters:
+            best = min(self._waiters, key=lambda w: (self._effective_priority(w, now), w["seq"]))
+            if not self._can_admit(best["priority"]):
+                return
+            self._waiters.remove(best)
+            # A waiter cancelled before it ran its cleanup still sits in the queue.
+            if best["future"].done():
+                continue
+            self._in_use += 1
+            best["future"].set_result(None)
+
+    async def acquire(self, priority: int | None = None):
+        priority = current_priority() if priority is None else priority
+        name = PRIORITY_NAMES.get(priority, str(priority))
+        started = time.monotonic()
+
+        if not self._waiters and self._can_admit(priority):
+            self._in_use += 1
+            metrics.observe(f"llm_scheduler.wait.{name}", 0.0)
+            return
+
+        waiter = {
+            "priority": priority,
+            "seq": next(self._seq),
+            "enqueued_at": started,
+            "future": asyncio.get_running_loop().create_future(),
+        }
+        self._waiters.append(waiter)
+        self._dispatch()
+        try:
+            await waiter["future"]
+        except asyncio.CancelledError:
+            if waiter["future"].done() and not waiter["future"].cancelled():
+                # The slot was granted just as we were cancelled: hand it back.
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+        metrics.observe(f"llm_scheduler.wait.{name}", time.monotonic() - started)
+
+    def release(self):
+        self._in_use = max(0, self._in_use - 1)
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, priority: int | None = None):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def saturated(self) -> bool:
+        """True when every slot is busy and callers are already queueing."""
+        return self._in_use >= self.max_slots and bool(self._waiters)
+
+    def stats(self) -> dict:
+        waiting: dict[str, int] = {}
+        for w in self._waiters:
+            name = PRIORITY_NAMES.get(w["priority"], str(w["priority"]))
+            waiting[name] = waiting.get(name, 0) + 1
+        return {
+            "max_slots": self.max_slots,
+            "reserved_interactive": self.reserved_interactive,
+            "in_use": self._in_use,
+            "waiting": waiting,
+        }
+
+
+scheduler = LLMScheduler(
+    max_slots=int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4")),
+    reserved_interactive=int(os.getenv("OLLAMA_INTERACTIVE_RESERVED_SLOTS", "1")),
+    aging_seconds=float(os.getenv("LLM_AGING_SECONDS", "10")),
+)
+
+
+def llm_slot(priority: int | None = None):
+    """`async with llm_slot():` around every Ollama call."""
+    return scheduler.slot(priority)
+
+
+def scheduler_saturated() -> bool:
+    return scheduler.saturated()
+
+
+def scheduler_stats() -> dict:
+    return scheduler.stats()
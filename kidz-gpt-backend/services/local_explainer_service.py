@@ -0,0 +1,67 @@
+"""
+Extractive explainer built from the storyboard of the same request.
+
+The storyboard already answers the child's question in the right language
+and grade, so the explainer card (title, summary, points, wikipedia_keyword)
+can be assembled from its lines without another LLM call. Used when the
+explainer LLM is too slow, fails, or the LLM scheduler is saturated.
+"""
+
+import re
+
+
+# Openers / wrap-ups that carry no content of their own.
+_FILLER_PREFIXES = (
+    "today we learned", "today we will learn", "remember:", "let's learn", "let's see",
+    "आज हमने", "आज याद रखो", "चलो",
+    "আজ আমরা", "মনে রেখো", "চলো",
+    "இன்று நாம்", "நினைவில் வை",
+    "ఈరోజు మనం", "గుర్తుంచుకో",
+)
+
+# A greeting opening a line is dropped, the rest of the line is kept ("Hello! Plants make food.").
+_GREETING = re.compile(
+    r"^(?:hi|hello|hey|नमस्ते|নমস্কার|வணக்கம்|నమస్తే)(?:[\s,]+(?:there|friends|kids|everyone))*(?![\w\u0900-\u0DFF])[\s!,.]*",
+    re.IGNORECASE,
+)
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+_SPACES = re.compile(r"\s+")
+
+
+def _content_lines(scenes: list) -> list[str]:
+    lines = []
+    for scene in scenes or []:
+        text = _SPACES.sub(" ", str((scene or {}).get("dialogue") or "")).strip()
+        text = _GREETING.sub("", text)
+        if not text or text.endswith("?") or text.lower().startswith(_FILLER_PREFIXES):
+            continue
+        if text not in lines:
+            lines.append(text)
+    return lines
+
+
+def _first_sentence(text: str) -> str:
+    sentence = _SENTENCE_END.split(text, maxsplit=1)[0].strip()
+    return sentence if re.search(r"[.!?।]$", sentence) else f"{sentence}."
+
+
+def build_explainer(*, intent: dict, scenes: list, question: str = "", language: str = "en") -> dict | None:
+    """Explainer dict in the ExplainAgent shape, or None if the storyboard has too little content."""
+    lines = _content_lines(scenes)
+    if not lines:
+        return None
+
+    lang = (language or "en").strip().lower().split("-")[0]
+    topic = str((intent or {}).get("topic") or "").strip() or (question or "").strip()
+    title = topic[:1].upper() + topic[1:] if lang == "en" else topic
+
+    summary = " ".join(lines[:2])
+    points = [_first_sentence(line) for line in (lines[1:4] if len(lines) >= 3 else lines[:3])]
+
+    return {
+        "title": title,
+        "summary": summary,
+        "points": points,
+        "wikipedia_keyword": topic,
+        "image_url": None,
+    }
@@ -0,0 +1,154 @@
+"""
+Rule-based intent classifier for simple questions.
+Detects question_type from question words in all supported languages and
+extracts the topic phrase by trimming filler words, so most requests skip
+the intent LLM round trip. Returns a confidence the caller compares against
+LOCAL_INTENT_MIN_CONFIDENCE before trusting the result.
+"""
+
+import re
+
+from models.schemas import IntentSchema
+
+
+# Question word -> question_type, per language.
+QUESTION_WORDS = {
+    "en": {
+        "what": "what", "what's": "what", "whats": "what", "which": "what",
+        "why": "why", "how": "how", "how's": "how",
+        "when": "when", "where": "where", "where's": "where",
+        "who": "who", "who's": "who", "whom": "who",
+    },
+    "hi": {
+        "क्या": "what", "क्यों": "why", "क्यूँ": "why", "कैसे": "how", "कब": "when",
+        "कहाँ": "where", "कहां": "where", "कौन": "who", "किसने": "who",
+    },
+    "bn": {
+        "কী": "what", "কি": "what", "কেন": "why", "কীভাবে": "how", "কিভাবে": "how",
+        "কখন": "when", "কোথায়": "where", "কোথা": "where", "কে": "who", "কারা": "who",
+    },
+    "ta": {
+        "என்ன": "what", "எது": "what", "ஏன்": "why", "எப்படி": "how", "எப்போது": "when",
+        "எங்கே": "where", "எங்கு": "where", "எங்கிருந்து": "where", "யார்": "who",
+    },
+    "te": {
+        "ఏమిటి": "what", "ఏంటి": "what", "ఏది": "what", "ఎందుకు": "why", "ఎలా": "how",
+        "ఎప్పుడు": "when", "ఎక్కడ": "where", "ఎక్కడి": "where", "ఎవరు": "who",
+    },
+}
+
+# Filler words trimmed from the edges of the topic phrase (never from the middle).
+EDGE_STOPWORDS = {
+    "en": {
+        "is", "are", "was", "were", "do", "does", "did", "can", "could", "would", "will", "should",
+        "a", "an", "the", "we", "you", "i", "me", "my", "our", "it", "they", "there", "please",
+        "tell", "about", "explain", "to", "of", "happen", "happens", "mean", "means",
+    },
+    "hi": {"है", "हैं", "था", "थे", "होता", "होती", "होते", "हम", "हमें", "मुझे", "बताओ", "बताइए", "के", "का", "की", "में", "एक", "बारे"},
+    "bn": {"হয়", "আছে", "ছিল", "আমরা", "আমাদের", "আমাকে", "বলো", "একটা", "একটি", "সম্পর্কে", "এর", "তে"},
+    "ta": {"என்றால்", "இருக்கிறது", "இருக்கின்றன", "உள்ளது", "நாம்", "நமக்கு", "எனக்கு", "சொல்லுங்கள்", "ஒரு", "பற்றி"},
+    "te": {"అంటే", "ఉంటుంది", "ఉంది", "ఉన్నాయి", "మనం", "మనకు", "నాకు", "చెప్పు", "ఒక", "గురించి"},
+}
+
+# Phrases that signal a topic request without a question word ("tell me about X").
+GENERAL_PREFIXES = {
+    "en": ("tell me about", "explain", "teach me about", "i want to learn about", "show me"),
+    "hi": ("बताओ", "बताइए", "समझाओ"),
+    "bn": ("বলো", "বোঝাও"),
+    "ta": ("சொல்லுங்கள்", "விளக்குங்கள்"),
+    "te": ("చెప్పు", "వివరించు"),
+}
+
+# English question shapes whose remainder is a clause, not a topic:
+# "why do we need water" -> "need water", "why is the sky blue" -> "sky blue".
+AUXILIARIES = {"do", "does", "did", "can", "could", "would", "will", "should"}
+SUBJECT_PRONOUNS = {"we", "you", "i", "they", "it"}
+COPULAS = {"is", "are", "was", "were"}
+# Below INTENT_MIN_CONFIDENCE, so such topics always go to the intent LLM.
+CLAUSE_CONFIDENCE = 0.4
+
+CONJUNCTIONS = {"and", "or", "और", "या", "এবং", "ও", "অথবা", "மற்றும்", "அல்லது", "మరియు", "లేదా"}
+
+_PUNCTUATION = "?!.,;:()[]{}\"'“”‘’।॥¿¡"
+_SPLIT = re.compile(r"\s+")
+
+
+def _tokens(text: str) -> list[str]:
+    # Split on whitespace: `\w` would cut Indic words at vowel signs and viramas.
+    return [t for t in (w.strip(_PUNCTUATION) for w in _SPLIT.split(text or "")) if t]
+
+
+def _trim_edges(words: list[str], stopwords: set[str]) -> list[str]:
+    start, end = 0, len(words)
+    while start < end and words[start].lower() in stopwords:
+        start += 1
+    while end > start and words[end - 1].lower() in stopwords:
+        end -= 1
+    return words[start:end]
+
+
+def _is_clause(content: list[str], topic_words: list[str], question_type: str | None) -> bool:
+    lowered = [w.lower() for w in content]
+    leading = lowered[: lowered.index(topic_words[0].lower())] if topic_words else []
+    # "do we need water" starts with the verb, "do leaves change color" holds one.
+    if AUXILIARIES & set(leading) and (SUBJECT_PRONOUNS & set(leading) or len(topic_words) > 1):
+        return True
+    # "animal is the biggest": a predicate inside the topic.
+    if any(w.lower() in COPULAS for w in topic_words):
+        return True
+    # "is the sky blue", "how are rainbows made": subject plus predicate.
+    return question_type in ("why", "how") and bool(COPULAS & set(leading)) and len(topic_words) > 1
+
+
+def classify_intent(text: str, language: str = "en", selected_class: str | None = None) -> tuple[dict, float]:
+    """Return (intent, confidence) where intent matches IntentSchema."""
+    lang = (language or "en").strip().lower().split("-")[0]
+    question_words = {**QUESTION_WORDS["en"], **QUESTION_WORDS.get(lang, {})}
+    stopwords = EDGE_STOPWORDS["en"] | EDGE_STOPWORDS.get(lang, set())
+
+    grade_hint = (selected_class or "").strip()
+    difficulty = f"child-{grade_hint}" if grade_hint else "child"
+
+    words = _tokens(text)
+    found_types = []
+    content = []
+    for w in words:
+        qtype = question_words.get(w.lower())
+        if qtype:
+            found_types.append(qtype)
+        else:
+            content.append(w)
+
+    lowered = " ".join(words).lower()
+    general_request = any(lowered.startswith(p) for p in GENERAL_PREFIXES["en"] + GENERAL_PREFIXES.get(lang, ()))
+    topic_words = _trim_edges(content, stopwords)
+    topic = " ".join(topic_words)
+
+    confidence = 0.5
+    distinct = set(found_types)
+    if len(distinct) == 1:
+        confidence += 0.3
+    elif len(distinct) > 1:
+        confidence -= 0.3
+    elif general_request:
+        confidence += 0.25
+
+    if not topic_words:
+        confidence = 0.0
+    elif len(topic_words) <= 4:
+        confidence += 0.2
+    elif len(topic_words) <= 6:
+        confidence += 0.1
+    else:
+        confidence -= 0.2
+
+    if any(w.lower() in CONJUNCTIONS for w in topic_words):
+        confidence -= 0.2
+
+    question_type = found_types[0] if len(distinct) == 1 else "general"
+    if _is_clause(content, topic_words, question_type):
+        confidence = min(confidence, CLAUSE_CONFIDENCE)
+    intent = IntentSchema(topic=topic or (text or "").strip(), question_type=question_type, difficulty=difficulty)
+    if hasattr(intent, "model_dump"):
+        return intent.model_dump(), max(0.0, min(1.0, confidence))
+    return intent.dict(), max(0.0, min(1.0, confidence))
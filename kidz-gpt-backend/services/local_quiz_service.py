@@ -0,0 +1,104 @@
+"""
+Deterministic fill-in-the-blank quiz built from the explainer card.
+
+Each point (and summary sentence) becomes a two-option question: its key
+term is blanked out and the distractor is the key term of a sibling
+sentence, or a banked answer from another topic in the same language.
+CPU-only and language-agnostic (whitespace tokens), so it serves as the
+fallback when the quiz LLM fails and as the QUIZ_MODE=local fast path.
+"""
+
+import re
+
+from services.local_intent_service import EDGE_STOPWORDS
+
+
+BLANK = "____"
+
+PROMPTS = {
+    "en": "Fill in the blank:",
+    "hi": "खाली जगह भरो:",
+    "bn": "শূন্যস্থান পূরণ করো:",
+    "ta": "கோடிட்ட இடத்தை நிரப்புக:",
+    "te": "ఖాళీని పూరించండి:",
+}
+
+_EXTRA_STOPWORDS = {
+    "en": {"this", "that", "these", "those", "with", "from", "into", "have", "has", "and", "but", "very", "also", "help", "helps", "make", "makes", "like", "when", "them", "their", "your"},
+    "hi": {"और", "यह", "वह", "से", "को", "पर", "भी", "बहुत", "होता", "करता", "करती", "करते"},
+    "bn": {"এবং", "এটা", "এটি", "থেকে", "কে", "ও", "খুব", "করে"},
+    "ta": {"இது", "அது", "மற்றும்", "மிகவும்", "செய்கிறது"},
+    "te": {"ఇది", "అది", "మరియు", "చాలా", "చేస్తుంది"},
+}
+
+_PUNCTUATION = "?!.,;:()[]{}\"'“”‘’।॥¿¡-"
+_SENTENCE_END = re.compile(r"(?<=[.!?।])\s+")
+
+
+def _lang(language: str) -> str:
+    return (language or "en").strip().lower().split("-")[0]
+
+
+def _sentences(explainer: dict) -> list[str]:
+    out = []
+    for text in list((explainer or {}).get("points") or []) + _SENTENCE_END.split(str((explainer or {}).get("summary") or "")):
+        text = str(text or "").strip()
+        if len(text.split()) >= 3 and text not in out:
+            out.append(text)
+    return out
+
+
+def key_term(sentence: str, language: str = "en", topic: str = "") -> tuple[int, str] | None:
+    """(token position, word) of the longest content word that is not part of the topic itself."""
+    lang = _lang(language)
+    stopwords = EDGE_STOPWORDS["en"] | EDGE_STOPWORDS.get(lang, set()) | _EXTRA_STOPWORDS["en"] | _EXTRA_STOPWORDS.get(lang, set())
+    topic_words = {w.strip(_PUNCTUATION).lower() for w in (topic or "").split()}
+    candidates = []
+    for pos, raw in enumerate(sentence.split()):
+        word = raw.strip(_PUNCTUATION)
+        lowered = word.lower()
+        if len(word) < 3 or lowered in stopwords or lowered in topic_words or word.isdigit():
+            continue
+        # Longest first; on ties prefer later words (the sentence's new information).
+        candidates.append((len(word), pos, word))
+    if not candidates:
+        return None
+    _, pos, word = max(candidates)
+    return pos, word
+
+
+def build_quiz(
+    topic: str,
+    explainer: dict,
+    language: str = "en",
+    count: int = 3,
+    related_terms: list[str] | None = None,
+) -> dict:
+    """{"questions": [...]} in the QuizQuestion shape; may hold fewer than `count`."""
+    lang = _lang(language)
+    prompt = PROMPTS.get(lang, PROMPTS["en"])
+    sentences = _sentences(explainer)
+    terms = [key_term(s, lang, topic) for s in sentences]
+    pool = [t[1] for t in terms if t] + [t for t in related_terms or [] if t]
+
+    questions = []
+    for idx, (sentence, found) in enumerate(zip(sentences, terms)):
+        if not found:
+            continue
+        pos, term = found
+        # Start after this sentence's own term so each question gets a different distractor.
+        rotated = pool[idx + 1 :] + pool[: idx + 1]
+        distractor = next((t for t in rotated if t.lower() != term.lower() and t.lower() not in sentence.lower()), None)
+        if not distractor:
+            continue
+        # Blank the token itself: regex word boundaries break on Indic vowel signs.
+        tokens = sentence.split()
+        tokens[pos] = tokens[pos].replace(term, BLANK, 1)
+        blanked = " ".join(tokens)
+        # Alternate the position of the right answer.
+        correct = len(questions) % 2
+        options = [term, distractor] if correct == 0 else [distractor, term]
+        questions.append({"question": f"{prompt} {blanked}", "options": options, "correctAnswer": correct})
+        if len(questions) >= count:
+            break
+    return {"questions": questions}
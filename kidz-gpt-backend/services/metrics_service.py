@@ -0,0 +1,66 @@
+"""
+In-process metrics: named counters and latency samples.
+Exposed as JSON through GET /metrics.
+"""
+
+from collections import deque
+from contextlib import contextmanager
+import time
+
+
+MAX_SAMPLES = 2048
+
+_counters: dict[str, int] = {}
+_timings: dict[str, deque] = {}
+
+
+def incr(name: str, value: int = 1):
+    _counters[name] = _counters.get(name, 0) + value
+
+
+def observe(name: str, seconds: float):
+    samples = _timings.get(name)
+    if samples is None:
+        samples = _timings[name] = deque(maxlen=MAX_SAMPLES)
+    samples.append(float(seconds))
+
+
+@contextmanager
+def timer(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - start)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+def summarize(samples) -> dict:
+    values = sorted(samples)
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values) * 1000, 2),
+        "p50_ms": round(_percentile(values, 50) * 1000, 2),
+        "p95_ms": round(_percentile(values, 95) * 1000, 2),
+        "p99_ms": round(_percentile(values, 99) * 1000, 2),
+    }
+
+
+def snapshot() -> dict:
+    return {
+        "counters": dict(sorted(_counters.items())),
+        "timings": {name: summarize(samples) for name, samples in sorted(_timings.items())},
+    }
+
+
+def reset():
+    _counters.clear()
+    _timings.clear()
@@ -0,0 +1,183 @@
+"""
+Ollama model residency service.
+Warms every configured model at startup, applies a per-model keep_alive,
+sends keep-warm pings during school hours and reports which models are loaded.
+"""
+
+import asyncio
+import os
+import time
+from datetime import datetime
+
+import httpx
+
+from services.llm_scheduler import PRIORITY_WARMUP, llm_slot
+from services.model_router import all_routed_models, cascade_for
+
+
+DEFAULT_MODEL = "deepseek-v3.1:671b-cloud"
+
+# Agent name -> env var holding its dedicated model (empty = general model).
+AGENT_MODEL_ENV = {
+    "intent": "OLLAMA_MODEL_INTENT",
+    "script": "OLLAMA_MODEL_SCRIPT",
+    "animation": "OLLAMA_MODEL_ANIMATION",
+    "general": "",
+}
+
+# Last successful warm-up / ping per model (epoch seconds).
+_last_warmed: dict[str, float] = {}
+_keep_warm_task: asyncio.Task | None = None
+
+
+def _ollama_base_url() -> str:
+    url = os.getenv("OLLAMA_URL", "http://localhost:11434/api/generate").rstrip("/")
+    for suffix in ("/api/generate", "/api/chat"):
+        if url.endswith(suffix):
+            return url[: -len(suffix)]
+    return url
+
+
+def general_model() -> str:
+    return os.getenv("OLLAMA_MODEL", DEFAULT_MODEL)
+
+
+def configured_models() -> dict[str, str]:
+    """Return {agent: model} for every agent that talks to Ollama."""
+    models = {}
+    for agent, env_name in AGENT_MODEL_ENV.items():
+        models[agent] = (os.getenv(env_name) if env_name else None) or general_model()
+    return models
+
+
+def models_to_warm() -> list[str]:
+    """Every distinct model a request may hit, including routing cascades."""
+    return sorted(set(configured_models().values()) | all_routed_models())
+
+
+def keep_alive_for(model: str) -> str:
+    """Resolve the keep_alive value sent with every request for `model`.
+
+    A per-agent override (OLLAMA_KEEP_ALIVE_INTENT, ..._SCRIPT, ..._ANIMATION)
+    applies to the models that agent routes to; otherwise OLLAMA_KEEP_ALIVE is used.
+    """
+    for agent, agent_model in configured_models().items():
+        if agent == "general" or model not in cascade_for(agent, agent_model):
+            continue
+        override = os.getenv(f"OLLAMA_KEEP_ALIVE_{agent.upper()}")
+        if override:
+            return override
+    return os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+
+
+def _parse_range(value: str, default: tuple[int, int]) -> tuple[int, int]:
+    try:
+        start, end = (int(p) for p in value.split("-", 1))
+        return start, end
+    except Exception:
+        return default
+
+
+def in_school_hours(now: datetime | None = None) -> bool:
+    """True when `now` falls inside KEEP_WARM_HOURS on one of KEEP_WARM_WEEKDAYS.
+
+    KEEP_WARM_HOURS is "start-end" in local 24h hours (end exclusive),
+    KEEP_WARM_WEEKDAYS is "first-last" with Monday = 0.
+    """
+    now = now or datetime.now()
+    start_hour, end_hour = _parse_range(os.getenv("KEEP_WARM_HOURS", "8-16"), (8, 16))
+    first_day, last_day = _parse_range(os.getenv("KEEP_WARM_WEEKDAYS", "0-4"), (0, 4))
+    return first_day <= now.weekday() <= last_day and start_hour <= now.hour < end_hour
+
+
+async def warm_model(model: str, client: httpx.AsyncClient | None = None) -> bool:
+    """Load `model` into memory with an empty prompt (Ollama's preload call)."""
+    data = {"model": model, "prompt": "", "stream": False, "keep_alive": keep_alive_for(model)}
+    try:
+        async with llm_slot(PRIORITY_WARMUP):
+            if client is None:
+                async with httpx.AsyncClient(timeout=120.0) as own_client:
+                    response = await own_client.post(f"{_ollama_base_url()}/api/generate", json=data)
+            else:
+                response = await client.post(f"{_ollama_base_url()}/api/generate", json=data)
+        response.raise_for_status()
+        _last_warmed[model] = time.time()
+        return True
+    except Exception as e:
+        print(f"⚠️ Could not warm model {model}: {e}")
+        return False
+
+
+async def warm_all_models() -> dict[str, bool]:
+    """Warm every distinct configured model concurrently."""
+    models = models_to_warm()
+    async with httpx.AsyncClient(timeout=120.0) as client:
+        results = await asyncio.gather(*(warm_model(m, client) for m in models))
+    status = dict(zip(models, results))
+    for model, ok in status.items():
+        print(f"{'✅' if ok else '⚠️'} Model warm-up {model}: {'ready' if ok else 'failed'}")
+    return status
+
+
+async def loaded_models() -> list[dict]:
+    """Models currently resident in Ollama (GET /api/ps)."""
+    try:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(f"{_ollama_base_url()}/api/ps")
+            response.raise_for_status()
+            payload = response.json()
+    except Exception as e:
+        print(f"⚠️ Could not list loaded models: {e}")
+        return []
+
+    return [
+        {
+            "name": m.get("name") or m.get("model"),
+            "expires_at": m.get("expires_at"),
+            "size_vram": m.get("size_vram"),
+        }
+        for m in payload.get("models") or []
+    ]
+
+
+async def residency_status() -> dict:
+    configured = configured_models()
+    loaded = await loaded_models()
+    loaded_names = {m["name"] for m in loaded}
+    return {
+        "configured": configured,
+        "keep_alive": {m: keep_alive_for(m) for m in models_to_warm()},
+        "last_warmed": dict(_last_warmed),
+        "loaded": loaded,
+        "cold": [m for m in models_to_warm() if m not in loaded_names],
+        "school_hours": in_school_hours(),
+    }
+
+
+async def _keep_warm_loop():
+    interval_s = float(os.getenv("KEEP_WARM_INTERVAL_SECONDS", "240"))
+    while True:
+        await asyncio.sleep(interval_s)
+        if not in_school_hours():
+            continue
+        models = models_to_warm()
+        async with httpx.AsyncClient(timeout=120.0) as client:
+            await asyncio.gather(*(warm_model(m, client) for m in models))
+
+
+async def start_model_residency():
+    """Startup hook: warm all models, then keep them warm during school hours."""
+    global _keep_warm_task
+
+    if os.getenv("OLLAMA_WARMUP_ON_STARTUP", "1") == "1":
+        await warm_all_models()
+
+    if os.getenv("KEEP_WARM_ENABLED", "1") == "1" and _keep_warm_task is None:
+        _keep_warm_task = asyncio.create_task(_keep_warm_loop())
+
+
+async def stop_model_residency():
+    global _keep_warm_task
+    if _keep_warm_task is not None:
+        _keep_warm_task.cancel()
+        _keep_warm_task = None
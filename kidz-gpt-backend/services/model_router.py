@@ -0,0 +1,113 @@
+"""
+Latency-aware model routing with a fallback cascade.
+
+Each agent can declare a cascade of models, smallest/fastest first:
+
+    OLLAMA_ROUTE_INTENT=llama3.2:1b,qwen2.5:7b,gpt-oss:120b-cloud
+
+The agent tries the models in the order returned by `route()` and escalates
+to the next one when a response fails validation or has low confidence.
+Tiers that keep failing, or that are slower than the agent's latency budget,
+are skipped until a periodic exploration request shows they have recovered.
+"""
+
+import os
+import random
+
+from services import metrics_service as metrics
+
+
+EWMA_ALPHA = 0.2
+
+# (agent, model) -> {"latency_s", "success", "calls", "failures"}
+_stats: dict[tuple[str, str], dict] = {}
+
+
+def cascade_for(agent: str, default_model: str) -> list[str]:
+    """Configured cascade for `agent`, falling back to its single model."""
+    raw = os.getenv(f"OLLAMA_ROUTE_{agent.upper()}", "")
+    models = [m.strip() for m in raw.split(",") if m.strip()]
+    return models or [default_model]
+
+
+def all_routed_models() -> set[str]:
+    models = set()
+    for name, value in os.environ.items():
+        if name.startswith("OLLAMA_ROUTE_") and not name.endswith("_BUDGET_MS"):
+            models.update(m.strip() for m in value.split(",") if m.strip())
+    return models
+
+
+def _tier_is_healthy(agent: str, model: str) -> bool:
+    stats = _stats.get((agent, model))
+    min_samples = int(os.getenv("ROUTER_MIN_SAMPLES", "5"))
+    if not stats or stats["calls"] < min_samples:
+        return True
+
+    if stats["success"] < float(os.getenv("ROUTER_MIN_SUCCESS_RATE", "0.6")):
+        return False
+
+    budget_ms = os.getenv(f"OLLAMA_ROUTE_{agent.upper()}_BUDGET_MS")
+    if budget_ms and stats["latency_s"] * 1000 > float(budget_ms):
+        return False
+
+    return True
+
+
+def route(agent: str, default_model: str) -> list[str]:
+    """Ordered list of models to try for one request.
+
+    Unhealthy tiers are moved behind the healthy ones (never dropped, so
+    there is always something to try), except on exploration requests
+    which probe the configured order as-is.
+    """
+    cascade = cascade_for(agent, default_model)
+    if len(cascade) == 1:
+        return cascade
+
+    if random.random() < float(os.getenv("ROUTER_EXPLORE_RATE", "0.05")):
+        metrics.incr(f"routing.{agent}.explore")
+        return cascade
+
+    healthy = [m for m in cascade if _tier_is_healthy(agent, m)]
+    skipped = [m for m in cascade if m not in healthy]
+    for model in skipped:
+        metrics.incr(f"routing.{agent}.skipped.{model}")
+    return healthy + skipped
+
+
+def record(agent: str, model: str, *, latency_s: float, ok: bool, reason: str = ""):
+    """Record the outcome of one attempt against `model`."""
+    stats = _stats.setdefault((agent, model), {"latency_s": latency_s, "success": 1.0, "calls": 0, "failures": 0})
+    stats["calls"] += 1
+    stats["latency_s"] = (1 - EWMA_ALPHA) * stats["latency_s"] + EWMA_ALPHA * latency_s
+    stats["success"] = (1 - EWMA_ALPHA) * stats["success"] + EWMA_ALPHA * (1.0 if ok else 0.0)
+
+    metrics.observe(f"routing.{agent}.{model}.latency", latency_s)
+    if ok:
+        metrics.incr(f"routing.{agent}.{model}.success")
+    else:
+        stats["failures"] += 1
+        metrics.incr(f"routing.{agent}.{model}.failure")
+        if reason:
+            metrics.incr(f"routing.{agent}.{model}.failure.{reason}")
+
+
+def record_decision(agent: str, model: str | None, *, attempts: int):
+    """Record which tier finally served the request (None = local fallback)."""
+    metrics.incr(f"routing.{agent}.served_by.{model or 'fallback'}")
+    if attempts > 1:
+        metrics.incr(f"routing.{agent}.escalations", attempts - 1)
+
+
+def routing_stats() -> dict:
+    out: dict[str, dict] = {}
+    for (agent, model), stats in sorted(_stats.items()):
+        out.setdefault(agent, {})[model] = {
+            "calls": stats["calls"],
+            "failures": stats["failures"],
+            "success_rate": round(stats["success"], 3),
+            "latency_ms": round(stats["latency_s"] * 1000, 1),
+            "healthy": _tier_is_healthy(agent, model),
+        }
+    return out
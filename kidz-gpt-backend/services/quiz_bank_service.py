@@ -0,0 +1,174 @@
+"""
+Quiz question bank per (topic, language, grade).
+
+Every validated question the LLM writes is kept in data/quiz_bank.json
+(override with QUIZ_BANK_PATH), minus near-duplicates of questions already
+banked. Once a topic has QUIZ_BANK_MIN_QUESTIONS, quizzes are sampled from
+the bank without an LLM call; the caller tops the bank up in the background
+until it holds QUIZ_BANK_TARGET questions.
+"""
+
+import json
+import os
+import random
+import re
+import threading
+from pathlib import Path
+
+from models.schemas import QuizQuestion
+from services import metrics_service as metrics
+from services.storyboard_library_service import canonical_topic
+
+
+DEFAULT_BANK_PATH = Path(__file__).resolve().parent.parent / "data" / "quiz_bank.json"
+
+# "topic|language|grade" -> list of questions
+_bank: dict[str, list[dict]] = {}
+_source: str | None = None
+_lock = threading.Lock()
+
+_served = 0
+_rejected_duplicates = 0
+
+_NON_WORD = re.compile(r"[?!.,;:()\[\]{}\"'“”‘’।॥¿¡]+")
+
+
+def _key(topic: str, language: str, selected_class: str | None) -> str:
+    lang = (language or "en").strip().lower().split("-")[0]
+    return f"{canonical_topic(topic, lang)}|{lang}|{(selected_class or '').strip().lower()}"
+
+
+def _words(text: str) -> set[str]:
+    return set(_NON_WORD.sub(" ", (text or "").lower()).split())
+
+
+def _near_duplicate(question: dict, banked: list[dict]) -> bool:
+    """Same question wording (word Jaccard) with the same correct answer."""
+    threshold = float(os.getenv("QUIZ_BANK_DUP_THRESHOLD", "0.8"))
+    words = _words(question["question"])
+    answer = _NON_WORD.sub("", question["options"][question["correctAnswer"]].lower()).strip()
+    for other in banked:
+        other_words = _words(other["question"])
+        union = words | other_words
+        if not union or len(words & other_words) / len(union) < threshold:
+            continue
+        other_answer = _NON_WORD.sub("", other["options"][other["correctAnswer"]].lower()).strip()
+        if other_answer == answer:
+            return True
+    return False
+
+
+def _valid(question) -> dict | None:
+    try:
+        q = QuizQuestion(**question)
+    except Exception:
+        return None
+    options = [str(o).strip() for o in q.options]
+    if not q.question.strip() or len(options) != 2 or not all(options) or options[0] == options[1]:
+        return None
+    if q.correctAnswer not in (0, 1):
+        return None
+    return {"question": q.question.strip(), "options": options, "correctAnswer": q.correctAnswer}
+
+
+def load_bank(path: str | None = None) -> int:
+    """(Re)load the bank from disk. Returns the number of questions."""
+    global _source
+    path = path or os.getenv("QUIZ_BANK_PATH") or str(DEFAULT_BANK_PATH)
+    bank = {}
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            bank = json.load(f).get("topics", {})
+    with _lock:
+        _bank.clear()
+        _bank.update(bank)
+        _source = path
+    total = sum(len(qs) for qs in bank.values())
+    print(f"✅ Quiz bank loaded: {total} questions for {len(bank)} topics from {path}")
+    return total
+
+
+def add_questions(topic: str, language: str, selected_class: str | None, questions: list) -> int:
+    """Bank the valid, non-duplicate questions and persist. Returns how many were added.
+
+    Blocking file I/O: call it off the event loop.
+    """
+    global _rejected_duplicates
+    if not _source or not canonical_topic(topic, language):
+        return 0
+    key = _key(topic, language, selected_class)
+    limit = int(os.getenv("QUIZ_BANK_MAX_PER_TOPIC", "40"))
+
+    with _lock:
+        banked = _bank.setdefault(key, [])
+        added = 0
+        for question in questions or []:
+            q = _valid(question)
+            if not q or len(banked) >= limit:
+                continue
+            if _near_duplicate(q, banked):
+                _rejected_duplicates += 1
+                continue
+            banked.append(q)
+            added += 1
+        if not banked:
+            _bank.pop(key, None)
+        if added:
+            tmp_path = f"{_source}.tmp"
+            Path(_source).parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"topics": _bank}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, _source)
+
+    if added:
+        metrics.incr("quiz_bank.added", added)
+    return added
+
+
+def sample_questions(topic: str, language: str, selected_class: str | None, count: int = 3) -> list[dict] | None:
+    """Random sample of banked questions, or None while the topic has too few."""
+    global _served
+    if os.getenv("QUIZ_BANK_ENABLED", "1") != "1":
+        return None
+    banked = _bank.get(_key(topic, language, selected_class)) or []
+    if len(banked) < int(os.getenv("QUIZ_BANK_MIN_QUESTIONS", "6")):
+        metrics.incr("quiz_bank.miss")
+        return None
+    _served += 1
+    metrics.incr("quiz_bank.hit")
+    return [dict(q) for q in random.sample(banked, min(count, len(banked)))]
+
+
+def needs_top_up(topic: str, language: str, selected_class: str | None) -> bool:
+    banked = _bank.get(_key(topic, language, selected_class)) or []
+    return len(banked) < int(os.getenv("QUIZ_BANK_TARGET", "12"))
+
+
+def related_answers(topic: str, language: str, limit: int = 20) -> list[str]:
+    """Short correct answers banked for other topics in the same language (quiz distractors)."""
+    lang = (language or "en").strip().lower().split("-")[0]
+    own = f"{canonical_topic(topic, lang)}|"
+    answers = []
+    for key, questions in list(_bank.items()):
+        if key.startswith(own) or key.split("|")[1] != lang:
+            continue
+        for q in questions:
+            answer = q["options"][q["correctAnswer"]]
+            if len(answer.split()) <= 2 and answer not in answers:
+                answers.append(answer)
+                if len(answers) >= limit:
+                    return answers
+    return answers
+
+
+def bank_stats() -> dict:
+    with _lock:
+        topics = len(_bank)
+        questions = sum(len(qs) for qs in _bank.values())
+    return {
+        "source": _source,
+        "topics": topics,
+        "questions": questions,
+        "served": _served,
+        "rejected_duplicates": _rejected_duplicates,
+    }
@@ -1,8 +1,195 @@
+"""
+Keyword safety filter for questions and generated lessons.
+
+All keywords of all supported languages are compiled into one regex, so a
+text is scanned once. Matches must start at a word boundary and, for
+English, end at one after an optional inflection ("kills" matches,
+"skill" does not). Indic keywords marked with a trailing "*" also match
+inflected forms (case markers and suffixes are written attached). Python's
+\\b treats Indic vowel signs as non-word characters, so boundaries here
+treat the whole Indic range as word characters instead.
+
+Matches inside ALLOWED_PHRASES ("pump blood", "blood cells") are ignored:
+those are ordinary science questions.
+"""
+
+import re
+
+
 UNSAFE_KEYWORDS = [
     "violence", "blood", "kill", "weapon",
     "adult", "sex", "drugs", "alcohol"
 ]
-BAD_WORDS = ["violence", "blood", "sex", "kill"]
+
+# A trailing "*" allows attached suffixes. Only stems no harmless word starts
+# with get one; the rest list their inflected forms (Tamil "மது*" would block
+# மதுரை, Bengali "খুন*" খুনসুটি, "অস্ত্র*" অস্ত্রোপচার).
+UNSAFE_KEYWORDS_BY_LANGUAGE = {
+    "en": UNSAFE_KEYWORDS + ["murder", "gun", "drug"],
+    "hi": [
+        "हिंसा*", "खून*", "रक्त", "हत्या*", "मार डाल*", "हथियार*", "बंदूक*", "सेक्स*", "ड्रग्स*", "नशा*",
+        "शराब*", "वयस्क",
+    ],
+    "bn": [
+        "সহিংস*", "রক্ত", "রক্তের", "রক্তে", "খুন", "খুনি", "খুনের", "হত্যা*", "অস্ত্র", "অস্ত্রের", "অস্ত্রশস্ত্র",
+        "বন্দুক*", "সেক্স*", "মাদক*", "ড্রাগ*", "মদ", "প্রাপ্তবয়স্ক*",
+    ],
+    "ta": [
+        "வன்முறை*", "இரத்தம்", "இரத்தத்தை", "இரத்தத்தில்", "இரத்தத்தின்", "ரத்தம்", "ரத்தத்தை", "ரத்தத்தில்",
+        "ரத்தத்தின்", "கொலை*", "ஆயுதம்", "ஆயுதங்கள்", "ஆயுதத்தை", "துப்பாக்கி*", "செக்ஸ்*", "போதை*", "மதுபான*",
+    ],
+    "te": [
+        "హింస*", "రక్తం", "రక్తాన్ని", "రక్తంలో", "హత్య*", "చంపు*", "చంపడ*", "ఆయుధం", "ఆయుధాలు", "తుపాకీ*",
+        "సెక్స్*", "మాదక*", "మద్యం*",
+    ],
+}
+
+ALLOWED_PHRASES = {
+    "en": [
+        "pump blood", "pumps blood", "pumping blood", "blood cell", "blood cells", "blood vessel", "blood vessels",
+        "red blood", "white blood", "blood flow", "blood flows", "blood circulation", "blood groups", "blood group",
+        "adult teeth", "adult animals", "adult frog", "adult insect", "adult butterfly", "killer whale", "killer whales",
+    ],
+    "hi": ["रक्त संचार", "रक्त कोशिका", "खून को पंप", "रक्त वाहिका"],
+    "bn": ["রক্ত সঞ্চালন", "রক্তকণিকা", "রক্তনালী"],
+    "ta": ["இரத்த ஓட்ட", "இரத்த நாள", "இரத்த அணு"],
+    "te": ["రక్త ప్రసరణ", "రక్త నాళ", "రక్త కణ"],
+}
+
+# Letters, digits and the Indic blocks (Devanagari .. Malayalam, incl. vowel signs).
+_WORD = r"\w\u0900-\u0DFF"
+_EN_SUFFIX = r"(?:s|es|ed|d|ing|er|ers|y)?"
+
+
+def _alternation(terms: list[str]) -> str:
+    # Longest first so "blood vessels" wins over "blood vessel".
+    return "|".join(re.escape(t) for t in sorted(set(terms), key=len, reverse=True))
+
+
+def _compile_keywords() -> "re.Pattern[str]":
+    english = UNSAFE_KEYWORDS_BY_LANGUAGE["en"]
+    prefixes, words = [], []
+    for lang, terms in UNSAFE_KEYWORDS_BY_LANGUAGE.items():
+        if lang == "en":
+            continue
+        for term in terms:
+            (prefixes if term.endswith("*") else words).append(term.rstrip("*"))
+    parts = [rf"(?:{_alternation(english)}){_EN_SUFFIX}(?![{_WORD}])"]
+    if words:
+        parts.append(rf"(?:{_alternation(words)})(?![{_WORD}])")
+    if prefixes:
+        parts.append(rf"(?:{_alternation(prefixes)})[{_WORD}]*")
+    return re.compile(rf"(?<![{_WORD}])(?:{'|'.join(parts)})", re.IGNORECASE)
+
+
+_KEYWORDS = _compile_keywords()
+_ALLOWED = re.compile(
+    rf"(?<![{_WORD}])(?:{_alternation([p for ps in ALLOWED_PHRASES.values() for p in ps])})",
+    re.IGNORECASE,
+)
+
+
+def scan(text: str) -> list[tuple[int, int, str]]:
+    """(start, end, matched text) for every unsafe keyword in `text`."""
+    if not text:
+        return []
+    allowed = [m.span() for m in _ALLOWED.finditer(text)]
+    matches = []
+    for m in _KEYWORDS.finditer(text):
+        start, end = m.span()
+        if any(a_start <= start and end <= a_end for a_start, a_end in allowed):
+            continue
+        # An allowed phrase may end mid-word ("blood vessels" vs "blood vessel").
+        if any(a_start <= start < a_end for a_start, a_end in allowed):
+            continue
+        matches.append((start, end, m.group(0)))
+    return matches
+
+
 def is_safe(text: str) -> bool:
-    lowered = text.lower()
-    return not any(word in lowered for word in UNSAFE_KEYWORDS)
+    return not scan(text)
+
+
+def scan_lesson(*, question: str = "", scenes: list | None = None, explainer: dict | None = None) -> list[dict]:
+    """Unsafe matches across a whole lesson, each with the field it was found in.
+
+    Fields: "question", "scenes[i].dialogue", "explainer.title",
+    "explainer.summary", "explainer.points[i]".
+    """
+    fields = [("question", question)]
+    fields += [(f"scenes[{i}].dialogue", (s or {}).get("dialogue")) for i, s in enumerate(scenes or [])]
+    explainer = explainer or {}
+    fields += [("explainer.title", explainer.get("title")), ("explainer.summary", explainer.get("summary"))]
+    fields += [(f"explainer.points[{i}]", p) for i, p in enumerate(explainer.get("points") or [])]
+
+    found = []
+    for field, text in fields:
+        for start, end, term in scan(str(text or "")):
+            found.append({"field": field, "term": term, "start": start, "end": end})
+    return found
+
+
+class UnsafeContentError(Exception):
+    """Raised by streaming generators when the model starts writing unsafe content."""
+
+    def __init__(self, term: str, position: int):
+        super().__init__(f"unsafe term {term!r} at {position}")
+        self.term = term
+        self.position = position
+
+
+# Long enough to see a whole keyword plus the allowed phrase it may belong to.
+_LOOKAHEAD = max(len(t) for ts in list(UNSAFE_KEYWORDS_BY_LANGUAGE.values()) + list(ALLOWED_PHRASES.values()) for t in ts) + 4
+
+
+class StreamingSafetyChecker:
+    """Safety filter for text that arrives in fragments (streamed LLM tokens).
+
+    feed() returns the part of the stream that is known to be safe, holding
+    back only the last `lookahead` characters, which could still turn into
+    a keyword or into an allowed phrase. Once an unsafe term is seen the
+    checker latches: `match` is set and nothing more is released, so the
+    caller can stop the generation instead of waiting for the full text.
+    """
+
+    def __init__(self, lookahead: int | None = None):
+        self.lookahead = lookahead or _LOOKAHEAD
+        self.match: tuple[int, int, str] | None = None
+        self._text = ""
+        self._offset = 0  # stream position of self._text[0]
+        self._released = 0  # stream position up to which text was returned
+
+    @property
+    def unsafe(self) -> bool:
+        return self.match is not None
+
+    def feed(self, fragment: str) -> str:
+        if self.match or not fragment:
+            return ""
+        self._text += fragment
+        return self._advance(final=False)
+
+    def flush(self) -> str:
+        """Release the held-back tail at the end of the stream."""
+        if self.match:
+            return ""
+        return self._advance(final=True)
+
+    def _advance(self, final: bool) -> str:
+        end = self._offset + len(self._text)
+        if not final:
+            end = max(self._released, end - self.lookahead)
+        for start, stop, term in scan(self._text):
+            start += self._offset
+            # Matches before _released were judged with full context already;
+            # ones inside the window are decided once more text arrives.
+            if self._released <= start < end or (final and start >= self._released):
+                self.match = (start, stop + self._offset, term)
+                return ""
+        released = self._text[self._released - self._offset : end - self._offset]
+        self._released = end
+        # Keep one window of context before the release point for word boundaries.
+        cut = max(0, self._released - self.lookahead - self._offset)
+        self._text = self._text[cut:]
+        self._offset += cut
+        return released
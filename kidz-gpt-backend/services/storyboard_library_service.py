@@ -0,0 +1,249 @@
+"""
+Storyboard library: ready-made storyboards for everyday topics.
+
+The curated seed is data/storyboard_library.json (override with
+STORYBOARD_LIBRARY_PATH) and is never written to. Entries are indexed by
+(canonical topic, language, grade). Curated dialogue is served as written.
+
+The library grows by itself: safe storyboards the LLM produces are saved
+under the request's canonical topic (STORYBOARD_LIBRARY_AUTOSAVE=1) to a
+separate, git-ignored file (STORYBOARD_LIBRARY_SAVE_PATH), so a topic asked
+every day is generated once and then served from disk. Their dialogue
+stores that topic as a `{topic}` placeholder (`{Topic}` when capitalized),
+filled back with the entry's own topic, never with the wording of a later
+request that reached the entry through an alias.
+"""
+
+import copy
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from services import metrics_service as metrics
+from services.local_intent_service import EDGE_STOPWORDS
+from services.safety_service import scan_lesson
+
+
+DEFAULT_LIBRARY_PATH = Path(__file__).resolve().parent.parent / "data" / "storyboard_library.json"
+DEFAULT_SAVE_PATH = Path(__file__).resolve().parent.parent / "data" / "storyboard_library.local.json"
+
+PLACEHOLDER = "{topic}"
+PLACEHOLDER_CAPITALIZED = "{Topic}"
+
+# Topics shorter than this are not templated: too likely to be part of ordinary wording.
+MIN_TEMPLATE_CHARS = 3
+
+# (canonical topic, language, grade) -> entry
+_entries: dict[tuple[str, str, str], dict] = {}
+# Entries saved at runtime; the only ones written to _save_path and the only templated ones.
+_saved_entries: list[dict] = []
+_saved_ids: set[int] = set()
+_source: str | None = None
+_save_path: str | None = None
+_lock = threading.Lock()
+
+_lookups = 0
+_hits = 0
+_saved = 0
+
+_NON_WORD = re.compile(r"[?!.,;:()\[\]{}\"'“”‘’।॥¿¡]+")
+_SPACES = re.compile(r"\s+")
+# Letters, digits and the Indic blocks: \b breaks on Indic vowel signs.
+_WORD = r"\w\u0900-\u0DFF"
+
+
+def canonical_topic(topic: str, language: str = "en") -> str:
+    """Lowercase, punctuation-free topic with filler words trimmed from both ends."""
+    lang = (language or "en").strip().lower().split("-")[0]
+    stopwords = EDGE_STOPWORDS["en"] | EDGE_STOPWORDS.get(lang, set())
+    words = _SPACES.sub(" ", _NON_WORD.sub(" ", (topic or "").lower())).split()
+    while words and words[0] in stopwords:
+        words.pop(0)
+    while words and words[-1] in stopwords:
+        words.pop()
+    return " ".join(words)
+
+
+def _lang(language: str) -> str:
+    return (language or "en").strip().lower().split("-")[0]
+
+
+def _grade(selected_class: str | None) -> str:
+    return (selected_class or "").strip().lower()
+
+
+def _add(entry: dict, index: dict):
+    lang = _lang(entry.get("language"))
+    grade = _grade(entry.get("grade"))
+    for name in [entry.get("topic", "")] + list(entry.get("aliases", [])):
+        canon = canonical_topic(name, lang)
+        if canon:
+            index[(canon, lang, grade)] = entry
+
+
+def _read(path: str) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [e for e in json.load(f).get("storyboards", []) if isinstance(e, dict)]
+
+
+def load_library(path: str | None = None, save_path: str | None = None) -> int:
+    """(Re)build the index from the seed and the saved storyboards. Returns the number of storyboards.
+
+    Saved entries never override a seed entry for the same key.
+    """
+    global _source, _save_path
+    path = path or os.getenv("STORYBOARD_LIBRARY_PATH") or str(DEFAULT_LIBRARY_PATH)
+    save_path = save_path or os.getenv("STORYBOARD_LIBRARY_SAVE_PATH") or str(DEFAULT_SAVE_PATH)
+    seed = _read(path)
+    saved = _read(save_path)
+
+    index: dict[tuple[str, str, str], dict] = {}
+    for entry in saved + seed:
+        if len(entry.get("scenes") or []) >= 2:
+            _add(entry, index)
+
+    with _lock:
+        _entries.clear()
+        _entries.update(index)
+        _saved_entries[:] = saved
+        _saved_ids.clear()
+        _saved_ids.update(id(e) for e in saved)
+        _source = path
+        _save_path = save_path
+    print(f"✅ Storyboard library loaded: {len(seed)} storyboards from {path}, {len(saved)} from {save_path}")
+    return len(seed) + len(saved)
+
+
+def template_dialogue(dialogue: str, topic: str, language: str = "en") -> str:
+    """Replace whole-word occurrences of the topic with the placeholder.
+
+    The topic is lowercased; an occurrence written that way becomes `{topic}`
+    and a capitalized one `{Topic}`, so fill_dialogue() with the same topic
+    gives back the original text. Other spellings ("DNA") are left as they
+    are, and so are topics that are too short or are filler words.
+    """
+    topic = (topic or "").strip().lower()
+    lang = _lang(language)
+    if len(topic) < MIN_TEMPLATE_CHARS or topic in EDGE_STOPWORDS["en"] | EDGE_STOPWORDS.get(lang, set()):
+        return dialogue
+    pattern = re.compile(rf"(?<![{_WORD}]){re.escape(topic)}(?![{_WORD}])", re.IGNORECASE)
+    # Uncased scripts capitalize to themselves: the plain placeholder wins.
+    placeholders = {topic[:1].upper() + topic[1:]: PLACEHOLDER_CAPITALIZED, topic: PLACEHOLDER}
+
+    return pattern.sub(lambda m: placeholders.get(m.group(0), m.group(0)), dialogue)
+
+
+def fill_dialogue(dialogue: str, topic: str) -> str:
+    return dialogue.replace(PLACEHOLDER_CAPITALIZED, topic[:1].upper() + topic[1:]).replace(PLACEHOLDER, topic)
+
+
+def find_storyboard(intent: dict, language: str = "en", selected_class: str | None = None) -> dict | None:
+    """Library storyboard for the intent's topic, or None.
+
+    Autosaved entries get `{topic}` filled with their own stored topic.
+
+    Grade-specific entries win; entries saved without a grade serve every grade.
+    """
+    global _lookups, _hits
+    if os.getenv("STORYBOARD_LIBRARY_ENABLED", "1") != "1" or not _entries:
+        return None
+
+    topic = str((intent or {}).get("topic") or "").strip()
+    lang = _lang(language)
+    canon = canonical_topic(topic, lang)
+    if not canon:
+        return None
+
+    _lookups += 1
+    metrics.incr("storyboard_library.lookup")
+    entry = _entries.get((canon, lang, _grade(selected_class))) or _entries.get((canon, lang, ""))
+    # A stored "why" answer does not answer a "how" question about the same topic.
+    stored_type = entry.get("question_type") if entry else None
+    if not entry or (stored_type and stored_type != (intent or {}).get("question_type")):
+        return None
+
+    _hits += 1
+    metrics.incr("storyboard_library.hit")
+    print(f"📖 Storyboard library hit: {canon} ({lang})")
+    scenes = copy.deepcopy(entry["scenes"])
+    if id(entry) in _saved_ids:
+        for scene in scenes:
+            scene["dialogue"] = fill_dialogue(str(scene.get("dialogue", "")), entry["topic"])
+    return {"scenes": scenes}
+
+
+def save_storyboard(intent: dict, language: str, selected_class: str | None, storyboard: dict) -> bool:
+    """Add a generated storyboard to the library and persist it. Returns True if saved.
+
+    Blocking file I/O: call it off the event loop.
+    """
+    global _saved
+    if os.getenv("STORYBOARD_LIBRARY_AUTOSAVE", "1") != "1" or not _save_path:
+        return False
+
+    topic = str((intent or {}).get("topic") or "").strip()
+    lang = _lang(language)
+    canon = canonical_topic(topic, lang)
+    scenes = (storyboard or {}).get("scenes") or []
+    if not canon or len(scenes) < 2:
+        return False
+    # Library entries are served to other children without any LLM call or review.
+    unsafe = scan_lesson(scenes=scenes)
+    if unsafe:
+        metrics.incr("storyboard_library.rejected_unsafe")
+        print(f"🚫 Not saving storyboard for {canon}: unsafe term {unsafe[0]['term']!r} in {unsafe[0]['field']}")
+        return False
+
+    # Stored as a placeholder for the entry's own topic, filled back on every hit.
+    templated = [
+        {**scene, "dialogue": template_dialogue(str(scene.get("dialogue", "")), canon, lang)}
+        for scene in scenes
+    ]
+    entry = {
+        "topic": canon,
+        "language": lang,
+        "grade": _grade(selected_class),
+        "question_type": (intent or {}).get("question_type"),
+        "scenes": templated,
+    }
+
+    with _lock:
+        key = (canon, lang, entry["grade"])
+        if key in _entries:
+            return False
+        limit = int(os.getenv("STORYBOARD_LIBRARY_MAX_ENTRIES", "5000"))
+        if len(_saved_entries) >= limit:
+            return False
+        _entries[key] = entry
+        _saved_entries.append(entry)
+        _saved_ids.add(id(entry))
+
+        tmp_path = f"{_save_path}.tmp"
+        Path(_save_path).parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"storyboards": _saved_entries}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, _save_path)
+        _saved += 1
+
+    metrics.incr("storyboard_library.saved")
+    print(f"💾 Saved storyboard to library: {canon} ({lang})")
+    return True
+
+
+def library_stats() -> dict:
+    with _lock:
+        storyboards = len({id(e) for e in _entries.values()})
+    return {
+        "source": _source,
+        "save_path": _save_path,
+        "storyboards": storyboards,
+        "keys": len(_entries),
+        "lookups": _lookups,
+        "hits": _hits,
+        "saved": _saved,
+        "hit_rate": round(_hits / _lookups, 3) if _lookups else 0.0,
+    }
@@ -51,7 +51,8 @@ async def transcribe_audio(audio_file, language: str = "en"):
     
     async with httpx.AsyncClient(timeout=180.0) as client:
         try:
-            response = await client.post("http://localhost:8001/transcribe", files=files, data=data)
+            whisper_url = os.getenv("WHISPER_URL", "http://localhost:8001/transcribe")
+            response = await client.post(whisper_url, files=files, data=data)
             response.raise_for_status()
             result = response.json()
             transcribed_text = result.get("text", "").strip()
@@ -0,0 +1,190 @@
+"""
+Curriculum topic index: maps simple questions to prebuilt lessons.
+
+Lessons live in data/curriculum.json (override with CURRICULUM_PATH), one per
+topic and language, each with aliases, storyboard scenes and an explainer.
+The index is keyed by (language, grade) and matches the topic phrase of a
+question against the aliases with character-trigram similarity, so small
+spelling and plural differences still hit. Every word of the topic phrase
+must also appear (fuzzily) in the alias, so "earth day" does not get the
+Earth lesson. Only "what is X" / "tell me about X" style questions are
+matched; specific why/how questions go to the LLMs.
+"""
+
+import copy
+import json
+import os
+import re
+from pathlib import Path
+
+from services import metrics_service as metrics
+from services.local_intent_service import classify_intent
+
+
+DEFAULT_CURRICULUM_PATH = Path(__file__).resolve().parent.parent / "data" / "curriculum.json"
+
+MATCHABLE_QUESTION_TYPES = {"what", "general"}
+
+# (language, grade) -> set of topic ids available there
+_index: dict[tuple[str, str], set[str]] = {}
+# language -> list of (alias, trigrams, topic_id)
+_aliases: dict[str, list[tuple[str, set[str], str]]] = {}
+# language -> trigram -> alias positions in _aliases[language]
+_postings: dict[str, dict[str, set[int]]] = {}
+# (topic_id, language) -> lesson
+_lessons: dict[tuple[str, str], dict] = {}
+_source: str | None = None
+
+_lookups = 0
+_hits: dict[str, int] = {}
+
+_NON_WORD = re.compile(r"[?!.,;:()\[\]{}\"'“”‘’।॥¿¡-]+")
+_SPACES = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _SPACES.sub(" ", _NON_WORD.sub(" ", (text or "").lower())).strip()
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {_normalize(text)} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def _dice(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2 * len(a & b) / (len(a) + len(b))
+
+
+def _covers(topic: str, alias: str) -> bool:
+    """Every word of the topic phrase has a close word in the alias."""
+    min_word = float(os.getenv("TOPIC_INDEX_MIN_WORD_SCORE", "0.6"))
+    alias_words = [_trigrams(w) for w in alias.split()]
+    return all(
+        max((_dice(_trigrams(word), other) for other in alias_words), default=0.0) >= min_word
+        for word in _normalize(topic).split()
+    )
+
+
+def load_curriculum(path: str | None = None) -> int:
+    """(Re)build the index from the curriculum file. Returns the number of lessons."""
+    global _source
+    path = path or os.getenv("CURRICULUM_PATH") or str(DEFAULT_CURRICULUM_PATH)
+    with open(path, encoding="utf-8") as f:
+        curriculum = json.load(f)
+
+    index: dict[tuple[str, str], set[str]] = {}
+    aliases: dict[str, list[tuple[str, set[str], str]]] = {}
+    postings: dict[str, dict[str, set[int]]] = {}
+    lessons: dict[tuple[str, str], dict] = {}
+
+    for topic in curriculum.get("topics", []):
+        topic_id = topic["id"]
+        grades = [str(g).strip() for g in topic.get("grades", [])]
+        for lang, lesson in (topic.get("lessons") or {}).items():
+            lessons[(topic_id, lang)] = lesson
+            # "" is the no-grade-selected bucket: every topic is available there.
+            for grade in grades + [""]:
+                index.setdefault((lang, grade.lower()), set()).add(topic_id)
+            for alias in lesson.get("aliases", []) + [lesson.get("title", "")]:
+                grams = _trigrams(alias)
+                if not grams or not _normalize(alias):
+                    continue
+                entries = aliases.setdefault(lang, [])
+                for gram in grams:
+                    postings.setdefault(lang, {}).setdefault(gram, set()).add(len(entries))
+                entries.append((_normalize(alias), grams, topic_id))
+
+    _index.clear()
+    _index.update(index)
+    _aliases.clear()
+    _aliases.update(aliases)
+    _postings.clear()
+    _postings.update(postings)
+    _lessons.clear()
+    _lessons.update(lessons)
+    _source = path
+    print(f"✅ Curriculum index loaded: {len(lessons)} lessons from {path}")
+    return len(lessons)
+
+
+def match_topic(text: str, language: str = "en", selected_class: str = "") -> tuple[str | None, float]:
+    """Best (topic_id, score) for the question, or (None, score) when nothing clearly matches."""
+    lang = (language or "en").strip().lower().split("-")[0]
+    intent, _ = classify_intent(text, lang, selected_class=selected_class)
+    if intent["question_type"] not in MATCHABLE_QUESTION_TYPES:
+        return None, 0.0
+
+    grams = _trigrams(intent["topic"])
+    entries = _aliases.get(lang, [])
+    postings = _postings.get(lang, {})
+    candidates = set()
+    for gram in grams:
+        candidates |= postings.get(gram, set())
+
+    available = _index.get((lang, (selected_class or "").strip().lower()), set())
+    best: dict[str, float] = {}
+    for pos in candidates:
+        alias, alias_grams, topic_id = entries[pos]
+        if topic_id not in available:
+            continue
+        score = _dice(grams, alias_grams)
+        if score <= best.get(topic_id, 0.0) or not _covers(intent["topic"], alias):
+            continue
+        best[topic_id] = score
+
+    if not best:
+        return None, 0.0
+    ranked = sorted(best.items(), key=lambda kv: kv[1], reverse=True)
+    topic_id, score = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+    min_score = float(os.getenv("TOPIC_INDEX_MIN_SCORE", "0.75"))
+    if score < min_score or score - runner_up < 0.1:
+        return None, score
+    return topic_id, score
+
+
+def match_lesson(text: str, language: str = "en", selected_class: str = "") -> dict | None:
+    """Prebuilt lesson (intent, scenes, explainer) for the question, or None."""
+    global _lookups
+    if os.getenv("TOPIC_INDEX_ENABLED", "1") != "1" or not _lessons:
+        return None
+
+    lang = (language or "en").strip().lower().split("-")[0]
+    _lookups += 1
+    metrics.incr("topic_index.lookup")
+    topic_id, score = match_topic(text, lang, selected_class)
+    if not topic_id:
+        return None
+
+    _hits[lang] = _hits.get(lang, 0) + 1
+    metrics.incr("topic_index.hit")
+    lesson = _lessons[(topic_id, lang)]
+    grade_hint = (selected_class or "").strip()
+    print(f"📚 Curriculum match: {topic_id} ({lang}, score {score:.2f})")
+    return {
+        "topic_id": topic_id,
+        "score": round(score, 3),
+        "intent": {
+            "topic": lesson["title"],
+            "question_type": "what",
+            "difficulty": f"child-{grade_hint}" if grade_hint else "child",
+        },
+        # Copies: the pipeline annotates scenes and explainer in place.
+        "scenes": copy.deepcopy(lesson["scenes"]),
+        "explainer": {**copy.deepcopy(lesson["explainer"]), "image_url": lesson["explainer"].get("image_url")},
+    }
+
+
+def index_stats() -> dict:
+    hits = sum(_hits.values())
+    return {
+        "source": _source,
+        "lessons": len(_lessons),
+        "aliases": {lang: len(entries) for lang, entries in sorted(_aliases.items())},
+        "lookups": _lookups,
+        "hits": hits,
+        "hits_by_language": dict(sorted(_hits.items())),
+        "match_rate": round(hits / _lookups, 3) if _lookups else 0.0,
+    }
@@ -1,13 +1,215 @@
-from functools import lru_cache
+"""
+Machine translation for UI and lesson strings.
+
+GoogleTranslator is a blocking HTTP client, so calls run on a small thread
+pool (TRANSLATION_MAX_WORKERS) instead of the event loop. Results go into a
+persistent translation memory (SQLite, TRANSLATION_MEMORY_PATH) keyed by
+(normalized text, target language), with an in-process LRU in front, so a
+string is translated once per language for the lifetime of the deployment.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import asyncio
+import os
+import re
+import sqlite3
+import threading
+
 from deep_translator import GoogleTranslator
 
-@lru_cache(maxsize=128)
-def translate_text(text: str, to_language: str = "en") -> str:
-    if not text or not text.strip():
-        return ""
+from services import metrics_service as metrics
+
+
+DEFAULT_MEMORY_PATH = Path(__file__).resolve().parent.parent / "data" / "translation_memory.sqlite3"
+
+_workers = int(os.getenv("TRANSLATION_MAX_WORKERS", "4"))
+_executor = ThreadPoolExecutor(max_workers=_workers, thread_name_prefix="translate")
+
+_lru: OrderedDict[tuple[str, str], str] = OrderedDict()
+_db: sqlite3.Connection | None = None
+_db_lock = threading.Lock()
+
+_SPACES = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _SPACES.sub(" ", text or "").strip()
+
+
+def _target(to_language: str) -> str:
+    return (to_language or "en").strip().lower().split("-")[0]
+
+
+def _remember(key: tuple[str, str], translated: str):
+    _lru[key] = translated
+    _lru.move_to_end(key)
+    limit = int(os.getenv("TRANSLATION_CACHE_SIZE", "2048"))
+    while len(_lru) > limit:
+        _lru.popitem(last=False)
+
+
+def _memory() -> sqlite3.Connection | None:
+    global _db
+    if _db is None and os.getenv("TRANSLATION_MEMORY_ENABLED", "1") == "1":
+        path = os.getenv("TRANSLATION_MEMORY_PATH") or str(DEFAULT_MEMORY_PATH)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        _db = sqlite3.connect(path, check_same_thread=False)
+        _db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " text TEXT NOT NULL, lang TEXT NOT NULL, translated TEXT NOT NULL,"
+            " PRIMARY KEY (text, lang))"
+        )
+        _db.commit()
+    return _db
+
+
+def _memory_get(text: str, lang: str) -> str | None:
+    with _db_lock:
+        db = _memory()
+        if db is None:
+            return None
+        row = db.execute("SELECT translated FROM translations WHERE text = ? AND lang = ?", (text, lang)).fetchone()
+    return row[0] if row else None
+
+
+def _memory_get_many(texts: list[str], lang: str) -> dict[str, str]:
+    found: dict[str, str] = {}
+    with _db_lock:
+        db = _memory()
+        if db is None:
+            return found
+        # Stay well under SQLite's bound-parameter limit.
+        for i in range(0, len(texts), 500):
+            chunk = texts[i : i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = db.execute(
+                f"SELECT text, translated FROM translations WHERE lang = ? AND text IN ({placeholders})",
+                (lang, *chunk),
+            ).fetchall()
+            found.update(rows)
+    return found
+
+
+def _memory_put(text: str, lang: str, translated: str):
+    with _db_lock:
+        db = _memory()
+        if db is None:
+            return
+        db.execute("INSERT OR REPLACE INTO translations (text, lang, translated) VALUES (?, ?, ?)", (text, lang, translated))
+        db.commit()
+
+
+def _translate_blocking(text: str, lang: str) -> tuple[str, bool]:
+    """Runs on the executor. Returns (translation, ok); failures return the input."""
+    stored = _memory_get(text, lang)
+    if stored is not None:
+        metrics.incr("translation.memory_hit")
+        return stored, True
     try:
         # Using GoogleTranslator from deep-translator
-        return GoogleTranslator(source='auto', target=to_language).translate(text)
+        with metrics.timer("translation.remote"):
+            translated = GoogleTranslator(source="auto", target=lang).translate(text)
     except Exception as e:
         print(f"Error translating text: {e}")
-        return text
\ No newline at end of file
+        metrics.incr("translation.error")
+        return text, False
+    translated = translated or text
+    _memory_put(text, lang, translated)
+    return translated, True
+
+
+async def _translate_with_timeout(text: str, lang: str, queue_position: int = 0) -> tuple[str, bool]:
+    """_translate_blocking on the executor; a timeout counts as a failure and returns the input.
+
+    Strings queued behind a full pool get one extra timeout per pool round.
+    """
+    timeout = float(os.getenv("TRANSLATION_TIMEOUT_SECONDS", "15")) * (1 + queue_position // _workers)
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(_executor, _translate_blocking, text, lang), timeout=timeout)
+    except asyncio.TimeoutError:
+        print(f"Error translating text: timed out after {timeout:g}s ({lang})")
+        metrics.incr("translation.error")
+        return text, False
+
+
+def cached_translation(text: str, to_language: str = "en") -> str | None:
+    """Translation from the in-process LRU only (never blocks)."""
+    key = (normalize(text), _target(to_language))
+    translated = _lru.get(key)
+    if translated is not None:
+        _lru.move_to_end(key)
+    return translated
+
+
+async def translate_text(text: str, to_language: str = "en") -> str:
+    text = normalize(text)
+    if not text:
+        return ""
+    lang = _target(to_language)
+
+    key = (text, lang)
+    translated = cached_translation(text, lang)
+    if translated is not None:
+        metrics.incr("translation.lru_hit")
+        return translated
+
+    translated, ok = await _translate_with_timeout(text, lang)
+    if ok:
+        _remember(key, translated)
+    return translated
+
+
+async def translate_batch(texts: list[str], to_language: str = "en") -> list[str]:
+    """Translate many strings into one language; results keep the input order.
+
+    Duplicates are translated once. LRU hits are answered on the loop, the
+    translation memory is read in a single query, and only the remaining
+    strings go to the translator, in parallel up to TRANSLATION_MAX_WORKERS.
+    Each string has its own timeout; one that fails or times out keeps its input.
+    """
+    lang = _target(to_language)
+    normalized = [normalize(t) for t in texts]
+    unique = [t for t in dict.fromkeys(normalized) if t]
+
+    results: dict[str, str] = {}
+    missing = []
+    for text in unique:
+        translated = cached_translation(text, lang)
+        if translated is None:
+            missing.append(text)
+        else:
+            results[text] = translated
+    metrics.incr("translation.lru_hit", len(unique) - len(missing))
+    metrics.incr("translation.batch_duplicates", len([t for t in normalized if t]) - len(unique))
+
+    if missing:
+        loop = asyncio.get_running_loop()
+        stored = await loop.run_in_executor(_executor, _memory_get_many, missing, lang)
+        metrics.incr("translation.memory_hit", len(stored))
+        for text, translated in stored.items():
+            results[text] = translated
+            _remember((text, lang), translated)
+
+        pending = [t for t in missing if t not in stored]
+        if pending:
+            translated_pending = await asyncio.gather(
+                *(_translate_with_timeout(t, lang, position) for position, t in enumerate(pending))
+            )
+            for text, (translated, ok) in zip(pending, translated_pending):
+                results[text] = translated
+                if ok:
+                    _remember((text, lang), translated)
+
+    return [results.get(t, "") for t in normalized]
+
+
+def translation_stats() -> dict:
+    stored = None
+    with _db_lock:
+        db = _memory()
+        if db is not None:
+            stored = db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+    return {"lru": len(_lru), "memory": stored, "workers": _workers}
@@ -5,6 +5,7 @@ Searches Wikipedia for a topic and returns a suitable image URL.
 
 import httpx
 import asyncio
+import os
 
 
 async def fetch_wikipedia_image(keyword: str) -> str | None:
@@ -27,7 +28,7 @@ async def fetch_wikipedia_image(keyword: str) -> str | None:
     try:
         async with httpx.AsyncClient(timeout=10.0) as client:
             # Step 1: Search for the topic on Wikipedia
-            search_url = "https://en.wikipedia.org/w/api.php"
+            search_url = os.getenv("WIKIPEDIA_API_URL", "https://en.wikipedia.org/w/api.php")
             search_params = {
                 "action": "query",
                 "list": "search",
@@ -0,0 +1,40 @@
+import pytest
+
+from services.animation_script_service import _CUE_PATTERNS, _pick_action_from_text, estimate_duration
+
+
+@pytest.mark.parametrize(
+    "text, action",
+    [
+        ("I was thinking about it.", "thinking"),
+        ("Keep wondering!", "thinking"),
+        ("Imagining the sea.", "thinking"),
+        ("We walked home.", "walking"),
+        ("That was surprising!", "suprised"),
+        ("सोचो, पानी कहाँ जाता है।", "thinking"),
+        ("நாம் குதிக்கலாம்!", "jump"),
+    ],
+)
+def test_cues_match_inflected_forms(text, action):
+    assert _CUE_PATTERNS[action].search(text)
+
+
+@pytest.mark.parametrize(
+    "action, text",
+    [
+        ("thinking", "Something unthinkable"),
+        ("jump", "இது ஒரு பகுதி."),
+    ],
+)
+def test_cues_need_word_boundaries(action, text):
+    assert not _CUE_PATTERNS[action].search(text)
+
+
+def test_positional_actions():
+    assert _pick_action_from_text("Hi there", idx=0, total=3) == "hello"
+    assert _pick_action_from_text("Today we learned about rain.", idx=2, total=3) == "bye"
+    assert _pick_action_from_text("Why does it rain?", idx=1, total=3) == "question"
+
+
+def test_duration_grows_with_text():
+    assert estimate_duration("one two three four five six seven eight", "en") > estimate_duration("one two", "en")
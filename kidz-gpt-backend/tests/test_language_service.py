@@ -0,0 +1,50 @@
+import pytest
+
+from services import language_service
+from services.language_service import detect_language, script_histogram
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("आसमान नीला क्यों है?", "hi"),
+        ("photosynthesis क्या है", "hi"),
+        ("আকাশ নীল কেন?", "bn"),
+        ("வானம் ஏன் நீலமாக உள்ளது?", "ta"),
+        ("ఆకాశం ఎందుకు నీలంగా ఉంది?", "te"),
+        # Telugu letters below U+0C60, missed by the old range check
+        ("ఎ", "te"),
+        ("Why is the sky blue?", "en"),
+    ],
+)
+def test_detect_language(text, expected):
+    assert detect_language(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "   ", None, "12345 ?!"])
+def test_detect_language_unknown(text):
+    assert detect_language(text) == "unknown"
+
+
+def test_script_histogram_counts_letters_per_script():
+    counts = script_histogram("sun सूरज")
+    assert counts["latin"] == 3
+    assert counts["hi"] == 4
+    assert "bn" not in counts
+
+
+def test_indic_script_decides_without_langdetect(monkeypatch):
+    language_service._detect.cache_clear()
+
+    def fail(_text):
+        raise AssertionError("langdetect must not run for Indic text")
+
+    monkeypatch.setattr(language_service, "detect_langs", fail)
+    assert detect_language("ఆకాశం నీలం") == "te"
+
+
+def test_latin_detection_is_deterministic_and_memoized():
+    language_service._detect.cache_clear()
+    first = detect_language("Plants make food from sunlight")
+    assert detect_language("  Plants make food from sunlight ") == first == "en"
+    assert language_service._detect.cache_info().hits == 1
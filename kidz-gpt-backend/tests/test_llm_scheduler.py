@@ -0,0 +1,85 @@
+import asyncio
+
+from services.llm_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    LLMScheduler,
+    current_priority,
+    llm_priority,
+)
+
+
+def test_background_never_takes_reserved_slot():
+    async def run():
+        scheduler = LLMScheduler(max_slots=2, reserved_interactive=1)
+        await scheduler.acquire(PRIORITY_BACKGROUND)
+        waiting = asyncio.create_task(scheduler.acquire(PRIORITY_BACKGROUND))
+        await asyncio.sleep(0)
+        assert not waiting.done()
+        # The reserved slot is still free for interactive work.
+        await asyncio.wait_for(scheduler.acquire(PRIORITY_INTERACTIVE), 1)
+        scheduler.release()
+        scheduler.release()
+        await asyncio.wait_for(waiting, 1)
+
+    asyncio.run(run())
+
+
+def test_interactive_overtakes_queued_background():
+    async def run():
+        scheduler = LLMScheduler(max_slots=1, reserved_interactive=0)
+        await scheduler.acquire(PRIORITY_INTERACTIVE)
+        order = []
+
+        async def job(name, priority):
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        background = asyncio.create_task(job("background", PRIORITY_BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(job("interactive", PRIORITY_INTERACTIVE))
+        await asyncio.sleep(0)
+        scheduler.release()
+        await asyncio.gather(background, interactive)
+        assert order == ["interactive", "background"]
+
+    asyncio.run(run())
+
+
+def test_cancelled_waiter_is_removed():
+    async def run():
+        scheduler = LLMScheduler(max_slots=1, reserved_interactive=0)
+        await scheduler.acquire()
+        waiter = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.stats()["waiting"] == {}
+        scheduler.release()
+        assert scheduler.stats()["in_use"] == 0
+
+    asyncio.run(run())
+
+
+def test_llm_priority_context():
+    assert current_priority() == PRIORITY_INTERACTIVE
+    with llm_priority(PRIORITY_BACKGROUND):
+        assert current_priority() == PRIORITY_BACKGROUND
+    assert current_priority() == PRIORITY_INTERACTIVE
+
+
+def test_release_skips_waiter_cancelled_before_cleanup():
+    async def run():
+        scheduler = LLMScheduler(max_slots=1, reserved_interactive=0)
+        await scheduler.acquire()
+        cancelled = asyncio.create_task(scheduler.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        # Release before the cancelled task gets to remove itself from the queue.
+        scheduler.release()
+        assert scheduler.stats()["in_use"] == 0
+        await asyncio.gather(cancelled, return_exceptions=True)
+        await asyncio.wait_for(scheduler.acquire(), 1)
+        assert scheduler.stats()["in_use"] == 1
+
+    asyncio.run(run())
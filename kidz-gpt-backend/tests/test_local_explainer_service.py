@@ -0,0 +1,36 @@
+import pytest
+
+from services.local_explainer_service import build_explainer
+
+INTENT = {"topic": "photosynthesis", "question_type": "what"}
+
+
+@pytest.mark.parametrize(
+    "opener, kept",
+    [
+        ("Hello! Plants make their own food.", "Plants make their own food."),
+        ("Hi there, friends! Leaves use sunlight.", "Leaves use sunlight."),
+        ("History of plants is long.", "History of plants is long."),
+    ],
+)
+def test_greeting_is_stripped_not_the_line(opener, kept):
+    scenes = [{"dialogue": opener}, {"dialogue": "They need water too."}]
+    explainer = build_explainer(intent=INTENT, scenes=scenes)
+    assert explainer["summary"].startswith(kept)
+
+
+def test_filler_questions_and_greetings_alone_are_skipped():
+    scenes = [
+        {"dialogue": "Hi!"},
+        {"dialogue": "Do you know how plants eat?"},
+        {"dialogue": "Plants make food from sunlight."},
+        {"dialogue": "Today we learned about photosynthesis."},
+    ]
+    explainer = build_explainer(intent=INTENT, scenes=scenes)
+    assert explainer["title"] == "Photosynthesis"
+    assert explainer["summary"] == "Plants make food from sunlight."
+    assert explainer["points"] == ["Plants make food from sunlight."]
+
+
+def test_no_content_gives_none():
+    assert build_explainer(intent=INTENT, scenes=[{"dialogue": "Hello!"}, {"dialogue": "Why?"}]) is None
@@ -0,0 +1,46 @@
+import pytest
+
+from services.local_intent_service import CLAUSE_CONFIDENCE, classify_intent
+
+
+@pytest.mark.parametrize(
+    "text, topic, question_type",
+    [
+        ("What is photosynthesis?", "photosynthesis", "what"),
+        ("What is the water cycle", "water cycle", "what"),
+        ("Where is the heart?", "heart", "where"),
+        ("Tell me about volcanoes", "volcanoes", "general"),
+        ("What does gravity mean?", "gravity", "what"),
+        ("बारिश क्यों होती है?", "बारिश", "why"),
+    ],
+)
+def test_simple_questions_are_trusted(text, topic, question_type):
+    intent, confidence = classify_intent(text, "hi" if text.startswith("बा") else "en")
+    assert (intent["topic"], intent["question_type"]) == (topic, question_type)
+    assert confidence >= 0.75
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "why do we need water",
+        "Why is the sky blue?",
+        "Which animal is the biggest",
+        "How are rainbows made?",
+        "Why do leaves change color?",
+        "How can I save water",
+    ],
+)
+def test_clauses_are_left_to_the_llm(text):
+    _, confidence = classify_intent(text, "en")
+    assert confidence <= CLAUSE_CONFIDENCE < 0.5
+
+
+def test_two_question_words_lower_confidence():
+    _, confidence = classify_intent("what and why volcanoes", "en")
+    assert confidence < 0.75
+
+
+def test_grade_goes_into_difficulty():
+    intent, _ = classify_intent("What is rain?", "en", "3")
+    assert intent["difficulty"] == "child-3"
@@ -0,0 +1,56 @@
+from services.local_quiz_service import BLANK, PROMPTS, build_quiz, key_term
+
+EXPLAINER = {
+    "title": "Photosynthesis",
+    "summary": "Plants make their own food using sunlight.",
+    "points": [
+        "Leaves take in carbon dioxide from the air.",
+        "Roots drink water from the soil.",
+        "Sunlight gives plants the energy to make sugar.",
+    ],
+}
+
+
+def test_build_quiz_shape():
+    quiz = build_quiz("Photosynthesis", EXPLAINER, "en", count=3)
+    assert len(quiz["questions"]) == 3
+    for q in quiz["questions"]:
+        assert q["question"].startswith(PROMPTS["en"])
+        assert BLANK in q["question"]
+        assert len(q["options"]) == 2 and q["options"][0] != q["options"][1]
+        assert q["correctAnswer"] in (0, 1)
+
+
+def test_correct_answer_fills_the_blank():
+    for q in build_quiz("Photosynthesis", EXPLAINER, "en")["questions"]:
+        answer = q["options"][q["correctAnswer"]]
+        sentence = q["question"][len(PROMPTS["en"]) + 1 :].replace(BLANK, answer)
+        assert sentence in EXPLAINER["points"] + [EXPLAINER["summary"]]
+
+
+def test_correct_answer_position_alternates():
+    positions = [q["correctAnswer"] for q in build_quiz("Photosynthesis", EXPLAINER, "en")["questions"]]
+    assert positions[:2] == [0, 1]
+
+
+def test_key_term_skips_topic_and_stopwords():
+    _, word = key_term("Photosynthesis helps plants grow", "en", topic="Photosynthesis")
+    assert word != "Photosynthesis"
+    assert word.lower() not in {"helps"}
+
+
+def test_indic_quiz_uses_localized_prompt():
+    explainer = {
+        "summary": "पौधे सूरज की रोशनी से अपना भोजन बनाते हैं।",
+        "points": ["पत्तियाँ हवा से कार्बन डाइऑक्साइड लेती हैं।", "जड़ें मिट्टी से पानी सोखती हैं।"],
+    }
+    quiz = build_quiz("प्रकाश संश्लेषण", explainer, "hi")
+    assert quiz["questions"]
+    assert all(q["question"].startswith(PROMPTS["hi"]) for q in quiz["questions"])
+
+
+def test_related_terms_supply_distractors():
+    explainer = {"points": ["Bees collect sweet nectar from flowers."]}
+    quiz = build_quiz("Bees", explainer, "en", related_terms=["Gravity"])
+    assert quiz["questions"]
+    assert "Gravity" in quiz["questions"][0]["options"]
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from services.quiz_bank_service import DEFAULT_BANK_PATH, add_questions, load_bank, needs_top_up, related_answers, sample_questions
+
+
+def _q(question, answer, other="Something else"):
+    return {"question": question, "options": [answer, other], "correctAnswer": 0}
+
+
+@pytest.fixture
+def bank(tmp_path, monkeypatch):
+    monkeypatch.setenv("QUIZ_BANK_ENABLED", "1")
+    monkeypatch.setenv("QUIZ_BANK_MIN_QUESTIONS", "2")
+    monkeypatch.setenv("QUIZ_BANK_TARGET", "3")
+    path = tmp_path / "bank.json"
+    load_bank(str(path))
+    yield path
+    load_bank(str(DEFAULT_BANK_PATH))
+
+
+def test_add_and_sample(bank):
+    added = add_questions("Rain", "en", "3", [_q("Where does rain come from?", "Clouds"), _q("What is rain made of?", "Water")])
+    assert added == 2
+    assert json.loads(bank.read_text(encoding="utf-8"))["topics"]
+    sample = sample_questions("rain", "en", "3", count=2)
+    assert len(sample) == 2
+    assert sample_questions("rain", "en", "5") is None  # other grade
+
+
+def test_near_duplicates_and_invalid_questions_are_rejected(bank):
+    add_questions("Rain", "en", "", [_q("Where does rain come from?", "Clouds")])
+    added = add_questions(
+        "Rain",
+        "en",
+        "",
+        [
+            _q("Where does the rain come from?", "Clouds"),  # near-duplicate
+            {"question": "Broken", "options": ["Only one"], "correctAnswer": 0},
+            _q("Same options?", "Yes", "Yes"),
+        ],
+    )
+    assert added == 0
+
+
+def test_too_few_questions_is_a_miss(bank):
+    add_questions("Snow", "en", "", [_q("What colour is snow?", "White")])
+    assert sample_questions("Snow", "en", "") is None
+    assert needs_top_up("Snow", "en", "")
+
+
+def test_related_answers_come_from_other_topics(bank):
+    add_questions("Rain", "en", "", [_q("Rain falls from?", "Clouds")])
+    add_questions("Sun", "en", "", [_q("The sun is a?", "Star")])
+    assert related_answers("Rain", "en") == ["Star"]
@@ -0,0 +1,101 @@
+import pytest
+
+from services.safety_service import StreamingSafetyChecker, is_safe, scan, scan_lesson
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Why do we have a skill for drawing and painting?",
+        "Skills help us learn.",
+        "The gunnery sergeant begun",
+        "How does the heart pump blood around the body?",
+        "What are red blood cells?",
+        "Blood vessels carry oxygen.",
+        "Why is the killer whale black and white?",
+        "An adult frog lives on land.",
+        # Indic words that merely share a prefix with a keyword
+        "தேனீ மது சேகரிக்கும்",  # bees collect nectar
+        "மதுரை ஒரு நகரம்",  # Madurai is a city
+        "ரத்தினம் மின்னுகிறது",  # the gem sparkles
+        "இரத்தினம்",
+        "খুনসুটি করো না",  # don't tease
+        "অস্ত্রোপচার কী?",  # what is surgery?
+        "रक्त संचार कैसे होता है?",
+        "రక్త ప్రసరణ అంటే ఏమిటి?",
+    ],
+)
+def test_safe_texts(text):
+    assert is_safe(text), scan(text)
+
+
+@pytest.mark.parametrize(
+    "text, term",
+    [
+        ("How do you kill a bird?", "kill"),
+        ("He kills bugs", "kills"),
+        ("Killing is bad", "Killing"),
+        ("Where can I buy guns?", "guns"),
+        ("Why is there blood on the floor?", "blood"),
+        ("हत्या कैसे करें", "हत्या"),
+        ("बंदूकें कहाँ मिलती हैं", "बंदूकें"),
+        ("কে খুন করেছে?", "খুন"),
+        ("கொலையை பற்றி சொல்", "கொலையை"),
+        ("மதுபானம் குடிக்கலாமா", "மதுபானம்"),
+        ("ఎవరిని చంపుతారు", "చంపుతారు"),
+    ],
+)
+def test_unsafe_texts(text, term):
+    assert [m[2] for m in scan(text)] == [term]
+
+
+def test_scan_reports_offsets():
+    text = "Cats hunt. Some kill mice."
+    start, end, term = scan(text)[0]
+    assert text[start:end] == term == "kill"
+
+
+def test_scan_lesson_reports_fields():
+    matches = scan_lesson(
+        question="what are plants",
+        scenes=[{"dialogue": "Plants are green."}, {"dialogue": "Then it kills them."}],
+        explainer={"title": "Plants", "summary": "No guns here.", "points": ["ok", "drugs"]},
+    )
+    assert [(m["field"], m["term"]) for m in matches] == [
+        ("scenes[1].dialogue", "kills"),
+        ("explainer.summary", "guns"),
+        ("explainer.points[1]", "drugs"),
+    ]
+
+
+def _stream(text, size=3):
+    checker = StreamingSafetyChecker()
+    released = ""
+    consumed = 0
+    for i in range(0, len(text), size):
+        released += checker.feed(text[i : i + size])
+        consumed = i + size
+        if checker.unsafe:
+            break
+    released += checker.flush()
+    return checker, released, consumed
+
+
+def test_streaming_checker_releases_safe_text_unchanged():
+    text = "The heart pumps blood through blood vessels. A skill is fun to learn. " * 3
+    checker, released, _ = _stream(text)
+    assert not checker.unsafe
+    assert released == text
+
+
+def test_streaming_checker_stops_early_and_never_releases_the_term():
+    text = "Plants are green. " * 5 + "Then we kill the bug. " + "More text follows here. " * 10
+    checker, released, consumed = _stream(text)
+    assert checker.unsafe and checker.match[2] == "kill"
+    assert "kill" not in released
+    assert consumed < len(text) / 2
+
+
+def test_streaming_checker_decides_at_end_of_stream():
+    checker, released, _ = _stream("it ends with blood")
+    assert checker.unsafe and released == ""
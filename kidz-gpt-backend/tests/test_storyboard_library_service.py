@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from services.storyboard_library_service import (
+    PLACEHOLDER,
+    PLACEHOLDER_CAPITALIZED,
+    find_storyboard,
+    load_library,
+    save_storyboard,
+    template_dialogue,
+)
+
+SUN = {"topic": "Sun", "question_type": "what"}
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    monkeypatch.setenv("STORYBOARD_LIBRARY_AUTOSAVE", "1")
+    monkeypatch.setenv("STORYBOARD_LIBRARY_ENABLED", "1")
+    seed = tmp_path / "seed.json"
+    seed.write_text(json.dumps({"storyboards": []}), encoding="utf-8")
+    saved = tmp_path / "saved.json"
+    load_library(str(seed), str(saved))
+    yield seed, saved
+    load_library()
+
+
+def test_template_whole_words_only():
+    dialogue = "The Sun gives us sunlight every Sunday. the sun is a star."
+    assert template_dialogue(dialogue, "Sun") == (
+        f"The {PLACEHOLDER_CAPITALIZED} gives us sunlight every Sunday. the {PLACEHOLDER} is a star."
+    )
+
+
+def test_template_indic_topic_respects_word_boundaries():
+    topic = "प्रकाश संश्लेषण"
+    assert template_dialogue(f"{topic} से पौधे भोजन बनाते हैं।", topic, "hi") == f"{PLACEHOLDER} से पौधे भोजन बनाते हैं।"
+    assert template_dialogue(f"{topic}ा", topic, "hi") == f"{topic}ा"
+
+
+def test_template_keeps_other_spellings():
+    assert template_dialogue("DNA is in every cell.", "dna") == "DNA is in every cell."
+
+
+@pytest.mark.parametrize("topic", ["it", "the", ""])
+def test_template_skips_short_or_filler_topics(topic):
+    assert template_dialogue("It is in the air", topic) == "It is in the air"
+
+
+def test_saved_storyboard_round_trips(paths):
+    seed, saved = paths
+    seed_before = seed.read_text(encoding="utf-8")
+    scenes = [{"dialogue": "The Sun gives the sunlight every Sunday."}, {"dialogue": "the sun is a star."}]
+    assert save_storyboard(SUN, "en", "", {"scenes": scenes})
+
+    assert seed.read_text(encoding="utf-8") == seed_before
+    assert json.loads(saved.read_text(encoding="utf-8"))["storyboards"][0]["topic"] == "sun"
+
+    load_library(str(seed), str(saved))
+    found = find_storyboard({"topic": "sun", "question_type": "what"}, "en")
+    assert [s["dialogue"] for s in found["scenes"]] == ["The Sun gives the sunlight every Sunday.", "the sun is a star."]
+
+
+def test_unsafe_storyboard_is_not_saved(paths):
+    _, saved = paths
+    scenes = [{"dialogue": "Knights used a weapon."}, {"dialogue": "They fought."}]
+    assert not save_storyboard({"topic": "knights", "question_type": "what"}, "en", "", {"scenes": scenes})
+    assert not saved.exists()
+    assert find_storyboard({"topic": "knights", "question_type": "what"}, "en") is None
+
+
+def test_question_type_must_match(paths):
+    scenes = [{"dialogue": "Rain falls from clouds."}, {"dialogue": "That is rain."}]
+    assert save_storyboard({"topic": "rain clouds", "question_type": "why"}, "en", "", {"scenes": scenes})
+    assert find_storyboard({"topic": "rain clouds", "question_type": "how"}, "en") is None
+    assert find_storyboard({"topic": "rain clouds", "question_type": "why"}, "en")
+
+
+def test_checked_in_seed_is_served_as_written(tmp_path):
+    assert load_library(save_path=str(tmp_path / "saved.json")) > 0
+    by_topic = find_storyboard({"topic": "Photosynthesis", "question_type": "what"}, "en")
+    by_alias = find_storyboard({"topic": "plants make food", "question_type": "what"}, "en")
+    assert by_topic and len(by_topic["scenes"]) >= 2
+    assert by_alias == by_topic
+    dialogue = " ".join(s["dialogue"] for s in by_alias["scenes"])
+    assert "{" not in dialogue and "plants make food is" not in dialogue
@@ -0,0 +1,56 @@
+import pytest
+
+from services import topic_index_service
+from services.topic_index_service import load_curriculum, match_lesson, match_topic
+
+
+@pytest.fixture(scope="module", autouse=True)
+def curriculum():
+    load_curriculum()
+
+
+@pytest.mark.parametrize(
+    "question, language, topic_id",
+    [
+        ("what is earth", "en", "earth"),
+        ("What is the Earth?", "en", "earth"),
+        ("what are animals", "en", "animals"),
+        ("tell me about wild animals", "en", "animals"),
+        ("what are vegetable", "en", "vegetables"),
+        ("what are the five senses", "en", "sense_organs"),
+    ],
+)
+def test_matches_preset_topics(question, language, topic_id):
+    assert match_topic(question, language)[0] == topic_id
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "what is earth day",
+        "what is the human body made of",
+        "why is the earth round",  # specific why/how questions go to the LLMs
+        "what is photosynthesis",
+    ],
+)
+def test_does_not_match_other_questions(question):
+    assert match_topic(question, "en")[0] is None
+
+
+def test_every_alias_matches_its_own_topic():
+    for (topic_id, lang), lesson in topic_index_service._lessons.items():
+        if lang != "en":
+            continue
+        for alias in lesson["aliases"]:
+            if alias in {"our planet", "our body"}:
+                continue  # "our" is trimmed as filler, leaving too little to match
+            got = match_topic(f"what is {alias}", lang)[0]
+            assert got == topic_id, alias
+
+
+def test_match_lesson_returns_copies():
+    first = match_lesson("what is earth", "en")
+    first["scenes"][0]["dialogue"] = "changed"
+    second = match_lesson("what is earth", "en")
+    assert second["scenes"][0]["dialogue"] != "changed"
+    assert second["intent"]["question_type"] == "what"
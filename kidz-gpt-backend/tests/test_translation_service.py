@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+import pytest
+
+from services import translation_service
+
+
+class FakeTranslator:
+    calls = []
+
+    def __init__(self, source, target):
+        self.target = target
+
+    def translate(self, text):
+        FakeTranslator.calls.append((text, self.target))
+        if "slow" in text:
+            time.sleep(0.5)
+        if "broken" in text:
+            raise RuntimeError("translator down")
+        return f"<{self.target}>{text}"
+
+
+@pytest.fixture
+def translator(tmp_path, monkeypatch):
+    monkeypatch.setenv("TRANSLATION_MEMORY_PATH", str(tmp_path / "memory.sqlite3"))
+    monkeypatch.setenv("TRANSLATION_TIMEOUT_SECONDS", "0.2")
+    monkeypatch.setattr(translation_service, "GoogleTranslator", FakeTranslator)
+    monkeypatch.setattr(translation_service, "_db", None)
+    translation_service._lru.clear()
+    FakeTranslator.calls = []
+    yield FakeTranslator
+    translation_service._lru.clear()
+    if translation_service._db is not None:
+        translation_service._db.close()
+    translation_service._db = None
+
+
+def test_translate_text_uses_memory_after_the_first_call(translator):
+    assert asyncio.run(translation_service.translate_text("Hello  world", "hi-IN")) == "<hi>Hello world"
+    translation_service._lru.clear()
+    assert asyncio.run(translation_service.translate_text("Hello world", "hi")) == "<hi>Hello world"
+    assert translator.calls == [("Hello world", "hi")]
+
+
+@pytest.mark.parametrize("text", ["slow text", "broken text"])
+def test_failures_return_the_input(translator, text):
+    assert asyncio.run(translation_service.translate_text(text, "ta")) == text
+    assert translation_service.cached_translation(text, "ta") is None
+
+
+def test_batch_keeps_order_and_translates_duplicates_once(translator):
+    result = asyncio.run(translation_service.translate_batch(["Sun", "Moon", "Sun", ""], "bn"))
+    assert result == ["<bn>Sun", "<bn>Moon", "<bn>Sun", ""]
+    assert sorted(translator.calls) == [("Moon", "bn"), ("Sun", "bn")]
+
+
+def test_one_slow_string_does_not_fail_the_batch(translator):
+    result = asyncio.run(translation_service.translate_batch(["Sun", "slow Moon", "Star"], "te"))
+    assert result == ["<te>Sun", "slow Moon", "<te>Star"]